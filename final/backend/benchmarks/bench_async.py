@@ -0,0 +1,145 @@
+"""Benchmark the sync and async database access paths under concurrent load.
+
+Each workload call is issued by --concurrency clients at once (each sending
+its next request as soon as the last one returns) until --requests have
+completed, and requests/sec and latency percentiles are reported for:
+
+- sync: the Repository on a blocking session, run in Starlette's worker
+  threadpool with a session per request, as the sync routes were
+- async: the AsyncRepository the async routes use (aiosqlite, with a
+  paged listing's count and page queries issued concurrently)
+
+With --url the same load is sent over HTTP to a running server instead,
+to compare the routes end to end (e.g. this tree against an older one).
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_async --database-url sqlite:///src/db/database.sqlite \
+        --concurrency 20 25
+    python -m benchmarks.bench_async --url http://127.0.0.1:8000 --concurrency 20 25
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from urllib.parse import quote
+
+
+def workload(suburb: str):
+    """(repository method, args, kwargs, route) mirroring the routes hit by the frontend."""
+    name = quote(suburb)
+    return {
+        "list_properties": ("list_properties", (), {"suburb": suburb, "limit": 100}, f"/api/properties?suburb={name}"),
+        "list_properties_all": ("list_properties", (), {"limit": 100}, "/api/properties"),
+        "property_stats": ("property_stats", (), {"suburb": suburb}, f"/api/properties/stats/summary?suburb={name}"),
+        "list_analytics": ("list_analytics", (), {"sort_by": "price_rank", "limit": 100}, "/api/analytics?sort_by=price_rank"),
+        "suburb_analytics": ("suburb_analytics", (suburb,), {}, f"/api/analytics/{name}"),
+        "suburb_quarterly": ("suburb_quarterly", (suburb,), {}, f"/api/quarterly/{name}"),
+        "search_suburbs": ("search_suburbs", (suburb[:3],), {}, f"/api/analytics/search/suburbs?q={quote(suburb[:3])}"),
+    }
+
+
+async def load(send, concurrency: int, requests: int):
+    """
+    Run send() from concurrency clients until requests calls have finished.
+
+    Returns:
+        (requests per second, sorted latencies in milliseconds)
+    """
+    latencies = []
+    remaining = requests
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await send()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, sorted(latencies)
+
+
+def summary(rps: float, latencies):
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return {"rps": rps, "p50_ms": statistics.median(latencies), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+
+def repository_senders(method: str, args, kwargs):
+    """(sync path, async path) callables for one repository call."""
+    from starlette.concurrency import run_in_threadpool
+
+    from src.db.dataset import current_dataset
+
+    def sync_call():
+        with current_dataset().repository() as repo:
+            return getattr(repo, method)(*args, **kwargs)
+
+    async def sync_send():
+        await run_in_threadpool(sync_call)
+
+    async def async_send():
+        with current_dataset().async_repository() as repo:
+            await getattr(repo, method)(*args, **kwargs)
+
+    return {"sync": sync_send, "async": async_send}
+
+
+def http_senders(client, route: str):
+    async def send():
+        response = await client.get(route)
+        response.raise_for_status()
+    return {"http": send}
+
+
+async def run(args):
+    results = {}
+    client = None
+    if args.url:
+        import httpx
+
+        client = httpx.AsyncClient(base_url=args.url, timeout=60, limits=httpx.Limits(max_connections=max(args.concurrency)))
+
+    try:
+        for name, (method, call_args, kwargs, route) in workload(args.suburb).items():
+            senders = http_senders(client, route) if client else repository_senders(method, call_args, kwargs)
+            for mode, send in senders.items():
+                await load(send, max(args.concurrency), max(args.concurrency) * 2)  # warm pools and caches
+                for concurrency in args.concurrency:
+                    rps, latencies = await load(send, concurrency, args.requests)
+                    results[(name, mode, concurrency)] = summary(rps, latencies)
+    finally:
+        if client:
+            await client.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database access under concurrency")
+    parser.add_argument("--database-url", default="sqlite:///src/db/database.sqlite")
+    parser.add_argument("--url", help="Load a running server over HTTP instead")
+    parser.add_argument("--suburb", default="NEWTOWN")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[20, 25])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per workload, mode and concurrency")
+    args = parser.parse_args()
+
+    # Read by src.config on import
+    os.environ["DATABASE_URL"] = args.database_url
+    results = asyncio.run(run(args))
+
+    print(f"{'call':<22}{'mode':<7}{'conc':>5}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}", file=sys.stdout)
+    for (name, mode, concurrency), r in results.items():
+        print(
+            f"{name:<22}{mode:<7}{concurrency:>5}{r['rps']:>10.0f}"
+            f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark cold starts: process start to first successful response per route.
+
+Each run starts a fresh server process, polls one route until it answers
+200, and records the time since the process was spawned. Running every
+route in its own fresh process shows what the first visitor to a stopped
+machine waits for that route, with each WARMUP mode.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_cold_start \
+        --database-url sqlite:///src/db/database.sqlite \
+        --warmup blocking background off
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+
+def routes(suburb: str):
+    """The routes a first visitor hits, by name."""
+    name = quote(suburb)
+    return {
+        "health": "/health",
+        "analytics_list": "/api/analytics?limit=100",
+        "suburb_analytics": f"/api/analytics/{name}",
+        "suburb_quarterly": f"/api/quarterly/{name}",
+        "search": f"/api/analytics/search/suburbs?q={quote(suburb[:3])}",
+        "screen": "/api/screen?budget=1500000",
+        "aggregate": "/api/aggregate?group_by=suburb",
+    }
+
+
+def get(url: str, timeout: float):
+    """Status of a GET, or None if the server is not accepting connections yet."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def cold_start(path: str, env: dict, port: int, timeout: float):
+    """
+    Start a server and time it until path first answers 200.
+
+    Returns:
+        (milliseconds from spawn to the first 200, statuses seen before it)
+    """
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    seen = []
+    try:
+        while time.perf_counter() - started < timeout:
+            status = get(f"http://127.0.0.1:{port}{path}", timeout)
+            if status == 200:
+                return (time.perf_counter() - started) * 1000, seen
+            if status is not None and status not in seen:
+                seen.append(status)
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}")
+            time.sleep(0.01)
+        raise RuntimeError(f"{path} did not answer 200 within {timeout:.0f}s (saw {seen})")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process start to first response")
+    parser.add_argument("--database-url", default="sqlite:///src/db/database.sqlite")
+    parser.add_argument("--suburb", default="NEWTOWN")
+    parser.add_argument("--warmup", nargs="+", default=["blocking", "background", "off"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.warmup:
+        env = {**os.environ, "DATABASE_URL": args.database_url, "WARMUP": mode, "DATASET_WATCH_INTERVAL": "0"}
+        results[mode] = {}
+        for name, path in routes(args.suburb).items():
+            timings = []
+            for _ in range(args.repeat):
+                elapsed, _ = cold_start(path, env, args.port, args.timeout)
+                timings.append(elapsed)
+            results[mode][name] = {"median_ms": statistics.median(timings), "max_ms": max(timings)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    modes = list(results)
+    print(f"{'route':<20}" + "".join(f"{mode + ' p50':>18}" for mode in modes))
+    for name in routes(args.suburb):
+        print(f"{name:<20}" + "".join(f"{results[mode][name]['median_ms']:>16.0f}ms" for mode in modes))
+
+
+if __name__ == "__main__":
+    main()
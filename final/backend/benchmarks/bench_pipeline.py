@@ -0,0 +1,327 @@
+"""Benchmark the data pipeline stage by stage: .DAT files to a served database.
+
+Runs the notebook code itself rather than a copy: the functions of
+01_data_clean, 05_quarterly_analysis_split and 06_store_data are loaded out
+of the notebooks, and the cells that are plain top-level code (02's
+Sydney/residential filter and house/unit split, 05's smoothing columns, 06's
+inserts) are mirrored in the stage functions below. Intermediate parquet
+files between notebooks are skipped; each stage hands its frames to the next
+in memory.
+
+Stages: parse (process_year per year, late records merged back), filter,
+quarterly (transform, quarter info, aggregation, smoothing), analytics
+(suburb analytics, quarterly JSON, scores, rankings), db_load (schema and
+inserts) and derived (build_derived_tables). Each reports wall time, rows in
+and out, rows per second and the peak RSS of the process while it ran.
+Results are written as JSON with sorted keys so two runs diff cleanly, and
+--baseline prints each stage's change against an earlier run.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.generate_dat --output data/synthetic
+    python -m benchmarks.bench_pipeline --data-dir data/synthetic \
+        --output benchmarks/results/pipeline.json
+"""
+import argparse
+import ast
+import contextlib
+import gc
+import glob
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from src.db.build_derived import build_derived_tables
+from src.db.init_db import init_database
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+NOTEBOOK_DIR = BACKEND_DIR / "notebooks"
+SCHEMA_PATH = BACKEND_DIR / "src" / "db" / "schema.sql"
+
+# As in notebooks/05_quarterly_analysis_split.ipynb
+EXPONENTIAL_ALPHA = 0.3
+
+# How often the RSS sampler polls, in seconds
+RSS_INTERVAL = 0.005
+
+
+def notebook_functions(notebook: str, names: list, namespace: dict) -> dict:
+    """
+    Define the named top-level functions of a notebook in namespace.
+
+    Only the `def` statements are executed, so no cell's data loading or
+    plotting runs; the functions see namespace as their globals.
+    """
+    cells = json.loads((NOTEBOOK_DIR / notebook).read_text())["cells"]
+    found = []
+    for cell in cells:
+        if cell["cell_type"] != "code":
+            continue
+        try:
+            tree = ast.parse("".join(cell["source"]))
+        except SyntaxError:
+            continue  # cells with IPython magics
+        found += [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in names]
+
+    missing = set(names) - {node.name for node in found}
+    if missing:
+        raise RuntimeError(f"{notebook} has no function(s) {sorted(missing)}")
+    exec(compile(ast.Module(body=found, type_ignores=[]), f"<{notebook}>", "exec"), namespace)
+    return namespace
+
+
+def pipeline_functions(data_dir: str) -> dict:
+    """The notebook functions the stages call, by name."""
+    namespace = {"pd": pd, "np": np, "json": json, "os": os, "glob": glob, "datetime": datetime, "DATA_DIR": data_dir}
+    notebook_functions("01_data_clean.ipynb", ["parse_dat_file", "process_year"], namespace)
+    notebook_functions("05_quarterly_analysis_split.ipynb", [
+        "transform_properties", "add_quarter_info", "apply_exponential_smoothing", "create_quarterly_stats",
+        "create_suburb_analytics", "add_quarterly_json", "calculate_scores", "add_rankings",
+    ], namespace)
+    notebook_functions("06_store_data.ipynb", ["prepare_quarterly_stats", "prepare_analytics"], namespace)
+    return namespace
+
+
+class PeakRSS:
+    """Samples the process RSS on a thread; peak is the highest seen while entered."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            time.sleep(RSS_INTERVAL)
+
+    def __enter__(self):
+        self.peak = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def stage_parse(fn, years):
+    """Notebook 01: parse each year's files, merging late records into their year."""
+    frames, cached = [], []
+    for year in years:
+        df, cache_df = fn["process_year"](year, cache_mismatched=True)
+        if df is not None:
+            frames.append(df)
+        if cache_df is not None:
+            cached.append(cache_df)
+    late = pd.concat(cached, ignore_index=True) if cached else None
+    if late is not None:
+        frames.append(late[late["settlement_date"].dt.year.isin(years)])
+    df_all = pd.concat(frames, ignore_index=True)
+    return df_all, len(df_all)
+
+
+def stage_filter(df_all, sydney_suburbs):
+    """Notebook 02: Sydney localities, residential only, split into houses and units."""
+    sydney_suburbs = [sub.lower() for sub in sydney_suburbs]
+    df_sydney = df_all[df_all["property_locality"].str.lower().isin(sydney_suburbs)].copy()
+    df_sydney = df_sydney[df_sydney["nature_of_property"] == "R"]
+
+    unit_num_series = df_sydney["property_unit_number"].astype(str)
+    strata_series = df_sydney["strata_lot_number"].astype(str)
+    has_unit_num = (unit_num_series != "nan") & (unit_num_series != "") & (unit_num_series.notna())
+    has_strata = (strata_series != "nan") & (strata_series != "") & (strata_series.notna())
+    units_mask = has_unit_num | has_strata
+    return (df_sydney[~units_mask].copy(), df_sydney[units_mask].copy()), len(df_sydney)
+
+
+def stage_quarterly(fn, split):
+    """Notebook 05 up to smoothing: properties and smoothed quarterly stats per type."""
+    out = {}
+    for property_type, raw in zip(["house", "unit"], split):
+        df = fn["add_quarter_info"](fn["transform_properties"](raw, property_type))
+        stats = fn["create_quarterly_stats"](df, property_type)
+        stats = fn["apply_exponential_smoothing"](stats, alpha=EXPONENTIAL_ALPHA)
+        stats["sale_price_median_price_raw"] = stats["sale_price_median_price"]
+        stats["sale_price_median_price"] = stats["sale_price_median_price_smoothed"]
+        out[property_type] = (df, stats)
+    return out, sum(len(stats) for _, stats in out.values())
+
+
+def stage_analytics(fn, quarterly):
+    """Notebook 05 from suburb analytics to rankings, per type."""
+    out = {}
+    for property_type, (df, stats) in quarterly.items():
+        analytics = fn["create_suburb_analytics"](df, stats, property_type)
+        analytics = fn["add_quarterly_json"](analytics, stats, property_type)
+        analytics = fn["calculate_scores"](analytics, stats, property_type)
+        out[property_type] = fn["add_rankings"](analytics, property_type)
+    return out, sum(len(analytics) for analytics in out.values())
+
+
+def stage_db_load(fn, quarterly, analytics, db_path):
+    """Notebook 06: create the schema and insert the three base tables."""
+    init_database(db_path=db_path, schema_path=str(SCHEMA_PATH))
+
+    properties = pd.concat([df for df, _ in quarterly.values()], ignore_index=True)
+    properties["listing_date"] = None
+    properties["days_on_market"] = None
+    properties_db = properties[[
+        "property_id", "suburb", "postcode", "district", "property_type",
+        "listing_date", "contract_date", "settlement_date",
+        "sale_price", "days_on_market", "contract_to_settlement_days",
+    ]]
+    all_quarterly = pd.concat(
+        [fn["prepare_quarterly_stats"](stats, t) for t, (_, stats) in quarterly.items()], ignore_index=True
+    )
+    all_analytics = pd.concat(
+        [fn["prepare_analytics"](df, t) for t, df in analytics.items()], ignore_index=True
+    )
+
+    conn = sqlite3.connect(db_path)
+    properties_db.to_sql("properties", conn, if_exists="append", index=False, method="multi", chunksize=10000)
+    all_quarterly.to_sql("suburb_quarterly", conn, if_exists="append", index=False, method="multi", chunksize=10000)
+    all_analytics.to_sql("suburb_analytics", conn, if_exists="append", index=False, method="multi", chunksize=1000)
+    conn.commit()
+    conn.close()
+    return None, len(properties_db) + len(all_quarterly) + len(all_analytics)
+
+
+def stage_derived(db_path):
+    """build_derived_tables, as the last cell of notebook 06 runs it."""
+    build_derived_tables(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    rows = sum(conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables)
+    conn.close()
+    return None, rows
+
+
+def run_stage(results, name, rows_in, stage, *args, quiet=True):
+    """Time one stage and record it in results; returns the stage's output."""
+    gc.collect()
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            # The notebooks print progress and silence warnings
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            stack.enter_context(warnings.catch_warnings())
+            warnings.simplefilter("ignore")
+        rss = stack.enter_context(PeakRSS())
+        start_rss = rss.peak
+        started = time.perf_counter()
+        output, rows_out = stage(*args)
+        elapsed = time.perf_counter() - started
+
+    results[name] = {
+        "seconds": round(elapsed, 3),
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "rows_per_second": round(rows_in / elapsed) if elapsed > 0 else None,
+        "start_rss_mb": round(start_rss / 1024 ** 2, 1),
+        "peak_rss_mb": round(rss.peak / 1024 ** 2, 1),
+    }
+    print(f"  {name:<10} {elapsed:>8.2f}s {results[name]['rows_per_second'] or 0:>12,} rows/s "
+          f"{results[name]['peak_rss_mb']:>9.1f} MB peak", file=sys.stderr)
+    return output
+
+
+def compare(results: dict, baseline_path: str):
+    """Print each stage's time and peak RSS against an earlier run."""
+    baseline = json.loads(Path(baseline_path).read_text())["stages"]
+    print(f"\n{'stage':<10}{'seconds':>10}{'vs base':>10}{'peak MB':>10}{'vs base':>10}")
+    for name, stage in results["stages"].items():
+        base = baseline.get(name)
+        time_change = f"{stage['seconds'] / base['seconds']:.2f}x" if base and base["seconds"] else "-"
+        rss_change = f"{stage['peak_rss_mb'] - base['peak_rss_mb']:+.0f}" if base else "-"
+        print(f"{name:<10}{stage['seconds']:>10.2f}{time_change:>10}{stage['peak_rss_mb']:>10.0f}{rss_change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the .DAT to database pipeline per stage")
+    parser.add_argument("--data-dir", default="data/synthetic", help="Directory of {year}/*.DAT files")
+    parser.add_argument("--suburbs", help="Sydney suburbs JSON (default: <data-dir>/sydney_burbs.json)")
+    parser.add_argument("--years", nargs="+", type=int, help="Years to parse (default: every year directory)")
+    parser.add_argument("--db-path", help="Database to build (default: a temporary file)")
+    parser.add_argument("--skip-derived", action="store_true")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the notebook functions' output")
+    args = parser.parse_args()
+
+    years = args.years or sorted(int(p.name) for p in Path(args.data_dir).iterdir() if p.name.isdigit())
+    suburbs_path = args.suburbs or os.path.join(args.data_dir, "sydney_burbs.json")
+    sydney_suburbs = json.loads(Path(suburbs_path).read_text())["suburbs"]
+    dat_files = [f for year in years for f in glob.glob(f"{args.data_dir}/{year}/*.[dD][aA][tT]")]
+    dat_bytes = sum(os.path.getsize(f) for f in dat_files)
+    b_records = 0
+    for path in dat_files:
+        with open(path, "rb") as f:
+            b_records += sum(1 for line in f if line.startswith(b"B"))
+
+    fn = pipeline_functions(args.data_dir)
+    tmp_dir = tempfile.TemporaryDirectory()
+    db_path = args.db_path or os.path.join(tmp_dir.name, "database.sqlite")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    stages = {}
+    quiet = not args.verbose
+    started = time.perf_counter()
+    df_all = run_stage(stages, "parse", b_records, lambda: stage_parse(fn, years), quiet=quiet)
+    split = run_stage(stages, "filter", len(df_all), stage_filter, df_all, sydney_suburbs, quiet=quiet)
+    del df_all
+    quarterly = run_stage(stages, "quarterly", sum(len(df) for df in split), stage_quarterly, fn, split, quiet=quiet)
+    del split
+    properties = sum(len(df) for df, _ in quarterly.values())
+    analytics = run_stage(stages, "analytics", properties, stage_analytics, fn, quarterly, quiet=quiet)
+    loaded = properties + sum(len(s) for _, s in quarterly.values()) + sum(len(a) for a in analytics.values())
+    run_stage(stages, "db_load", loaded, stage_db_load, fn, quarterly, analytics, db_path, quiet=quiet)
+    if not args.skip_derived:
+        run_stage(stages, "derived", properties, stage_derived, db_path, quiet=quiet)
+    tmp_dir.cleanup()
+
+    results = {
+        "input": {
+            "data_dir": args.data_dir,
+            "years": years,
+            "dat_files": len(dat_files),
+            "dat_mb": round(dat_bytes / 1024 ** 2, 1),
+            "b_records": b_records,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+        },
+        "stages": stages,
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": max(stage["peak_rss_mb"] for stage in stages.values()),
+    }
+    text = json.dumps(results, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text)
+    else:
+        print(text, end="")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the storage backends against the same repository calls.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_storage \
+        --sqlite sqlite:///src/db/database.sqlite \
+        --parquet parquet:///data/transformed_split
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db.parquet_repository import ParquetRepository
+from src.db.sqlite_repository import SQLiteRepository
+
+
+def workload(suburb: str):
+    """Repository calls mirroring the routes hit by the frontend."""
+    return {
+        "list_properties": lambda repo: repo.list_properties(suburb=suburb, property_type="house"),
+        "list_properties_range": lambda repo: repo.list_properties(min_price=1_000_000, max_price=2_000_000),
+        "property_stats": lambda repo: repo.property_stats(suburb=suburb),
+        "property_stats_all": lambda repo: repo.property_stats(),
+        "list_quarterly": lambda repo: repo.list_quarterly(year=2024),
+        "suburb_quarterly": lambda repo: repo.suburb_quarterly(suburb),
+        "list_analytics": lambda repo: repo.list_analytics(sort_by="price_rank", limit=1000),
+        "suburb_analytics": lambda repo: repo.suburb_analytics(suburb),
+        "search_suburbs": lambda repo: repo.search_suburbs(suburb[:3]),
+    }
+
+
+def run(repo, suburb: str, repeat: int):
+    """Time each workload call, returning median/p95 milliseconds per call."""
+    results = {}
+    for name, call in workload(suburb).items():
+        call(repo)  # warm caches
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call(repo)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            "median_ms": statistics.median(timings),
+            "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite vs Parquet repositories")
+    parser.add_argument("--sqlite", default="sqlite:///src/db/database.sqlite")
+    parser.add_argument("--parquet", default="parquet:///data/transformed_split")
+    parser.add_argument("--suburb", default="NEWTOWN")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.sqlite, connect_args={"check_same_thread": False})
+    sqlite_repo = SQLiteRepository(sessionmaker(bind=engine)())
+
+    start = time.perf_counter()
+    parquet_repo = ParquetRepository.from_url(args.parquet)
+    print(f"Parquet repository loaded in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    sqlite_results = run(sqlite_repo, args.suburb, args.repeat)
+    parquet_results = run(parquet_repo, args.suburb, args.repeat)
+    sqlite_repo.close()
+
+    print(f"{'call':<24}{'sqlite p50':>12}{'parquet p50':>13}{'sqlite p95':>12}{'parquet p95':>13}")
+    for name in sqlite_results:
+        s, p = sqlite_results[name], parquet_results[name]
+        print(f"{name:<24}{s['median_ms']:>10.2f}ms{p['median_ms']:>11.2f}ms{s['p95_ms']:>10.2f}ms{p['p95_ms']:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Generate synthetic Valuer-General bulk sales (.DAT) files at any scale.
+
+Writes the `{output}/{year}/*.DAT` layout notebooks/01_data_clean.ipynb reads:
+one file per district per weekly download, each an A header, a B record per
+sale followed by its C (legal description) and D (purchaser/vendor) records,
+and a Z trailer, all `;`-separated like the real files. Alongside it writes
+sydney_burbs.json in the format notebooks/02_data_filter.ipynb filters with.
+
+The data is shaped like the real thing where the pipeline cares:
+
+- A fixed population of properties is resold across years, so property_id
+  repeats (repeat-sales pairs) and suburbs differ in size.
+- Sydney and regional localities, residential (R), vacant (V) and other (3)
+  natures; units carry a strata lot and usually a unit number.
+- Prices follow a per-suburb level and growth rate with sale-level noise;
+  settlement is 0-90 days after contract.
+- Some records are dirty the way real ones are: settled in the previous
+  year (cached and merged by process_year), settlement before contract,
+  zero price.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.generate_dat --output data/synthetic \
+        --start-year 2015 --end-year 2024 --sales-per-year 100000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# Real suburb names come first so the synthetic dataset reads like the real one
+SYDNEY_NAMES = [
+    "NEWTOWN", "TEMPE", "MARRICKVILLE", "PADDINGTON", "SURRY HILLS", "BONDI", "COOGEE",
+    "RANDWICK", "MANLY", "MOSMAN", "CHATSWOOD", "RYDE", "PARRAMATTA", "BLACKTOWN",
+    "PENRITH", "LIVERPOOL", "CAMPBELLTOWN", "HORNSBY", "CRONULLA", "MIRANDA",
+    "BANKSTOWN", "AUBURN", "STRATHFIELD", "BURWOOD", "ASHFIELD", "LEICHHARDT",
+    "BALMAIN", "GLEBE", "ULTIMO", "PYRMONT", "REDFERN", "WATERLOO", "ZETLAND",
+    "MASCOT", "ROCKDALE", "KOGARAH", "HURSTVILLE", "EPPING", "CASTLE HILL", "KELLYVILLE",
+]
+REGIONAL_NAMES = [
+    "ELRINGTON", "NEWCASTLE", "WOLLONGONG", "GOSFORD", "ORANGE", "BATHURST", "DUBBO",
+    "TAMWORTH", "ARMIDALE", "LISMORE", "BALLINA", "COFFS HARBOUR", "PORT MACQUARIE",
+    "WAGGA WAGGA", "ALBURY", "GOULBURN", "NOWRA", "KIAMA", "MUDGEE", "CESSNOCK",
+]
+STREETS = [
+    "LAKE RD", "KING ST", "GEORGE ST", "VICTORIA RD", "PARK AVE", "CHURCH ST", "STATION ST",
+    "HIGH ST", "BAY ST", "OCEAN ST", "RAILWAY PDE", "PACIFIC HWY", "HILL ST", "BRIDGE RD",
+    "FOREST RD", "QUEEN ST", "ELIZABETH ST", "WILLIAM ST", "JOHN ST", "MARY ST",
+]
+
+# Property kinds and what their B records carry
+HOUSE, UNIT, VACANT, OTHER = 0, 1, 2, 3
+NATURE = {HOUSE: "R", UNIT: "R", VACANT: "V", OTHER: "3"}
+PURPOSE = {HOUSE: "RESIDENCE", UNIT: "RESIDENCE", VACANT: "VACANT LAND", OTHER: "SHOP"}
+ZONING = {HOUSE: "R2", UNIT: "R4", VACANT: "R2", OTHER: "B2"}
+KIND_PRICE = {HOUSE: 1.0, UNIT: 0.55, VACANT: 0.6, OTHER: 1.3}
+
+# Sales per property over the generated span, on average
+SALES_PER_PROPERTY = 2.5
+
+# Suburbs per Valuer-General district
+SUBURBS_PER_DISTRICT = 10
+
+# Share of records in a year's files settled in the previous year
+LATE_SHARE = 0.02
+
+# Shares of records that the pipeline filters out as invalid
+SETTLED_BEFORE_CONTRACT_SHARE = 0.005
+ZERO_PRICE_SHARE = 0.005
+
+
+def suburb_names(count: int, prefix: str, real: list) -> list:
+    """count names: the real ones first, then numbered synthetic ones."""
+    return (real + [f"{prefix} {i}" for i in range(len(real) + 1, count + 1)])[:count]
+
+
+class Population:
+    """The properties sold over the generated span and their fixed attributes."""
+
+    def __init__(self, args, rng: np.random.Generator):
+        num_sydney = max(1, round(args.suburbs * args.sydney_share))
+        self.suburbs = (
+            suburb_names(num_sydney, "SYDNEY SUBURB", SYDNEY_NAMES) +
+            suburb_names(args.suburbs - num_sydney, "REGIONAL TOWN", REGIONAL_NAMES)
+        )
+        self.sydney = self.suburbs[:num_sydney]
+        num_suburbs = len(self.suburbs)
+        self.postcodes = np.where(
+            np.arange(num_suburbs) < num_sydney,
+            2000 + np.arange(num_suburbs) % 235,
+            2250 + np.arange(num_suburbs) % 630,
+        )
+        self.districts = 1 + np.arange(num_suburbs) // SUBURBS_PER_DISTRICT
+
+        # Suburb price level (Sydney dearer) and yearly growth
+        self.base_price = np.exp(rng.normal(13.5, 0.4, num_suburbs)) * np.where(
+            np.arange(num_suburbs) < num_sydney, 1.6, 1.0
+        )
+        self.growth = rng.normal(0.06, 0.02, num_suburbs)
+
+        # Properties, with suburbs of Zipf-like sizes
+        years = args.end_year - args.start_year + 1
+        num_properties = max(num_suburbs, int(args.sales_per_year * years / SALES_PER_PROPERTY))
+        weights = 1 / np.arange(1, num_suburbs + 1) ** 0.8
+        self.suburb = np.sort(rng.choice(num_suburbs, num_properties, p=weights / weights.sum()))
+        self.property_id = 1_000_000 + rng.choice(9_000_000, num_properties, replace=False)
+
+        kind = rng.random(num_properties)
+        other = args.non_residential_share
+        self.kind = np.select(
+            [kind < args.unit_share, kind < args.unit_share + other / 2, kind < args.unit_share + other],
+            [UNIT, VACANT, OTHER],
+            HOUSE,
+        )
+        self.quality = np.exp(rng.normal(0, 0.25, num_properties))
+        self.house_number = rng.integers(1, 400, num_properties)
+        self.street = rng.integers(0, len(STREETS), num_properties)
+        self.unit_number = np.where(rng.random(num_properties) < 0.8, rng.integers(1, 120, num_properties), 0)
+        self.strata_lot = rng.integers(1, 200, num_properties)
+        self.area = np.where(self.kind == UNIT, 0.0, np.round(rng.lognormal(6.2, 0.4, num_properties), 1))
+        self.plan = rng.integers(10_000, 1_200_000, num_properties)
+
+    def b_record(self, p: int, district: int, stamp: str, contract: date, settlement: date, price: int, dealing: str):
+        kind = self.kind[p]
+        unit = kind == UNIT
+        fields = [
+            "B", f"{district:03d}", str(self.property_id[p]), "1", stamp, "",
+            str(self.unit_number[p]) if unit and self.unit_number[p] else "",
+            str(self.house_number[p]), STREETS[self.street[p]], self.suburbs[self.suburb[p]],
+            str(self.postcodes[self.suburb[p]]),
+            "" if unit else f"{self.area[p]:g}", "" if unit else "M",
+            contract.strftime("%Y%m%d"), settlement.strftime("%Y%m%d"), str(price),
+            ZONING[kind], NATURE[kind], PURPOSE[kind],
+            str(self.strata_lot[p]) if unit else "", "AAI", "", "0", dealing, "",
+        ]
+        return ";".join(fields)
+
+
+def sales_for_year(population: Population, year: int, args, rng: np.random.Generator):
+    """The year's sales as arrays: property, settlement and contract dates, price."""
+    n = args.sales_per_year
+    properties = rng.integers(0, len(population.suburb), n)
+
+    start = date(year, 1, 1)
+    days_in_year = (date(year + 1, 1, 1) - start).days
+    settlement_day = rng.integers(0, days_in_year, n)
+    late = rng.random(n) < LATE_SHARE
+    settlement_day[late] = -rng.integers(1, 60, late.sum())
+    contract_day = settlement_day - rng.integers(0, 91, n)
+    swapped = rng.random(n) < SETTLED_BEFORE_CONTRACT_SHARE
+    contract_day[swapped] = settlement_day[swapped] + rng.integers(1, 30, swapped.sum())
+
+    suburbs = population.suburb[properties]
+    elapsed = (year - args.start_year) + settlement_day / days_in_year
+    price = (
+        population.base_price[suburbs] *
+        np.vectorize(KIND_PRICE.get)(population.kind[properties]) *
+        population.quality[properties] *
+        np.exp(population.growth[suburbs] * elapsed + rng.normal(0, 0.1, n))
+    )
+    price = np.round(price, -3).astype(np.int64)
+    price[rng.random(n) < ZERO_PRICE_SHARE] = 0
+    return properties, settlement_day, contract_day, price
+
+
+def write_year(population: Population, year: int, args, rng: np.random.Generator) -> int:
+    """Write one year's weekly per-district files. Returns bytes written."""
+    properties, settlement_day, contract_day, price = sales_for_year(population, year, args, rng)
+    start = date(year, 1, 1)
+
+    # Each sale is downloaded in the week after it settled (late ones in week 0)
+    week = np.clip((settlement_day + rng.integers(1, 8, len(properties))) // 7, 0, 51)
+    district = population.districts[population.suburb[properties]]
+    order = np.lexsort((district, week))
+    dealings = rng.integers(100_000, 999_999, len(properties))
+
+    year_dir = os.path.join(args.output, str(year))
+    os.makedirs(year_dir, exist_ok=True)
+    written = 0
+    boundaries = np.flatnonzero(np.diff(week[order] * 1000 + district[order])) + 1
+    for group in np.split(order, boundaries):
+        file_week, file_district = int(week[group[0]]), int(district[group[0]])
+        downloaded = start + timedelta(days=7 * file_week)
+        stamp = downloaded.strftime("%Y%m%d") + " 01:07"
+
+        lines = [f"A;RTSALEDATA;{file_district:03d};{stamp};VALNET;"]
+        for i in group:
+            p = properties[i]
+            pid = population.property_id[p]
+            lines.append(population.b_record(
+                p, file_district, stamp,
+                start + timedelta(days=int(contract_day[i])),
+                start + timedelta(days=int(settlement_day[i])),
+                int(price[i]), f"AS{dealings[i]}",
+            ))
+            lines.append(f"C;{file_district:03d};{pid};1;{stamp};{population.strata_lot[p]}/DP{population.plan[p]};")
+            lines.append(f"D;{file_district:03d};{pid};1;{stamp};P;;;;;;;;")
+            lines.append(f"D;{file_district:03d};{pid};1;{stamp};V;;;;;;;;")
+        lines.append(f"Z;{len(lines) + 1};{len(group)};{len(group)};{2 * len(group)};")
+
+        path = os.path.join(year_dir, f"{file_district:03d}_SALES_DATA_NNME_{downloaded:%d%m%Y}.DAT")
+        text = "\n".join(lines) + "\n"
+        with open(path, "w", encoding="latin-1") as f:
+            f.write(text)
+        written += len(text)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Valuer-General .DAT files")
+    parser.add_argument("--output", default="data/synthetic")
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--sales-per-year", type=int, default=100_000)
+    parser.add_argument("--suburbs", type=int, default=400)
+    parser.add_argument("--sydney-share", type=float, default=0.6, help="Share of suburbs in Sydney")
+    parser.add_argument("--unit-share", type=float, default=0.35)
+    parser.add_argument("--non-residential-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    population = Population(args, rng)
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, "sydney_burbs.json"), "w") as f:
+        json.dump({"suburbs": [name.title() for name in population.sydney]}, f, indent=2)
+
+    total = 0
+    for year in range(args.start_year, args.end_year + 1):
+        total += write_year(population, year, args, rng)
+        print(f"  {year}: {args.sales_per_year:,} sales")
+
+    print(
+        f"Wrote {args.sales_per_year * (args.end_year - args.start_year + 1):,} sales "
+        f"({total / 1024 ** 2:.1f} MB) to {args.output} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""HTTP caching for the read-only API: ETags, 304s and versioned URLs.
+
+Every /api/ GET response is a function of the request URL and the dataset
+being served and the code serving it, so its validator can be computed
+before the route runs: the ETag is the API version (dataset version plus
+source hash) and a hash of the path, query string and Accept-Encoding. A
+matching If-None-Match is answered with 304 Not Modified without calling the
+route at all; "If-None-Match: *" is ignored, since whether the route would
+answer 200 is not known until it runs.
+
+Paths may also carry the API version, /api/v/{version}/..., for clients that
+learned it from /api/dataset. Those URLs can never change meaning, even
+across deploys that change a response's shape, so they are served with a
+year-long immutable Cache-Control; an unknown version is a 404. Unversioned
+responses are sent with no-cache, i.e. revalidate with the ETag on every use.
+"""
+import hashlib
+import json
+from typing import List, Optional
+
+from ..db.dataset import dataset_version
+from .snapshot import code_version
+
+API_PREFIX = "/api/"
+VERSIONED_PREFIX = "/api/v/"
+
+IMMUTABLE = b"public, max-age=31536000, immutable"
+REVALIDATE = b"no-cache"
+
+
+def api_version() -> str:
+    """Dataset version plus source hash: what a GET response is a function of besides its URL."""
+    return f"{dataset_version()}-{code_version()}"
+
+
+def etag(path: str, query_string: bytes, accept_encoding: bytes) -> str:
+    """Strong ETag of a GET response under the current API version."""
+    digest = hashlib.sha256()
+    for part in (path.encode(), query_string, accept_encoding):
+        digest.update(part)
+        digest.update(b"\0")
+    return f'"{api_version()}-{digest.hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: str, tag: str) -> bool:
+    """
+    Whether an If-None-Match header matches a tag (weak comparison, per RFC 9110).
+
+    "*" never matches: it asks for 304 whenever a current representation
+    exists, and an unknown suburb or route has none.
+    """
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == tag for candidate in candidates)
+
+
+def _header(headers: List, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding ETags, 304 handling and versioned paths to /api/ GETs."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        cache_control = REVALIDATE
+        if path.startswith(VERSIONED_PREFIX):
+            version, _, rest = path[len(VERSIONED_PREFIX):].partition("/")
+            current = api_version()
+            if version != current:
+                await _send_json(send, 404, {"detail": f"Unknown API version: {version}", "current": current})
+                return
+            path = API_PREFIX + rest
+            scope = dict(scope, path=path, raw_path=path.encode())
+            cache_control = IMMUTABLE
+
+        headers = scope["headers"]
+        tag = etag(path, scope["query_string"], _header(headers, b"accept-encoding") or b"").encode()
+        if_none_match = _header(headers, b"if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match.decode("latin-1"), tag.decode()):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", tag), (b"cache-control", cache_control)],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = [
+                    (key, value) for key, value in message.get("headers", [])
+                    if not (cache_control is IMMUTABLE and key.lower() == b"cache-control")
+                ]
+                if _header(response_headers, b"cache-control") is None:
+                    response_headers.append((b"cache-control", cache_control))
+                response_headers.append((b"etag", tag))
+                message = dict(message, headers=response_headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+
+async def _send_json(send, status: int, content) -> None:
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
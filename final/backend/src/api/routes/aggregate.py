@@ -0,0 +1,83 @@
+"""Ad-hoc aggregation endpoints."""
+import time
+from datetime import date
+from fastapi import APIRouter, Query, HTTPException
+from typing import Optional
+
+from ..schemas import AggregateResponse
+from ..utils import validate_property_type
+from ...config import AGGREGATE_MAX_GROUPS
+from ...services.aggregate import (
+    AggregateError,
+    QueryBudgetExceeded,
+    run_aggregate,
+)
+
+router = APIRouter(prefix="/api/aggregate", tags=["aggregate"])
+
+
+def _split(value: Optional[str]):
+    """Split a comma-separated query parameter into trimmed, non-empty parts."""
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+
+@router.get("", response_model=AggregateResponse)
+def aggregate(
+    group_by: Optional[str] = Query(None, description="Comma-separated dimensions: suburb, postcode, district, property_type, year, quarter, month"),
+    aggregates: str = Query("count,median", description="Comma-separated aggregates: count, mean, median, fast_settlement_share or pNN percentiles (e.g. p90)"),
+    metric: str = Query("sale_price", description="Value to aggregate (sale_price/contract_to_settlement_days)"),
+    suburb: Optional[str] = Query(None, description="Filter by suburb"),
+    postcode: Optional[str] = Query(None, description="Filter by postcode"),
+    district: Optional[str] = Query(None, description="Filter by district code"),
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
+    min_price: Optional[float] = Query(None, description="Minimum sale price"),
+    max_price: Optional[float] = Query(None, description="Maximum sale price"),
+    start_date: Optional[date] = Query(None, description="Start settlement date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End settlement date (YYYY-MM-DD)"),
+    limit: int = Query(1000, ge=1, le=AGGREGATE_MAX_GROUPS, description="Maximum number of groups returned"),
+):
+    """
+    Group property sales by any combination of dimensions and aggregate a metric.
+
+    Runs on in-memory column arrays of the properties table, not the
+    database. Queries that run past the configured time budget fail with 503.
+    """
+    validate_property_type(property_type)
+
+    started = time.perf_counter()
+    dimensions = _split(group_by)
+    requested = _split(aggregates)
+    if not requested:
+        raise HTTPException(status_code=400, detail="At least one aggregate is required")
+
+    try:
+        result = run_aggregate(
+            dimensions,
+            requested,
+            metric=metric,
+            filters={
+                "suburb": suburb,
+                "postcode": postcode,
+                "district": district,
+                "property_type": property_type,
+                "min_price": min_price,
+                "max_price": max_price,
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+            max_groups=limit,
+        )
+    except AggregateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryBudgetExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return AggregateResponse(
+        group_by=dimensions,
+        metric=metric,
+        aggregates=requested,
+        rows=result["rows"],
+        total_groups=result["total_groups"],
+        truncated=result["truncated"],
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
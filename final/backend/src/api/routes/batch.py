@@ -0,0 +1,89 @@
+"""Batch request endpoints."""
+import json
+import time
+from typing import Any, Tuple
+from urllib.parse import unquote, urlsplit
+
+from fastapi import APIRouter, HTTPException, Request
+
+from ..schemas import BatchRequest, BatchResponse, BatchResponseItem
+from ...config import BATCH_MAX_REQUESTS
+from ...db.repository import shared_repository
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+
+async def _dispatch(request: Request, path: str) -> Tuple[int, Any]:
+    """
+    Run one GET through the app in-process, as the ASGI server would.
+
+    Returns:
+        (status code, decoded body)
+    """
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": unquote(url.path),
+        "raw_path": url.path.encode("latin-1"),
+        "query_string": url.query.encode("latin-1"),
+        "headers": [(b"accept", b"application/json")],
+    }
+    start = {}
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app re-raises unhandled errors after sending its 500 response
+        if not start:
+            raise
+
+    body = b"".join(chunks)
+    headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in start.get("headers", [])}
+    if headers.get("content-type", "").startswith("application/json"):
+        return start["status"], json.loads(body) if body else None
+    return start["status"], body.decode("utf-8", errors="replace")
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several GET requests to the API in one round trip.
+
+    Sub-requests run in order on one shared repository (a single database
+    session), and each reports the status and body it would have returned on
+    its own. A failing sub-request does not fail the batch.
+    """
+    if len(batch.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+
+    started = time.perf_counter()
+    responses = []
+    with shared_repository():
+        for item in batch.requests:
+            if not item.path.startswith("/api/") or item.path.startswith(router.prefix):
+                status, body = 400, {"detail": "path must be an /api/ GET route other than /api/batch"}
+            else:
+                try:
+                    status, body = await _dispatch(request, item.path)
+                except Exception as e:
+                    status, body = 500, {"detail": f"Internal error: {e}"}
+            responses.append(BatchResponseItem(id=item.id, path=item.path, status=status, body=body))
+
+    return BatchResponse(responses=responses, elapsed_ms=(time.perf_counter() - started) * 1000)
@@ -0,0 +1,76 @@
+"""Dataset change feed endpoints."""
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..schemas import ChangesResponse, DataChange
+from ...db.async_repository import AsyncRepository, get_async_repository
+from ...db.dataset import dataset_version
+from ...db.repository import CHANGE_TABLES
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+KEY_FIELDS = ["table_name", "suburb", "property_type", "year", "quarter", "month"]
+
+
+def _net_changes(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse log entries (oldest first) to one change per row.
+
+    A row counts as added if it did not exist at the first entry and does
+    now, removed if the reverse, and changed if it exists at both ends; a
+    row added and removed again in between is left out.
+    """
+    first: Dict[tuple, str] = {}
+    last: Dict[tuple, str] = {}
+    for entry in entries:
+        key = tuple(entry[field] for field in KEY_FIELDS)
+        first.setdefault(key, entry["change"])
+        last[key] = entry["change"]
+
+    changes = []
+    for key, change in last.items():
+        existed = first[key] != "added"
+        exists = change != "removed"
+        if not existed and not exists:
+            continue
+        net = "changed" if existed and exists else ("added" if exists else "removed")
+        changes.append(dict(zip(KEY_FIELDS, key), change=net))
+
+    changes.sort(key=lambda c: tuple((v is None, v) for v in (c[field] for field in KEY_FIELDS)))
+    return changes
+
+
+@router.get("", response_model=ChangesResponse)
+async def list_changes(
+    since: str = Query(..., description="Dataset version the client holds (from /api/dataset)"),
+    table: Optional[str] = Query(None, description=f"Only changes to one table: {', '.join(CHANGE_TABLES)}"),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """
+    List the rows added, changed or removed since a dataset version.
+
+    A client that cached data under an earlier version refreshes only
+    these rows, e.g. with /api/quarterly?suburb=&property_type=&year=&quarter=
+    for a suburb_quarterly change, instead of downloading everything again.
+    The log reaches back a limited number of versions (see
+    db/build_changes.py); a version it does not cover is a 404, and the
+    client should then download the data in full.
+    """
+    if table is not None and table not in CHANGE_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of: {', '.join(CHANGE_TABLES)}")
+
+    version = dataset_version()
+    if since == version:
+        return ChangesResponse(since=since, version=version, items=[], total=0)
+
+    positions = {row["version"]: row["position"] for row in await repo.change_history()}
+    if since not in positions:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No change log from dataset version {since} to {version}: download the data in full",
+        )
+
+    changes = _net_changes(await repo.change_log(positions[since], table=table))
+    items = [DataChange(table=c.pop("table_name"), **c) for c in changes]
+    return ChangesResponse(since=since, version=version, items=items, total=len(items))
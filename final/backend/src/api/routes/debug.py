@@ -0,0 +1,60 @@
+"""Memory debugging endpoints (served with DEBUG_ENDPOINTS=1)."""
+import os
+import tracemalloc
+
+from fastapi import APIRouter, Query, HTTPException
+
+from ..schemas import MemoryResponse, TracemallocResponse
+from ... import memory
+from ...config import SQLITE_CACHE_MB, SQLITE_MMAP_MB
+from ...serve import memory_report
+
+router = APIRouter(prefix="/debug/memory", tags=["debug"])
+
+
+@router.get("", response_model=MemoryResponse)
+def get_memory():
+    """
+    Memory of this process and of every accounted in-process structure.
+
+    Under the pre-fork launcher each request is answered by one worker; pid
+    says which. Budgets apply per process.
+    """
+    process = memory_report([os.getpid()])[0]
+    return MemoryResponse(
+        **process,
+        sqlite_cache_mb=SQLITE_CACHE_MB,
+        sqlite_mmap_mb=SQLITE_MMAP_MB,
+        tracing=tracemalloc.is_tracing(),
+        **memory.memory_usage(),
+    )
+
+
+@router.post("/tracemalloc")
+def start_tracemalloc(
+    frames: int = Query(1, ge=1, le=50, description="Traceback frames kept per allocation"),
+):
+    """Start tracing allocations (restarting it if already on); slows the process until stopped."""
+    memory.start_tracing(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/tracemalloc", response_model=TracemallocResponse)
+def get_tracemalloc(
+    group_by: str = Query("lineno", description="Group allocations by lineno, filename or traceback"),
+    limit: int = Query(25, ge=1, le=500, description="Number of groups returned"),
+    compare: bool = Query(False, description="Report the change since the previous snapshot"),
+):
+    """Snapshot of the allocations traced since tracing started, largest first."""
+    try:
+        result = memory.traced_allocations(group_by=group_by, limit=limit, compare=compare)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TracemallocResponse(group_by=group_by, compare=compare, **result)
+
+
+@router.delete("/tracemalloc")
+def stop_tracemalloc():
+    """Stop tracing allocations and free tracemalloc's bookkeeping."""
+    memory.stop_tracing()
+    return {"tracing": False}
@@ -0,0 +1,32 @@
+"""Forecast endpoints."""
+from fastapi import APIRouter, Query, HTTPException
+
+from ..schemas import ForecastResponse
+from ..utils import validate_property_type
+from ...services.forecast import MAX_HORIZON, MIN_OBSERVATIONS, forecast
+
+router = APIRouter(prefix="/api/forecast", tags=["forecast"])
+
+
+@router.get("/{suburb}", response_model=ForecastResponse)
+def get_suburb_forecast(
+    suburb: str,
+    property_type: str = Query("house", description="Property type (house/unit)"),
+    horizon: int = Query(4, ge=1, le=MAX_HORIZON, description="Quarters ahead to forecast"),
+):
+    """
+    Forecast a suburb's quarterly median price with 80% and 95% prediction intervals.
+
+    Every suburb series is fitted once per dataset version with a damped-trend
+    seasonal model; a request only evaluates the stored state.
+    """
+    validate_property_type(property_type, required=True)
+
+    result = forecast(suburb, property_type, horizon)
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Not enough quarterly data (at least {MIN_OBSERVATIONS} quarters) to forecast suburb: {suburb}",
+        )
+
+    return ForecastResponse(suburb=suburb, property_type=property_type, **result)
@@ -0,0 +1,66 @@
+"""Suburb boundary geometry endpoints."""
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+
+from ..schemas import GeometryManifestResponse
+from ...services.geometry import (
+    GEOMETRY_FORMATS,
+    EncodingNotAcceptable,
+    GeometryNotBuilt,
+    accepted_encodings,
+    geometry_body,
+    geometry_manifest,
+    level_for_zoom,
+)
+
+router = APIRouter(prefix="/api/geometry", tags=["geometry"])
+
+# Boundaries only change when the build step is rerun
+GEOMETRY_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _manifest():
+    """Load the manifest, mapping a missing build to 404."""
+    try:
+        return geometry_manifest()
+    except GeometryNotBuilt as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("", response_model=GeometryManifestResponse)
+def get_geometry_levels():
+    """List the built levels of detail with their point counts and sizes per encoding."""
+    return _manifest()
+
+
+@router.get("/suburbs")
+def get_suburb_geometry(
+    request: Request,
+    zoom: float = Query(11, ge=0, le=22, description="Map zoom the boundaries are drawn at"),
+    format: str = Query("topojson", description="Output format (topojson/geojson)"),
+):
+    """
+    Get suburb boundaries simplified for a map zoom.
+
+    Serves the coarsest level built for at least that zoom, precompressed
+    with the best encoding the client accepts (br, gzip or none).
+    X-Geometry-Zoom names the level served.
+    """
+    if format not in GEOMETRY_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(GEOMETRY_FORMATS)}")
+
+    level = level_for_zoom(_manifest(), zoom)
+    try:
+        body, encoding = geometry_body(level, format, accepted_encodings(request.headers.get("accept-encoding")))
+    except GeometryNotBuilt as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except EncodingNotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    headers = {
+        "Cache-Control": GEOMETRY_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Geometry-Zoom": str(level),
+    }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=GEOMETRY_FORMATS[format], headers=headers)
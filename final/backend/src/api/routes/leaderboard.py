@@ -0,0 +1,56 @@
+"""Leaderboard endpoints."""
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Query, HTTPException
+
+from ..schemas import LeaderboardResponse
+from ..utils import validate_property_type
+from ...services.leaderboard import ORDERS, leaderboard
+
+router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
+
+
+@router.get("", response_model=LeaderboardResponse)
+def get_leaderboard(
+    metric: str = Query(..., description="Numeric suburb_analytics column to rank on, e.g. cagr_10yr"),
+    order: str = Query("desc", description=f"Ranking order ({', '.join(ORDERS)}); desc puts the highest first"),
+    k: int = Query(20, ge=1, le=500, description="Number of suburbs returned"),
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
+    district: Optional[str] = Query(None, description="Filter by district code"),
+    postcode: Optional[str] = Query(None, description="Filter by postcode"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum current median price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum current median price"),
+    min_sales: Optional[int] = Query(None, ge=0, description="Minimum sales over the last year"),
+):
+    """
+    Top k suburbs on any analytics metric within a filtered cohort.
+
+    Ranks and percentiles are relative to the cohort left by the filters,
+    not to every suburb. Runs on in-memory column arrays, not the database.
+    """
+    validate_property_type(property_type)
+
+    started = time.perf_counter()
+    try:
+        result = leaderboard(
+            metric,
+            order=order,
+            k=k,
+            property_type=property_type,
+            district=district,
+            postcode=postcode,
+            min_price=min_price,
+            max_price=max_price,
+            min_sales=min_sales,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return LeaderboardResponse(
+        metric=metric,
+        order=order,
+        k=k,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        **result,
+    )
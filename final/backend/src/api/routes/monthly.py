@@ -0,0 +1,67 @@
+"""Monthly stats endpoints."""
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Optional, List
+
+from ..schemas import MonthlyStats, MonthlyStatsListResponse
+from ..utils import validate_property_type
+from ...db.async_repository import AsyncRepository, get_async_repository
+
+router = APIRouter(prefix="/api/monthly", tags=["monthly"])
+
+
+@router.get("", response_model=MonthlyStatsListResponse)
+async def list_monthly_stats(
+    suburb: Optional[str] = Query(None, description="Filter by suburb"),
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
+    year: Optional[int] = Query(None, description="Filter by year"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Filter by month (1-12)"),
+    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
+    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of results"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """List monthly stats with optional filters."""
+    validate_property_type(property_type)
+
+    rows, total = await repo.list_monthly(
+        suburb=suburb,
+        property_type=property_type,
+        year=year,
+        month=month,
+        start_year=start_year,
+        end_year=end_year,
+        limit=limit,
+        offset=offset,
+    )
+
+    return MonthlyStatsListResponse(
+        items=[MonthlyStats(**row) for row in rows],
+        total=total,
+        limit=limit,
+        offset=offset
+    )
+
+
+@router.get("/{suburb}", response_model=List[MonthlyStats])
+async def get_suburb_monthly_stats(
+    suburb: str,
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit). If not specified, returns both."),
+    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
+    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """Get monthly stats for a specific suburb."""
+    validate_property_type(property_type)
+
+    rows = await repo.suburb_monthly(
+        suburb,
+        property_type=property_type,
+        start_year=start_year,
+        end_year=end_year,
+    )
+
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Monthly stats not found for suburb: {suburb}")
+
+    return [MonthlyStats(**row) for row in rows]
@@ -0,0 +1,35 @@
+"""Repeat-sales price index endpoints."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..schemas import PriceIndexPoint, PriceIndexResponse
+from ..utils import validate_level, validate_property_type
+from ...db.async_repository import AsyncRepository, get_async_repository
+
+router = APIRouter(prefix="/api/index", tags=["index"])
+
+
+@router.get("/{level}/{name}", response_model=PriceIndexResponse)
+async def get_price_index(
+    level: str,
+    name: str,
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit). If not specified, returns both."),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """
+    Get the repeat-sales price index of a suburb, postcode, district or metro area.
+
+    Unlike the median price, the index compares each property only with its
+    own earlier sale, so it is not moved by changes in the mix of what sold.
+    Each series is 100 in its first quarter; areas with too few repeat
+    sales have no index.
+    """
+    validate_level(level)
+    validate_property_type(property_type)
+
+    rows = await repo.price_index(level, name, property_type=property_type)
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Price index not found for {level}: {name}")
+
+    return PriceIndexResponse(level=level, area=name, items=[PriceIndexPoint(**row) for row in rows])
@@ -1,19 +1,17 @@
 """Property endpoints."""
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
 from typing import Optional
 from datetime import date
 
 from ..schemas import Property, PropertyListResponse, PropertyStatsResponse
-from ..utils import validate_property_type, build_where_clause
-from ...db.database import get_db
+from ..utils import validate_property_type
+from ...db.async_repository import AsyncRepository, get_async_repository
 
 router = APIRouter(prefix="/api/properties", tags=["properties"])
 
 
 @router.get("", response_model=PropertyListResponse)
-def list_properties(
+async def list_properties(
     suburb: Optional[str] = Query(None, description="Filter by suburb"),
     property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
     min_price: Optional[float] = Query(None, description="Minimum sale price"),
@@ -22,82 +20,24 @@ def list_properties(
     end_date: Optional[date] = Query(None, description="End date (settlement_date)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
+    repo: AsyncRepository = Depends(get_async_repository)
 ):
     """List properties with optional filters."""
-    # Build WHERE clause
-    conditions = []
-    params = {}
-    
-    if suburb:
-        conditions.append("suburb = :suburb")
-        params["suburb"] = suburb
-    
-    if property_type:
-        validate_property_type(property_type)
-        conditions.append("property_type = :property_type")
-        params["property_type"] = property_type
-    
-    if min_price is not None:
-        conditions.append("sale_price >= :min_price")
-        params["min_price"] = min_price
-    
-    if max_price is not None:
-        conditions.append("sale_price <= :max_price")
-        params["max_price"] = max_price
-    
-    if start_date:
-        conditions.append("settlement_date >= :start_date")
-        params["start_date"] = start_date
-    
-    if end_date:
-        conditions.append("settlement_date <= :end_date")
-        params["end_date"] = end_date
-    
-    where_clause = build_where_clause(conditions, params)
-    
-    # Get total count
-    count_query = text(f"SELECT COUNT(*) FROM properties WHERE {where_clause}")
-    total = db.execute(count_query, params).scalar()
-    
-    # Get paginated results
-    query = text(f"""
-        SELECT id, suburb, postcode, district, property_type,
-               listing_date, contract_date, settlement_date,
-               sale_price, days_on_market, contract_to_settlement_days,
-               created_at
-        FROM properties
-        WHERE {where_clause}
-        ORDER BY settlement_date DESC, id DESC
-        LIMIT :limit OFFSET :offset
-    """)
-    params["limit"] = limit
-    params["offset"] = offset
-    
-    result = db.execute(query, params)
-    rows = result.fetchall()
-    
-    # Convert to Property objects
-    properties = []
-    for row in rows:
-        prop_dict = {
-            "id": row[0],
-            "suburb": row[1],
-            "postcode": row[2],
-            "district": row[3],
-            "property_type": row[4],
-            "listing_date": row[5],
-            "contract_date": row[6],
-            "settlement_date": row[7],
-            "sale_price": row[8],
-            "days_on_market": row[9],
-            "contract_to_settlement_days": row[10],
-            "created_at": row[11],
-        }
-        properties.append(Property(**prop_dict))
-    
+    validate_property_type(property_type)
+
+    rows, total = await repo.list_properties(
+        suburb=suburb,
+        property_type=property_type,
+        min_price=min_price,
+        max_price=max_price,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        offset=offset,
+    )
+
     return PropertyListResponse(
-        items=properties,
+        items=[Property(**row) for row in rows],
         total=total,
         limit=limit,
         offset=offset
@@ -105,114 +45,31 @@ def list_properties(
 
 
 @router.get("/{property_id}", response_model=Property)
-def get_property(property_id: int, db: Session = Depends(get_db)):
+async def get_property(property_id: int, repo: AsyncRepository = Depends(get_async_repository)):
     """Get a single property by ID."""
-    query = text("""
-        SELECT id, suburb, postcode, district, property_type,
-               listing_date, contract_date, settlement_date,
-               sale_price, days_on_market, contract_to_settlement_days,
-               created_at
-        FROM properties
-        WHERE id = :id
-    """)
-    
-    result = db.execute(query, {"id": property_id})
-    row = result.fetchone()
-    
+    row = await repo.get_property(property_id)
+
     if not row:
         raise HTTPException(status_code=404, detail="Property not found")
-    
-    prop_dict = {
-        "id": row[0],
-        "suburb": row[1],
-        "postcode": row[2],
-        "district": row[3],
-        "property_type": row[4],
-        "listing_date": row[5],
-        "contract_date": row[6],
-        "settlement_date": row[7],
-        "sale_price": row[8],
-        "days_on_market": row[9],
-        "contract_to_settlement_days": row[10],
-        "created_at": row[11],
-    }
-    
-    return Property(**prop_dict)
+
+    return Property(**row)
 
 
 @router.get("/stats/summary", response_model=PropertyStatsResponse)
-def get_property_stats(
+async def get_property_stats(
     suburb: Optional[str] = Query(None, description="Filter by suburb"),
     property_type: Optional[str] = Query(None, description="Filter by property type"),
-    db: Session = Depends(get_db)
+    repo: AsyncRepository = Depends(get_async_repository)
 ):
     """Get aggregate statistics for properties."""
-    conditions = []
-    params = {}
-    
-    if suburb:
-        conditions.append("suburb = :suburb")
-        params["suburb"] = suburb
-    
-    if property_type:
-        validate_property_type(property_type)
-        conditions.append("property_type = :property_type")
-        params["property_type"] = property_type
-    
-    where_clause = build_where_clause(conditions, params)
-    
-    # Get basic stats
-    query = text(f"""
-        SELECT 
-            COUNT(*) as total_count,
-            AVG(sale_price) as avg_price,
-            MIN(sale_price) as min_price,
-            MAX(sale_price) as max_price
-        FROM properties
-        WHERE {where_clause}
-    """)
-    
-    result = db.execute(query, params)
-    row = result.fetchone()
-    
-    # Calculate median separately (SQLite doesn't have built-in median)
-    count = row[0] if row else 0
-    median_price = None
-    if count > 0:
-        # For median: if count is odd, get middle value; if even, average two middle values
-        if count % 2 == 1:
-            # Odd count: get the middle value (index count//2)
-            median_offset = count // 2
-            median_query = text(f"""
-                SELECT sale_price 
-                FROM properties 
-                WHERE {where_clause}
-                ORDER BY sale_price
-                LIMIT 1 OFFSET :offset
-            """)
-            median_result = db.execute(median_query, {**params, "offset": median_offset})
-            median_row = median_result.fetchone()
-            median_price = median_row[0] if median_row else None
-        else:
-            # Even count: average the two middle values (indices count//2 - 1 and count//2)
-            median_offset1 = count // 2 - 1
-            median_query = text(f"""
-                SELECT sale_price 
-                FROM properties 
-                WHERE {where_clause}
-                ORDER BY sale_price
-                LIMIT 2 OFFSET :offset
-            """)
-            median_result = db.execute(median_query, {**params, "offset": median_offset1})
-            median_rows = median_result.fetchall()
-            if len(median_rows) == 2:
-                median_price = (median_rows[0][0] + median_rows[1][0]) / 2.0
-    
+    validate_property_type(property_type)
+
+    stats = await repo.property_stats(suburb=suburb, property_type=property_type)
+
     return PropertyStatsResponse(
-        total_count=row[0] or 0,
-        avg_price=float(row[1]) if row[1] else None,
-        min_price=float(row[2]) if row[2] else None,
-        max_price=float(row[3]) if row[3] else None,
-        median_price=float(median_price) if median_price else None
+        total_count=stats["total_count"] or 0,
+        avg_price=float(stats["avg_price"]) if stats["avg_price"] else None,
+        min_price=float(stats["min_price"]) if stats["min_price"] else None,
+        max_price=float(stats["max_price"]) if stats["max_price"] else None,
+        median_price=float(stats["median_price"]) if stats["median_price"] else None
     )
-
@@ -1,19 +1,21 @@
 """Quarterly stats endpoints."""
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
 
-from ..schemas import QuarterlyStats, QuarterlyStatsListResponse
-from ..utils import validate_property_type, build_where_clause
-from ...db.database import get_db
+from ..schemas import QuarterlyStats, QuarterlyStatsListResponse, QuarterlyMatrixResponse
+from ..utils import validate_property_type, validate_level
+from ...db.dataset import dataset_version
+from ...db.async_repository import AsyncRepository, get_async_repository
+from ...services.quarterly_matrix import MATRIX_METRICS, quarterly_matrix
+from ...services.smoothing import SMOOTHING_METHODS, smoothed_medians
 
 router = APIRouter(prefix="/api/quarterly", tags=["quarterly"])
 
 
 @router.get("", response_model=QuarterlyStatsListResponse)
-def list_quarterly_stats(
-    suburb: Optional[str] = Query(None, description="Filter by suburb"),
+async def list_quarterly_stats(
+    suburb: Optional[str] = Query(None, description="Filter by suburb (or area name at a coarser level)"),
     property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
     year: Optional[int] = Query(None, description="Filter by year"),
     quarter: Optional[int] = Query(None, ge=1, le=4, description="Filter by quarter (1-4)"),
@@ -21,176 +23,114 @@ def list_quarterly_stats(
     end_year: Optional[int] = Query(None, description="End year (inclusive)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
+    level: str = Query("suburb", description="Aggregation level (suburb/postcode/district/metro)"),
+    repo: AsyncRepository = Depends(get_async_repository)
 ):
-    """List quarterly stats with optional filters."""
-    # Build WHERE clause
-    conditions = []
-    params = {}
-    
-    if suburb:
-        conditions.append("suburb = :suburb")
-        params["suburb"] = suburb
-    
-    if property_type:
-        validate_property_type(property_type)
-        conditions.append("property_type = :property_type")
-        params["property_type"] = property_type
-    
-    if year is not None:
-        conditions.append("year = :year")
-        params["year"] = year
-    
-    if quarter is not None:
-        conditions.append("quarter = :quarter")
-        params["quarter"] = quarter
-    
-    if start_year is not None:
-        conditions.append("year >= :start_year")
-        params["start_year"] = start_year
-    
-    if end_year is not None:
-        conditions.append("year <= :end_year")
-        params["end_year"] = end_year
-    
-    where_clause = build_where_clause(conditions, params)
-    
-    # Get total count
-    count_query = text(f"SELECT COUNT(*) FROM suburb_quarterly WHERE {where_clause}")
-    total = db.execute(count_query, params).scalar()
-    
-    # Get paginated results
-    query = text(f"""
-        SELECT id, suburb, property_type, year, quarter, quarter_start,
-               num_sales, median_price, median_price_smoothed, mean_price, min_price, max_price,
-               price_stddev, price_p25, price_p75, median_ctsd, mean_ctsd,
-               fast_sales_percentage, fast_settlements_percentage, liquidity_score, contract_to_settlement_score,
-               qoq_price_change_percentage, yoy_price_change_percentage,
-               created_at
-        FROM suburb_quarterly
-        WHERE {where_clause}
-        ORDER BY year DESC, quarter DESC, suburb ASC
-        LIMIT :limit OFFSET :offset
-    """)
-    params["limit"] = limit
-    params["offset"] = offset
-    
-    result = db.execute(query, params)
-    rows = result.fetchall()
-    
-    # Convert to QuarterlyStats objects
-    stats_list = []
-    for row in rows:
-        stats_dict = {
-            "id": row[0],
-            "suburb": row[1],
-            "property_type": row[2],
-            "year": row[3],
-            "quarter": row[4],
-            "quarter_start": row[5],
-            "num_sales": row[6],
-            "median_price": row[7],
-            "median_price_smoothed": row[8],
-            "mean_price": row[9],
-            "min_price": row[10],
-            "max_price": row[11],
-            "price_stddev": row[12],
-            "price_p25": row[13],
-            "price_p75": row[14],
-            "median_ctsd": row[15],
-            "mean_ctsd": row[16],
-            "fast_sales_percentage": row[17],
-            "fast_settlements_percentage": row[18],
-            "liquidity_score": row[19],
-            "contract_to_settlement_score": row[20],
-            "qoq_price_change_percentage": row[21],
-            "yoy_price_change_percentage": row[22],
-            "created_at": row[23],
-        }
-        stats_list.append(QuarterlyStats(**stats_dict))
-    
+    """
+    List quarterly stats with optional filters.
+
+    With level=postcode|district|metro rows come from the rollup tables and
+    suburb holds the postcode, district code or metro area name.
+    """
+    validate_property_type(property_type)
+    validate_level(level)
+
+    rows, total = await repo.list_quarterly(
+        suburb=suburb,
+        property_type=property_type,
+        year=year,
+        quarter=quarter,
+        start_year=start_year,
+        end_year=end_year,
+        limit=limit,
+        offset=offset,
+        level=level,
+    )
+
     return QuarterlyStatsListResponse(
-        items=stats_list,
+        items=[QuarterlyStats(**row) for row in rows],
         total=total,
         limit=limit,
         offset=offset
     )
 
 
+# Registered before /{suburb} so "matrix" is not taken as a suburb name
+@router.get("/matrix", response_model=QuarterlyMatrixResponse)
+def get_quarterly_matrix(
+    metric: str = Query("median_price", description="Quarterly metric to return"),
+    property_type: str = Query("house", description="Property type (house/unit)"),
+):
+    """
+    Get one metric for every suburb and quarter as a dense packed matrix.
+
+    Built once per dataset version from suburb_quarterly. Decode `values` as
+    base64 little-endian float32 in row-major order with shape
+    [suburbs, quarters]; missing quarters are NaN.
+    """
+    validate_property_type(property_type, required=True)
+
+    if metric not in MATRIX_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(MATRIX_METRICS)}")
+
+    matrix = quarterly_matrix(metric, property_type)
+
+    return QuarterlyMatrixResponse(
+        metric=metric,
+        property_type=property_type,
+        dataset_version=dataset_version(),
+        suburbs=matrix["suburbs"],
+        quarters=matrix["quarters"],
+        shape=matrix["shape"],
+        values=matrix["packed"],
+    )
+
+
 @router.get("/{suburb}", response_model=List[QuarterlyStats])
-def get_suburb_quarterly_stats(
+async def get_suburb_quarterly_stats(
     suburb: str,
     property_type: Optional[str] = Query(None, description="Filter by property type (house/unit). If not specified, returns both."),
     start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
     end_year: Optional[int] = Query(None, description="End year (inclusive)"),
-    db: Session = Depends(get_db)
+    level: str = Query("suburb", description="Aggregation level (suburb/postcode/district/metro)"),
+    smoothing: Optional[str] = Query(None, description="Recompute median_price_smoothed from raw medians (ewm/rolling_median)"),
+    alpha: float = Query(0.3, gt=0, le=1, description="Smoothing factor for smoothing=ewm"),
+    window: int = Query(4, ge=1, le=40, description="Window in calendar quarters for smoothing=rolling_median (quarters without sales are skipped)"),
+    repo: AsyncRepository = Depends(get_async_repository)
 ):
-    """Get quarterly stats for a specific suburb."""
-    conditions = ["suburb = :suburb"]
-    params = {"suburb": suburb}
-    
-    if property_type:
-        validate_property_type(property_type)
-        conditions.append("property_type = :property_type")
-        params["property_type"] = property_type
-    
-    if start_year is not None:
-        conditions.append("year >= :start_year")
-        params["start_year"] = start_year
-    
-    if end_year is not None:
-        conditions.append("year <= :end_year")
-        params["end_year"] = end_year
-    
-    where_clause = build_where_clause(conditions, params)
-    
-    query = text(f"""
-        SELECT id, suburb, property_type, year, quarter, quarter_start,
-               num_sales, median_price, median_price_smoothed, mean_price, min_price, max_price,
-               price_stddev, price_p25, price_p75, median_ctsd, mean_ctsd,
-               fast_sales_percentage, fast_settlements_percentage, liquidity_score, contract_to_settlement_score,
-               qoq_price_change_percentage, yoy_price_change_percentage,
-               created_at
-        FROM suburb_quarterly
-        WHERE {where_clause}
-        ORDER BY property_type, year DESC, quarter DESC
-    """)
-    
-    result = db.execute(query, params)
-    rows = result.fetchall()
-    
+    """
+    Get quarterly stats for a specific suburb, or a postcode/district/metro area with level.
+
+    With smoothing, median_price_smoothed is recomputed over the full raw
+    median series with the given alpha or window instead of the stored
+    alpha=0.3 values.
+    """
+    validate_property_type(property_type)
+    validate_level(level)
+
+    if smoothing is not None and smoothing not in SMOOTHING_METHODS:
+        raise HTTPException(status_code=400, detail=f"smoothing must be one of: {', '.join(SMOOTHING_METHODS)}")
+
+    rows = await repo.suburb_quarterly(
+        suburb,
+        property_type=property_type,
+        start_year=start_year,
+        end_year=end_year,
+        level=level,
+    )
+
     if not rows:
         raise HTTPException(status_code=404, detail=f"Quarterly stats not found for suburb: {suburb}")
-    
-    stats_list = []
-    for row in rows:
-        stats_dict = {
-            "id": row[0],
-            "suburb": row[1],
-            "property_type": row[2],
-            "year": row[3],
-            "quarter": row[4],
-            "quarter_start": row[5],
-            "num_sales": row[6],
-            "median_price": row[7],
-            "median_price_smoothed": row[8],
-            "mean_price": row[9],
-            "min_price": row[10],
-            "max_price": row[11],
-            "price_stddev": row[12],
-            "price_p25": row[13],
-            "price_p75": row[14],
-            "median_ctsd": row[15],
-            "mean_ctsd": row[16],
-            "fast_sales_percentage": row[17],
-            "fast_settlements_percentage": row[18],
-            "liquidity_score": row[19],
-            "contract_to_settlement_score": row[20],
-            "qoq_price_change_percentage": row[21],
-            "yoy_price_change_percentage": row[22],
-            "created_at": row[23],
+
+    if smoothing:
+        # CPU-bound (and built per dataset on first use), so kept off the event loop
+        smoothed = {
+            series_type: await run_in_threadpool(
+                smoothed_medians, suburb, series_type, level, smoothing, alpha=alpha, window=window
+            )
+            for series_type in {row["property_type"] for row in rows}
         }
-        stats_list.append(QuarterlyStats(**stats_dict))
-    
-    return stats_list
+        for row in rows:
+            row["median_price_smoothed"] = smoothed[row["property_type"]].get((row["year"], row["quarter"]))
 
+    return [QuarterlyStats(**row) for row in rows]
@@ -0,0 +1,84 @@
+"""Affordability screen endpoints."""
+import math
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Query, HTTPException
+
+from ..schemas import ScreenResponse
+from ..utils import validate_property_type
+from ...services.screen import PRICE_BASES, SCREEN_SORTS, screen
+
+router = APIRouter(prefix="/api/screen", tags=["screen"])
+
+
+@router.get("", response_model=ScreenResponse)
+def screen_suburbs(
+    budget: float = Query(..., gt=0, description="Maximum purchase price"),
+    deposit: float = Query(0, ge=0, description="Deposit; the rest of the price is borrowed"),
+    rate: float = Query(6.0, ge=0, le=30, description="Annual interest rate (%)"),
+    term: int = Query(30, ge=1, le=40, description="Loan term in years"),
+    price_basis: str = Query("median", description=f"Latest-quarter price to screen on ({', '.join(PRICE_BASES)})"),
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit)"),
+    max_repayment: Optional[float] = Query(None, gt=0, description="Maximum monthly repayment"),
+    min_growth_1yr: Optional[float] = Query(None, description="Minimum 1-year growth (%)"),
+    min_growth_5yr: Optional[float] = Query(None, description="Minimum 5-year growth (%)"),
+    max_volatility: Optional[float] = Query(None, ge=0, description="Maximum volatility score"),
+    max_ctsd: Optional[float] = Query(None, ge=0, description="Maximum average contract-to-settlement days"),
+    min_sales: Optional[int] = Query(None, ge=0, description="Minimum sales over the last year"),
+    sort: str = Query("growth_5yr", description=f"Ranking ({', '.join(SCREEN_SORTS)})"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of matches returned"),
+):
+    """
+    Screen every suburb against a budget, loan terms and market constraints.
+
+    Prices are each series' latest quarterly p25 or median; repayments are
+    principal and interest on the price less the deposit. Runs on in-memory
+    column arrays, not the database.
+    """
+    validate_property_type(property_type)
+    numeric = {
+        "budget": budget,
+        "deposit": deposit,
+        "max_repayment": max_repayment,
+        "min_growth_1yr": min_growth_1yr,
+        "min_growth_5yr": min_growth_5yr,
+        "max_volatility": max_volatility,
+        "max_ctsd": max_ctsd,
+    }
+    for name, value in numeric.items():
+        if value is not None and not math.isfinite(value):
+            raise HTTPException(status_code=400, detail=f"{name} must be a finite number")
+
+    started = time.perf_counter()
+    try:
+        result = screen(
+            budget,
+            deposit=deposit,
+            rate=rate,
+            term_years=term,
+            price_basis=price_basis,
+            property_type=property_type,
+            max_repayment=max_repayment,
+            min_growth_1yr=min_growth_1yr,
+            min_growth_5yr=min_growth_5yr,
+            max_volatility=max_volatility,
+            max_ctsd=max_ctsd,
+            min_sales=min_sales,
+            sort=sort,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ScreenResponse(
+        budget=budget,
+        deposit=deposit,
+        rate=rate,
+        term_years=term,
+        price_basis=price_basis,
+        sort=sort,
+        limit=limit,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        **result,
+    )
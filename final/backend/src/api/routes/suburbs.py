@@ -0,0 +1,281 @@
+"""Per-suburb distribution endpoints."""
+import math
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import List, Optional
+
+from ..schemas import (
+    Analytics,
+    HistogramBin,
+    PriceHistogramResponse,
+    PercentileValue,
+    PricePercentilesResponse,
+    SuburbLocation,
+    SuburbsWithinResponse,
+    NearbySuburbsResponse,
+    SimilarSuburb,
+    SimilarSuburbsResponse,
+)
+from ..utils import validate_property_type, quarter_range
+from ...db.price_bins import bucket_rows_to_arrays, rebin
+from ...db.quantile_sketch import RELATIVE_ACCURACY, quantiles, sketch_rows_summary
+from ...db.async_repository import AsyncRepository, get_async_repository
+from ...db.repository import Repository, get_repository
+from ...services.geometry import GeometryNotBuilt
+from ...services.similarity import MIN_TRAJECTORY_QUARTERS, similar_suburbs
+from ...services.spatial import nearest, suburb_index, within
+
+router = APIRouter(prefix="/api/suburbs", tags=["suburbs"])
+
+
+def _locations(
+    rows: List[int],
+    repo: Repository,
+    property_type: Optional[str],
+    distances: Optional[List[float]] = None,
+) -> List[SuburbLocation]:
+    """Build location items for index rows, joined to suburb_analytics in one query."""
+    index = suburb_index()
+    names = [index["suburbs"][i] for i in rows]
+
+    analytics = {}
+    for row in repo.analytics_for_suburbs(names, property_type=property_type):
+        analytics.setdefault(row["suburb"], []).append(Analytics(**row))
+
+    return [
+        SuburbLocation(
+            suburb=index["suburbs"][i],
+            postcode=index["postcodes"][i],
+            longitude=float(index["longitude"][i]),
+            latitude=float(index["latitude"][i]),
+            bbox=index["bbox"][i].tolist(),
+            distance_km=distances[n] if distances is not None else None,
+            analytics=sorted(analytics.get(index["suburbs"][i], []), key=lambda a: a.property_type),
+        )
+        for n, i in enumerate(rows)
+    ]
+
+
+@router.get("/within", response_model=SuburbsWithinResponse)
+def get_suburbs_within(
+    bbox: str = Query(..., description="Bounding box as min_lon,min_lat,max_lon,max_lat"),
+    property_type: Optional[str] = Query(None, description="Filter analytics by property type (house/unit). If not specified, returns both."),
+    limit: int = Query(500, ge=1, le=2000, description="Maximum number of suburbs"),
+    repo: Repository = Depends(get_repository)
+):
+    """
+    Get suburbs whose bounding box intersects a map viewport, with their analytics.
+
+    Suburbs partly inside the box are included, ordered by name.
+    """
+    validate_property_type(property_type)
+
+    try:
+        box = [float(value) for value in bbox.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be four comma-separated numbers")
+    if len(box) != 4 or not all(math.isfinite(value) for value in box):
+        raise HTTPException(status_code=400, detail="bbox must be four comma-separated finite numbers")
+    if box[0] > box[2] or box[1] > box[3]:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat with min <= max")
+
+    try:
+        rows = within(box)
+    except GeometryNotBuilt as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return SuburbsWithinResponse(
+        bbox=box,
+        items=_locations(rows[:limit], repo, property_type),
+        total=len(rows),
+        limit=limit,
+    )
+
+
+@router.get("/{suburb}/price-histogram", response_model=PriceHistogramResponse)
+async def get_price_histogram(
+    suburb: str,
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit). If not specified, combines both."),
+    bins: int = Query(20, ge=1, le=200, description="Number of histogram bins"),
+    scale: str = Query("log", description="Bin spacing (log/linear)"),
+    min_price: Optional[float] = Query(None, gt=0, description="Lower edge of the first bin"),
+    max_price: Optional[float] = Query(None, gt=0, description="Upper edge of the last bin"),
+    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
+    start_quarter: int = Query(1, ge=1, le=4, description="Start quarter within start_year (1-4)"),
+    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+    end_quarter: int = Query(4, ge=1, le=4, description="End quarter within end_year (1-4)"),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """
+    Get the sale price distribution for a suburb over a quarter-aligned date range.
+
+    Served from pre-binned log-price counts, so bin edges are accurate to
+    roughly 5% of price.
+    """
+    validate_property_type(property_type)
+
+    if scale not in ["log", "linear"]:
+        raise HTTPException(status_code=400, detail="scale must be 'log' or 'linear'")
+
+    if any(bound is not None and not math.isfinite(bound) for bound in (min_price, max_price)):
+        raise HTTPException(status_code=400, detail="min_price and max_price must be finite numbers")
+    if min_price is not None and max_price is not None and min_price >= max_price:
+        raise HTTPException(status_code=400, detail="min_price must be less than max_price")
+
+    start_key, end_key = quarter_range(start_year, start_quarter, end_year, end_quarter)
+
+    rows = await repo.price_bins(
+        suburb,
+        property_type=property_type,
+        start_key=start_key,
+        end_key=end_key,
+    )
+
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No sales found for suburb: {suburb}")
+
+    buckets, counts = bucket_rows_to_arrays(rows)
+    try:
+        # A single bound can still cross the data's extent on the other side
+        histogram = rebin(buckets, counts, bins, min_price=min_price, max_price=max_price, scale=scale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    edges = histogram["edges"]
+
+    return PriceHistogramResponse(
+        suburb=suburb,
+        property_type=property_type,
+        scale=scale,
+        bins=[
+            HistogramBin(lower=edges[i], upper=edges[i + 1], count=count)
+            for i, count in enumerate(histogram["counts"])
+        ],
+        total_sales=int(counts.sum()),
+        underflow=histogram["underflow"],
+        overflow=histogram["overflow"],
+    )
+
+
+@router.get("/{suburb}/price-percentiles", response_model=PricePercentilesResponse)
+async def get_price_percentiles(
+    suburb: str,
+    property_type: Optional[str] = Query(None, description="Filter by property type (house/unit). If not specified, combines both."),
+    percentiles: str = Query("25,50,75", description="Comma-separated percentiles between 0 and 100"),
+    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
+    start_quarter: int = Query(1, ge=1, le=4, description="Start quarter within start_year (1-4)"),
+    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+    end_quarter: int = Query(4, ge=1, le=4, description="End quarter within end_year (1-4)"),
+    repo: AsyncRepository = Depends(get_async_repository)
+):
+    """
+    Get sale price percentiles for a suburb over a quarter-aligned date range.
+
+    Merges the stored per-quarter price sketches, so any range costs one
+    small row per quarter and estimates are within 1% of the exact value.
+    """
+    validate_property_type(property_type)
+
+    try:
+        requested = [float(p) for p in percentiles.split(",") if p.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles must be comma-separated numbers")
+
+    if not requested or any(not math.isfinite(p) or p < 0 or p > 100 for p in requested):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+
+    start_key, end_key = quarter_range(start_year, start_quarter, end_year, end_quarter)
+
+    rows = await repo.price_sketches(
+        suburb,
+        property_type=property_type,
+        start_key=start_key,
+        end_key=end_key,
+    )
+
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No sales found for suburb: {suburb}")
+
+    summary = sketch_rows_summary(rows)
+    prices = quantiles(
+        summary["keys"],
+        summary["counts"],
+        [0.5] + [p / 100 for p in requested],
+        min_price=summary["min_price"],
+        max_price=summary["max_price"],
+    )
+
+    return PricePercentilesResponse(
+        suburb=suburb,
+        property_type=property_type,
+        num_sales=summary["num_sales"],
+        min_price=summary["min_price"],
+        max_price=summary["max_price"],
+        median_price=prices[0],
+        percentiles=[
+            PercentileValue(percentile=p, price=price)
+            for p, price in zip(requested, prices[1:])
+        ],
+        relative_accuracy=RELATIVE_ACCURACY,
+    )
+
+
+@router.get("/{suburb}/nearby", response_model=NearbySuburbsResponse)
+def get_nearby_suburbs(
+    suburb: str,
+    k: int = Query(10, ge=1, le=100, description="Number of nearest suburbs"),
+    property_type: Optional[str] = Query(None, description="Filter analytics by property type (house/unit). If not specified, returns both."),
+    repo: Repository = Depends(get_repository)
+):
+    """Get the k suburbs with centroids nearest to a suburb's centroid, with their analytics."""
+    validate_property_type(property_type)
+
+    try:
+        neighbours = nearest(suburb, k)
+        index = suburb_index()
+    except GeometryNotBuilt as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail=f"Location not found for suburb: {suburb}")
+
+    origin = index["positions"][suburb]
+    return NearbySuburbsResponse(
+        suburb=suburb,
+        longitude=float(index["longitude"][origin]),
+        latitude=float(index["latitude"][origin]),
+        items=_locations(
+            [row for row, _ in neighbours],
+            repo,
+            property_type,
+            distances=[distance for _, distance in neighbours],
+        ),
+    )
+
+
+@router.get("/{suburb}/similar", response_model=SimilarSuburbsResponse)
+def get_similar_suburbs(
+    suburb: str,
+    k: int = Query(10, ge=1, le=100, description="Number of similar suburbs"),
+    property_type: str = Query("house", description="Property type (house/unit)"),
+):
+    """
+    Get the suburbs most similar to a suburb.
+
+    Compares the shape of the smoothed median price over the last ten years
+    together with price level, 1 and 5 year growth, volatility and
+    contract-to-settlement days.
+    """
+    validate_property_type(property_type, required=True)
+
+    items = similar_suburbs(suburb, property_type, k)
+    if items is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Not enough quarterly data (at least {MIN_TRAJECTORY_QUARTERS} recent quarters) to compare suburb: {suburb}",
+        )
+
+    return SimilarSuburbsResponse(
+        suburb=suburb,
+        property_type=property_type,
+        items=[SimilarSuburb(**item) for item in items],
+    )
@@ -1,6 +1,6 @@
 """Pydantic models for API request/response schemas."""
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date, datetime
 
 
@@ -89,6 +89,139 @@ class QuarterlyStatsListResponse(BaseModel):
     offset: int
 
 
+class QuarterlyMatrixResponse(BaseModel):
+    """Response schema for the metro-wide suburbs x quarters matrix."""
+    metric: str
+    property_type: str
+    dataset_version: str
+    suburbs: List[str]  # row index
+    quarters: List[str]  # column index, e.g. '2024-Q4'
+    shape: List[int]  # [len(suburbs), len(quarters)]
+    dtype: str = "float32"  # little-endian, row-major, NaN where no data
+    values: str  # base64-encoded packed array
+
+
+# Monthly Stats Schemas
+class MonthlyStats(BaseModel):
+    """Monthly stats response schema (suburb_quarterly metrics per calendar month)."""
+    id: int
+    suburb: str
+    property_type: str = Field(..., pattern="^(house|unit)$")
+    year: int
+    month: int = Field(..., ge=1, le=12)
+    month_start: date
+    num_sales: int
+    median_price: Optional[float] = None
+    median_price_smoothed: Optional[float] = None
+    mean_price: Optional[float] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    price_stddev: Optional[float] = None
+    price_p25: Optional[float] = None
+    price_p75: Optional[float] = None
+    median_ctsd: Optional[float] = None
+    mean_ctsd: Optional[float] = None
+    fast_sales_percentage: Optional[float] = None
+    fast_settlements_percentage: Optional[float] = None
+    liquidity_score: Optional[float] = None
+    contract_to_settlement_score: Optional[float] = None
+    mom_price_change_percentage: Optional[float] = None
+    yoy_price_change_percentage: Optional[float] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MonthlyStatsListResponse(BaseModel):
+    """Response schema for monthly stats list."""
+    items: List[MonthlyStats]
+    total: int
+    limit: int
+    offset: int
+
+
+# Forecast Schemas
+class ForecastPoint(BaseModel):
+    """Forecast median price for one future quarter with prediction intervals."""
+    quarter: str  # e.g. '2025-Q2'
+    price: float
+    lower_80: float
+    upper_80: float
+    lower_95: float
+    upper_95: float
+
+
+class ForecastResponse(BaseModel):
+    """Response schema for a suburb's median price forecast."""
+    suburb: str
+    property_type: str
+    last_quarter: str  # final quarter of the fitted data
+    observations: int  # quarters with sales in the fitted series
+    alpha: float
+    beta: float
+    phi: float
+    gamma: float
+    sigma: float  # one-step error standard deviation of log prices
+    forecasts: List[ForecastPoint]
+
+
+# Price Index Schemas
+class PriceIndexPoint(BaseModel):
+    """Repeat-sales index value for one quarter."""
+    property_type: str = Field(..., pattern="^(house|unit)$")
+    year: int
+    quarter: int = Field(..., ge=1, le=4)
+    index_value: float  # 100 in the series' first quarter
+    num_pairs: int  # repeat-sale pairs starting or ending in the quarter
+
+
+class PriceIndexResponse(BaseModel):
+    """Response schema for an area's repeat-sales price index."""
+    level: str
+    area: str
+    items: List[PriceIndexPoint]
+
+
+# Change Feed Schemas
+class DataChange(BaseModel):
+    """A row added, changed or removed since a dataset version."""
+    table: str
+    suburb: str
+    property_type: str = Field(..., pattern="^(house|unit)$")
+    year: Optional[int] = None  # suburb_quarterly and suburb_monthly rows
+    quarter: Optional[int] = Field(None, ge=1, le=4)  # suburb_quarterly rows
+    month: Optional[int] = Field(None, ge=1, le=12)  # suburb_monthly rows
+    change: str = Field(..., pattern="^(added|changed|removed)$")
+
+
+class ChangesResponse(BaseModel):
+    """Response schema for the changes between a dataset version and the served one."""
+    since: str
+    version: str
+    items: List[DataChange]
+    total: int
+
+
+# Geometry Schemas
+class GeometryLevel(BaseModel):
+    """One built level of detail of the suburb boundaries."""
+    zoom: int
+    tolerance_degrees: float
+    arcs: int
+    points: int
+    bytes: Dict[str, Dict[str, int]]  # format -> encoding -> size
+
+
+class GeometryManifestResponse(BaseModel):
+    """Response schema for the built suburb boundary levels."""
+    source: str
+    source_bytes: int
+    source_points: int
+    features: int
+    levels: List[GeometryLevel]
+
+
 # Analytics Schemas
 class AnalyticsBase(BaseModel):
     """Base analytics schema."""
@@ -147,6 +280,51 @@ class Analytics(AnalyticsBase):
         from_attributes = True
 
 
+class SuburbLocation(BaseModel):
+    """A suburb's centroid and bounding box with its analytics."""
+    suburb: str
+    postcode: Optional[str] = None
+    longitude: float
+    latitude: float
+    bbox: List[float]  # [min_lon, min_lat, max_lon, max_lat]
+    distance_km: Optional[float] = None  # from the queried suburb (nearby only)
+    analytics: List[Analytics] = []  # one row per property type with data
+
+
+class SuburbsWithinResponse(BaseModel):
+    """Response schema for suburbs intersecting a bounding box."""
+    bbox: List[float]
+    items: List[SuburbLocation]
+    total: int
+    limit: int
+
+
+class NearbySuburbsResponse(BaseModel):
+    """Response schema for the nearest suburbs to a suburb."""
+    suburb: str
+    longitude: float
+    latitude: float
+    items: List[SuburbLocation]
+
+
+class SimilarSuburb(BaseModel):
+    """A suburb ranked by similarity, with the metrics compared."""
+    suburb: str
+    similarity: float  # cosine similarity of the feature vectors, 1 = identical
+    current_median_price: Optional[float] = None
+    growth_1yr_percentage_smoothed: Optional[float] = None
+    growth_5yr_percentage_smoothed: Optional[float] = None
+    volatility_score: Optional[float] = None
+    current_avg_ctsd: Optional[float] = None
+
+
+class SimilarSuburbsResponse(BaseModel):
+    """Response schema for suburbs similar to a suburb."""
+    suburb: str
+    property_type: str
+    items: List[SimilarSuburb]
+
+
 class AnalyticsListResponse(BaseModel):
     """Response schema for analytics list."""
     items: List[Analytics]
@@ -160,3 +338,185 @@ class SuburbSearchResponse(BaseModel):
     suburbs: List[str]
     total: int
 
+
+
+# Price Distribution Schemas
+class HistogramBin(BaseModel):
+    """A single price histogram bin covering [lower, upper)."""
+    lower: float
+    upper: float
+    count: int
+
+
+class PriceHistogramResponse(BaseModel):
+    """Response schema for suburb price histogram."""
+    suburb: str
+    property_type: Optional[str] = None
+    scale: str
+    bins: List[HistogramBin]
+    total_sales: int
+    underflow: int  # sales below the first bin
+    overflow: int  # sales above the last bin
+
+
+class PercentileValue(BaseModel):
+    """Estimated sale price at a percentile."""
+    percentile: float
+    price: float
+
+
+class PricePercentilesResponse(BaseModel):
+    """Response schema for suburb price percentiles over a date range."""
+    suburb: str
+    property_type: Optional[str] = None
+    num_sales: int
+    min_price: float
+    max_price: float
+    median_price: float
+    percentiles: List[PercentileValue]
+    relative_accuracy: float  # maximum relative error of each estimate
+
+
+# Aggregate Schemas
+class AggregateResponse(BaseModel):
+    """Response schema for ad-hoc group-by aggregation."""
+    group_by: List[str]
+    metric: str
+    aggregates: List[str]
+    rows: List[Dict[str, Any]]  # one per group: dimension values then aggregates
+    total_groups: int
+    truncated: bool  # more groups matched than were returned
+    elapsed_ms: float
+
+
+# Screen Schemas
+class ScreenMatch(BaseModel):
+    """A suburb series that passed an affordability screen."""
+    suburb: str
+    property_type: str
+    latest_quarter: str  # quarter the screened prices come from, e.g. '2025-Q2'
+    price: float  # latest-quarter price on the requested basis
+    loan_amount: float  # price less deposit
+    monthly_repayment: float
+    headroom: float  # budget less price
+    price_p25: Optional[float] = None
+    median_price: Optional[float] = None
+    current_median_price: Optional[float] = None
+    growth_1yr_percentage: Optional[float] = None
+    growth_5yr_percentage: Optional[float] = None
+    volatility_score: Optional[float] = None
+    current_avg_ctsd: Optional[float] = None
+    current_num_sales: Optional[float] = None
+    market_health_score: Optional[float] = None
+
+
+class ScreenResponse(BaseModel):
+    """Response schema for an affordability screen."""
+    budget: float
+    deposit: float
+    rate: float
+    term_years: int
+    price_basis: str
+    sort: str
+    items: List[ScreenMatch]
+    total: int  # number of matches before the limit
+    limit: int
+    elapsed_ms: float
+
+
+# Leaderboard Schemas
+class LeaderboardEntry(BaseModel):
+    """A suburb series' place on a leaderboard."""
+    rank: int  # 1 = best in the cohort; ties share a rank
+    percentile: float  # share of the rest of the cohort ranked below, ties counted half
+    suburb: str
+    property_type: str
+    district: Optional[str] = None  # district most of the suburb's sales fall in
+    postcode: Optional[str] = None
+    value: float  # the ranked metric
+    current_median_price: Optional[float] = None
+    current_num_sales: Optional[int] = None
+
+
+class LeaderboardResponse(BaseModel):
+    """Response schema for a leaderboard."""
+    metric: str
+    order: str
+    k: int
+    items: List[LeaderboardEntry]
+    cohort_size: int  # series matching the filters with a value for the metric
+    cohort_median: Optional[float] = None
+    elapsed_ms: float
+
+
+# Batch Schemas
+class BatchRequestItem(BaseModel):
+    """One GET sub-request of a batch."""
+    path: str  # API path with query string, e.g. '/api/analytics/NEWTOWN?property_type=unit'
+    id: Optional[str] = None  # echoed back to match responses to requests
+
+
+class BatchRequest(BaseModel):
+    """Request schema for a batch of GET sub-requests."""
+    requests: List[BatchRequestItem]
+
+
+class BatchResponseItem(BaseModel):
+    """Result of one sub-request, in request order."""
+    id: Optional[str] = None
+    path: str
+    status: int  # HTTP status the sub-request would have returned
+    body: Any  # decoded JSON body (text for non-JSON responses)
+
+
+class BatchResponse(BaseModel):
+    """Response schema for a batch of GET sub-requests."""
+    responses: List[BatchResponseItem]
+    elapsed_ms: float
+
+
+# Memory Debugging Schemas
+class MemoryStructure(BaseModel):
+    """An accounted in-process structure."""
+    name: str
+    kind: str  # cached (evictable), heap or mapped (file-backed, not budgeted)
+    mb: float
+    entries: int
+    budget_mb: Optional[float] = None
+    evictions: int  # values evicted to make room since startup
+    refusals: int  # values refused by the budgets since startup
+
+
+class MemoryResponse(BaseModel):
+    """Response schema for /debug/memory."""
+    pid: int
+    rss_mb: float
+    pss_mb: float
+    uss_mb: float
+    shared_mb: float
+    heap_mb: float  # accounted heap structures, cached included
+    mapped_mb: float
+    policy: str
+    total_budget_mb: Optional[float] = None
+    sqlite_cache_mb: float  # page cache per connection
+    sqlite_mmap_mb: float
+    tracing: bool  # tracemalloc is on
+    structures: List[MemoryStructure]
+
+
+class TracedAllocation(BaseModel):
+    """Allocations grouped by where they were made."""
+    where: List[str]  # file:line, innermost frame last for tracebacks
+    mb: float
+    count: int
+    mb_diff: Optional[float] = None
+    count_diff: Optional[int] = None
+
+
+class TracemallocResponse(BaseModel):
+    """Response schema for a tracemalloc snapshot."""
+    group_by: str
+    compare: bool
+    traced_mb: float
+    peak_mb: float
+    top: List[TracedAllocation]
@@ -0,0 +1,137 @@
+"""Serve prerendered API responses from a snapshot built by src/db/build_snapshot.py.
+
+The snapshot holds the exact bodies the live routes return for every
+suburb's analytics and quarterly series and for the analytics list pages,
+stored gzip and brotli compressed. A GET whose path and query string match a
+snapshot entry is answered from those bytes without reaching a route; any
+other request (other parameters, other routes) goes to the live API.
+
+A snapshot is only served if it was built from the dataset version and API
+source code currently running, so a stale snapshot (including after a
+dataset hot swap) falls back to the live routes.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from ..config import PROJECT_ROOT, SNAPSHOT_DIR
+from .. import memory
+from ..db.dataset import dataset_version
+from ..services.geometry import accepted_encodings
+
+# Stored encodings in preference order -> file suffix (identity is decompressed from gzip)
+SNAPSHOT_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Set False to bypass the snapshot, e.g. while rendering a new one
+serving = True
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def snapshot_key(path: str, query_string: str) -> str:
+    """Canonical form of a request: path plus its query parameters in sorted order."""
+    params = sorted(parse_qsl(query_string, keep_blank_values=True))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Hash of the backend source, so code changes invalidate a snapshot like data changes.
+
+    Computed once per process: the source a process runs does not change under it.
+    """
+    digest = hashlib.sha256()
+    source = PROJECT_ROOT / "src"
+    for path in sorted(source.rglob("*.py")):
+        digest.update(str(path.relative_to(source)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_index(directory: Path = SNAPSHOT_DIR) -> Dict[str, str]:
+    """
+    Snapshot entries (snapshot_key -> file stem) if a current snapshot exists.
+
+    Loaded once per dataset version; empty if there is no snapshot or it was
+    built from another dataset or code version.
+    """
+    global _index
+    version = dataset_version()
+    if _index is None or _index[0] != version:
+        with _index_lock:
+            if _index is None or _index[0] != version:
+                entries = {}
+                manifest_path = Path(directory) / "manifest.json"
+                if manifest_path.exists():
+                    manifest = json.loads(manifest_path.read_bytes())
+                    if manifest["dataset_version"] == version and manifest["code_version"] == code_version():
+                        entries = manifest["entries"]
+                    else:
+                        print(f"WARNING: snapshot in {directory} is stale; serving the live API")
+                _index = (version, entries)
+    return _index[1]
+
+
+memory.track(
+    "snapshot_index",
+    lambda: (memory.deep_sizeof(_index[1]), len(_index[1])) if _index is not None else (0, 0),
+)
+
+
+def snapshot_body(stem: str, accepted: set, directory: Path = SNAPSHOT_DIR) -> Optional[Tuple[bytes, str]]:
+    """
+    Best stored encoding of a snapshot entry the client accepts.
+
+    Returns:
+        (body, content coding), or None if the entry's files are missing or
+        the client accepts none of the encodings (the live route answers)
+    """
+    path = Path(directory) / stem
+    try:
+        for encoding, suffix in SNAPSHOT_ENCODINGS:
+            if encoding in accepted:
+                try:
+                    return path.with_name(stem + suffix).read_bytes(), encoding
+                except FileNotFoundError:
+                    continue
+        if "identity" not in accepted:
+            return None
+        return gzip.decompress(path.with_name(stem + ".gz").read_bytes()), "identity"
+    except FileNotFoundError:
+        return None
+
+
+class SnapshotMiddleware:
+    """ASGI middleware answering snapshot GETs before they reach the routes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not serving:
+            await self.app(scope, receive, send)
+            return
+
+        stem = snapshot_index().get(snapshot_key(scope["path"], scope["query_string"].decode("latin-1")))
+        accept_encoding = next((value for key, value in scope["headers"] if key == b"accept-encoding"), b"")
+        found = snapshot_body(stem, accepted_encodings(accept_encoding.decode("latin-1"))) if stem else None
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+
+        body, encoding = found
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if encoding != "identity":
+            headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body if scope["method"] == "GET" else b""})
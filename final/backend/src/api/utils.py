@@ -1,57 +1,74 @@
 """Shared utility functions for API routes."""
 from fastapi import HTTPException
-from typing import Optional, Dict, List, Any
-from sqlalchemy.engine import Row
+from typing import Optional, Tuple
 
+from ..db.repository import quarter_key, LEVELS
 
-def validate_property_type(property_type: Optional[str]) -> None:
+
+def validate_property_type(property_type: Optional[str], required: bool = False) -> None:
     """
     Validate that property_type is either 'house' or 'unit'.
     
     Args:
         property_type: The property type to validate
+        required: Whether the route needs exactly one type, so that None
+            and "" (which otherwise mean both) are rejected too
         
     Raises:
         HTTPException: If property_type is not None and not 'house' or 'unit'
     """
-    if property_type and property_type not in ["house", "unit"]:
+    if (property_type or required) and property_type not in ["house", "unit"]:
         raise HTTPException(
             status_code=400,
             detail="property_type must be 'house' or 'unit'"
         )
 
 
-def build_where_clause(
-    conditions: List[str],
-    params: Dict[str, any]
-) -> str:
+def validate_level(level: str) -> None:
     """
-    Build a WHERE clause from conditions list.
+    Validate an aggregation level (suburb, postcode, district or metro).
     
     Args:
-        conditions: List of condition strings (e.g., ["suburb = :suburb", "property_type = :property_type"])
-        params: Dictionary of parameters for the conditions
+        level: The level to validate
         
-    Returns:
-        WHERE clause string (e.g., "suburb = :suburb AND property_type = :property_type" or "1=1" if empty)
+    Raises:
+        HTTPException: If level is not one of LEVELS
     """
-    return " AND ".join(conditions) if conditions else "1=1"
+    if level not in LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"level must be one of: {', '.join(LEVELS)}"
+        )
 
 
-def row_to_dict(row: Row, column_mapping: Dict[int, str]) -> Dict[str, Any]:
+def quarter_range(
+    start_year: Optional[int],
+    start_quarter: int,
+    end_year: Optional[int],
+    end_quarter: int
+) -> Tuple[Optional[int], Optional[int]]:
     """
-    Convert a SQLAlchemy Row to a dictionary using column mapping.
-    
-    This is a safer alternative to positional indexing. For SQLAlchemy 1.4+,
-    consider using row._mapping directly instead.
+    Convert a quarter-aligned date range into inclusive quarter keys.
     
     Args:
-        row: SQLAlchemy Row object
-        column_mapping: Dictionary mapping column index to field name
-            (e.g., {0: "id", 1: "suburb", 2: "property_type"})
+        start_year: First year of the range (None for unbounded)
+        start_quarter: First quarter within start_year
+        end_year: Last year of the range (None for unbounded)
+        end_quarter: Last quarter within end_year
         
     Returns:
-        Dictionary with field names as keys
+        (start_key, end_key) tuple, see db.repository.quarter_key
+        
+    Raises:
+        HTTPException: If the range ends before it starts
     """
-    return {field_name: row[idx] for idx, field_name in column_mapping.items()}
-
+    start_key = quarter_key(start_year, start_quarter) if start_year is not None else None
+    end_key = quarter_key(end_year, end_quarter) if end_year is not None else None
+    
+    if start_key is not None and end_key is not None and start_key > end_key:
+        raise HTTPException(
+            status_code=400,
+            detail="Date range end must not be before its start"
+        )
+    
+    return start_key, end_key
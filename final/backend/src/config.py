@@ -3,14 +3,73 @@ import os
 from pathlib import Path
 
 # Database configuration
+# sqlite:///path/to/database.sqlite  -> SQLite row store (default)
+# parquet:///path/to/transformed_split -> columnar Parquet/Arrow engine
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "sqlite:///src/db/database.sqlite"
 )
 
+# Storage backend derived from the DATABASE_URL scheme
+STORAGE_BACKEND = "parquet" if DATABASE_URL.startswith("parquet://") else "sqlite"
+
+# Hot swapping of the dataset (src/db/hot_swap.py): seconds between checks of
+# DATABASE_URL for a new file (0 = only on SIGHUP), the smallest accepted row
+# count of a new dataset relative to the served one, and how long a replaced
+# dataset stays open for requests still using it
+DATASET_WATCH_INTERVAL = float(os.getenv("DATASET_WATCH_INTERVAL", "0"))
+DATASET_MIN_ROW_RATIO = float(os.getenv("DATASET_MIN_ROW_RATIO", "0.5"))
+DATASET_DRAIN_TIMEOUT = float(os.getenv("DATASET_DRAIN_TIMEOUT", "60"))
+
+# Startup warm-up (src/services/warmup.py): "blocking" finishes it before the
+# server accepts connections, "background" serves (with /health 503) while it
+# runs, "off" skips it; and at most this many MB of data files are pre-read
+WARMUP = os.getenv("WARMUP", "blocking")
+WARMUP_TOUCH_MAX_MB = float(os.getenv("WARMUP_TOUCH_MAX_MB", "256"))
+
+# Connections per dataset kept by the async engine of the async routes (see
+# src/db/async_repository.py), and as many again opened under load; a paged
+# listing uses two at once
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "25"))
+
+# SQLite memory per connection: page cache in MB (SQLite's default is about
+# 2) and bytes of the file memory-mapped in MB (0 = reads go through the page
+# cache only)
+SQLITE_CACHE_MB = float(os.getenv("SQLITE_CACHE_MB", "2"))
+SQLITE_MMAP_MB = float(os.getenv("SQLITE_MMAP_MB", "0"))
+
+# Memory budgets for in-process structures (src/memory.py): MB for all of
+# them together (0 = unlimited), per structure as "name=MB,name=MB", and
+# whether a structure over budget evicts the least recently used cached
+# values ("evict") or is refused ("refuse")
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "0"))
+MEMORY_BUDGETS = os.getenv("MEMORY_BUDGETS", "")
+MEMORY_BUDGET_POLICY = os.getenv("MEMORY_BUDGET_POLICY", "evict")
+
+# Serve /debug/memory and the allocation tracing endpoints
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "0") == "1"
+
 # API configuration
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
 
+# Pre-forked serving (python -m src.serve): worker processes forked from one
+# warmed parent, and seconds between reports of their memory (0 = only on SIGUSR1)
+WORKERS = int(os.getenv("WORKERS", "1"))
+MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", "0"))
+
+# Ad-hoc aggregation limits (/api/aggregate)
+AGGREGATE_MAX_GROUPS = int(os.getenv("AGGREGATE_MAX_GROUPS", "5000"))
+AGGREGATE_TIME_BUDGET_MS = float(os.getenv("AGGREGATE_TIME_BUDGET_MS", "2000"))
+
+# Maximum sub-requests in one POST /api/batch
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "100"))
+
 # Project root
 PROJECT_ROOT = Path(__file__).parent.parent
+
+# Simplified suburb boundaries written by src/db/build_geometry.py
+GEOMETRY_DIR = Path(os.getenv("GEOMETRY_DIR", str(PROJECT_ROOT / "src" / "db" / "geometry")))
+
+# Prerendered API responses written by src/db/build_snapshot.py
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", str(PROJECT_ROOT / "src" / "db" / "snapshot")))
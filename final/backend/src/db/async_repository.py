@@ -0,0 +1,153 @@
+"""Async access to the storage repository for async def routes.
+
+Sync routes run in Starlette's worker threadpool, so concurrent requests are
+capped by its size and each pays a thread hop. Async routes instead await an
+AsyncRepository: under SQLite its queries go through SQLAlchemy's async
+engine on the aiosqlite driver, where each pooled connection runs its
+queries on its own thread while the event loop serves other requests.
+
+The count and page queries of a paged listing do not depend on each other,
+so for the listings over the large tables (properties, quarterly, monthly)
+they are issued concurrently on two connections (see PagedQuery). Every
+other Repository method runs unchanged on one async session through
+run_sync, so both access paths share one copy of the SQL; on the small
+analytics table a second connection costs more than the query.
+
+The Parquet backend has no async driver, and its methods are CPU work
+rather than waits: the first access to a dataset builds the price index,
+monthly table, rollups, price bins and sketches, and every call filters
+Arrow columns. They run in Starlette's threadpool so they do not block the
+event loop.
+"""
+import asyncio
+from contextvars import ContextVar
+from datetime import date
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .repository import Repository
+from .sqlite_repository import (
+    PagedQuery,
+    SQLiteRepository,
+    _rows,
+    monthly_query,
+    properties_query,
+    quarterly_query,
+)
+
+
+class AsyncRepository:
+    """
+    Awaitable counterpart of Repository on one dataset.
+
+    Every Repository method is available as a coroutine with the same
+    arguments and results, e.g. `await repo.suburb_analytics(suburb)`.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not callable(getattr(Repository, name, None)):
+            raise AttributeError(name)
+        return partial(self._call, name)
+
+    def _call_sync(self, name: str, *args, **kwargs) -> Any:
+        with self.dataset.repository() as repo:
+            return getattr(repo, name)(*args, **kwargs)
+
+    async def _call(self, name: str, *args, **kwargs) -> Any:
+        if self.dataset.backend == "parquet":
+            return await run_in_threadpool(self._call_sync, name, *args, **kwargs)
+
+        async with self.dataset.async_session() as session:
+            return await session.run_sync(lambda db: getattr(SQLiteRepository(db), name)(*args, **kwargs))
+
+    async def _scalar(self, query: PagedQuery) -> Any:
+        async with self.dataset.async_session() as session:
+            return (await session.execute(query.count, query.params)).scalar()
+
+    async def _page(self, query: PagedQuery) -> List[Dict[str, Any]]:
+        async with self.dataset.async_session() as session:
+            return _rows(await session.execute(query.page, query.page_params))
+
+    async def _paged(self, name: str, query: PagedQuery, **kwargs) -> Tuple[List[Dict[str, Any]], int]:
+        """Count and page concurrently (SQLite), or the Repository method (Parquet)."""
+        if self.dataset.backend == "parquet":
+            return await self._call(name, **kwargs)
+        rows, total = await asyncio.gather(self._page(query), self._scalar(query))
+        return rows, total
+
+    async def list_properties(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        kwargs = dict(
+            suburb=suburb, property_type=property_type, min_price=min_price, max_price=max_price,
+            start_date=start_date, end_date=end_date, limit=limit, offset=offset,
+        )
+        return await self._paged("list_properties", properties_query(**kwargs), **kwargs)
+
+    async def list_quarterly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        quarter: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        kwargs = dict(
+            suburb=suburb, property_type=property_type, year=year, quarter=quarter,
+            start_year=start_year, end_year=end_year, limit=limit, offset=offset, level=level,
+        )
+        return await self._paged("list_quarterly", quarterly_query(**kwargs), **kwargs)
+
+    async def list_monthly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        kwargs = dict(
+            suburb=suburb, property_type=property_type, year=year, month=month,
+            start_year=start_year, end_year=end_year, limit=limit, offset=offset,
+        )
+        return await self._paged("list_monthly", monthly_query(**kwargs), **kwargs)
+
+
+# Async repository shared by every request dispatched inside a shared_repository block
+shared_async: ContextVar[Optional[AsyncRepository]] = ContextVar("shared_async_repository", default=None)
+
+
+async def get_async_repository() -> AsyncIterator[AsyncRepository]:
+    """
+    Dependency function for FastAPI to get an AsyncRepository on the served
+    dataset, which stays open until the response is sent.
+    """
+    from .dataset import current_dataset
+
+    shared = shared_async.get()
+    if shared is not None:
+        # Owned by shared_repository
+        yield shared
+        return
+    with current_dataset().async_repository() as repo:
+        yield repo
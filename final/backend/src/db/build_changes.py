@@ -0,0 +1,163 @@
+"""Record what changed in a new dataset since the deployed one.
+
+Run once a new database (or Parquet directory) is built, before deploying
+it, against the dataset currently served. Every row of the CHANGE_TABLES
+(see repository.py) is matched to the previous dataset's by its key and
+compared on its data columns (ids and build timestamps are ignored). The
+keys of the rows added, changed or removed are appended to the change log
+carried over from the previous dataset, under the previous dataset's
+version. /api/changes?since=<version> answers from that log, so a client
+holding any version still in it fetches only what changed.
+
+The previous version is computed as the server computes it (see
+dataset.py), including GEOMETRY_DIR, so run this with the deployed
+GEOMETRY_DIR. The log keeps the last KEEP_VERSIONS versions.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .dataset import Dataset
+from .parquet_repository import CHANGES_SCHEMA, HISTORY_SCHEMA
+from .repository import ANALYTICS_COLUMNS, CHANGE_TABLES, MONTHLY_COLUMNS, QUARTERLY_COLUMNS, Repository
+
+# Earlier versions a client can be on and still sync from the log
+KEEP_VERSIONS = 20
+
+TABLE_COLUMNS = {
+    "suburb_quarterly": QUARTERLY_COLUMNS,
+    "suburb_monthly": MONTHLY_COLUMNS,
+    "suburb_analytics": ANALYTICS_COLUMNS,
+}
+
+# Set when a row is written rather than derived from the data
+BUILD_COLUMNS = {"id", "created_at", "last_updated"}
+
+HISTORY_COLUMNS = HISTORY_SCHEMA.names
+LOG_COLUMNS = CHANGES_SCHEMA.names
+
+
+def _hashed_rows(repo: Repository, table: str) -> pd.DataFrame:
+    """A table's key columns and a hash of each row's other data columns."""
+    keys = CHANGE_TABLES[table]
+    columns = [name for name in TABLE_COLUMNS[table] if name not in BUILD_COLUMNS]
+    frame = pd.DataFrame(repo.load_columns(table, columns))
+
+    rows = frame[keys].copy()
+    for key in keys:
+        if key not in ("suburb", "property_type"):
+            # load_columns returns numbers as float64
+            rows[key] = rows[key].astype(np.int64)
+    rows["row_hash"] = pd.util.hash_pandas_object(frame[[c for c in columns if c not in keys]], index=False).to_numpy()
+    return rows
+
+
+def diff_table(previous: Repository, current: Repository, table: str) -> pd.DataFrame:
+    """
+    Keys of a table's rows added, changed or removed between two datasets.
+
+    Returns:
+        DataFrame of the table's key columns and change
+    """
+    keys = CHANGE_TABLES[table]
+    old = _hashed_rows(previous, table)
+    new = _hashed_rows(current, table)
+
+    present = old[keys].merge(new[keys], on=keys, how="outer", indicator=True)
+    added = present[present["_merge"] == "right_only"][keys].assign(change="added")
+    removed = present[present["_merge"] == "left_only"][keys].assign(change="removed")
+
+    both = old.merge(new, on=keys, suffixes=("_old", "_new"))
+    changed = both[both["row_hash_old"] != both["row_hash_new"]][keys].assign(change="changed")
+    return pd.concat([added, changed, removed], ignore_index=True)
+
+
+def _write_sqlite(path: Path, history: pd.DataFrame, log: pd.DataFrame) -> None:
+    import sqlite3
+
+    conn = sqlite3.connect(str(path))
+    try:
+        for name, frame in (("dataset_history", history), ("dataset_changes", log)):
+            # Databases initialised before the change log get the table from pandas
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone():
+                conn.execute(f"DELETE FROM {name}")
+            frame.to_sql(name, conn, if_exists="append", index=False, method="multi", chunksize=2000)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _write_parquet(directory: Path, history: pd.DataFrame, log: pd.DataFrame) -> None:
+    for name, frame, schema in (("dataset_history", history, HISTORY_SCHEMA), ("dataset_changes", log, CHANGES_SCHEMA)):
+        pq.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False), directory / f"{name}.parquet")
+
+
+def _url(path: Path) -> str:
+    path = Path(path).resolve()
+    return f"parquet:///{path}" if path.is_dir() else f"sqlite:///{path}"
+
+
+def build_changes(dataset_path: Path, previous_path: Path, keep: int = KEEP_VERSIONS) -> int:
+    """
+    Write the change log of a new dataset relative to the previous one.
+
+    Args:
+        dataset_path: New SQLite file or Parquet directory (written to)
+        previous_path: SQLite file or Parquet directory currently served
+        keep: Earlier versions kept in the log
+
+    Returns:
+        Number of changed keys since the previous dataset
+    """
+    previous = Dataset(_url(previous_path))
+    current = Dataset(_url(dataset_path))
+    try:
+        with previous.repository() as old, current.repository() as new:
+            history = pd.DataFrame(old.change_history(), columns=HISTORY_COLUMNS)
+            log = pd.DataFrame(old.change_log(0), columns=LOG_COLUMNS)
+            position = int(history["position"].max()) + 1 if len(history) else 0
+
+            steps: List[pd.DataFrame] = []
+            for table in CHANGE_TABLES:
+                changes = diff_table(old, new, table)
+                print(f"    {table}: {len(changes):,} changed rows")
+                steps.append(changes.assign(table_name=table))
+    finally:
+        previous.close()
+        current.close()
+
+    step = pd.concat(steps, ignore_index=True).assign(position=position).reindex(columns=LOG_COLUMNS)
+    built_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    entry = pd.DataFrame([{"position": position, "version": previous.version, "built_at": built_at}])
+    history = pd.concat([history, entry], ignore_index=True) if len(history) else entry
+    log = pd.concat([log, step], ignore_index=True) if len(log) else step
+
+    # Drop the oldest versions beyond keep
+    history = history.astype({"position": np.int64})
+    log = log.astype({"position": np.int64, "year": "Int64", "quarter": "Int64", "month": "Int64"})
+    oldest = history["position"].nlargest(keep).min()
+    history = history[history["position"] >= oldest]
+    log = log[log["position"] >= oldest]
+
+    if current.backend == "parquet":
+        _write_parquet(current.resolved, history, log)
+    else:
+        _write_sqlite(current.resolved, history, log)
+    print(f"Logged {len(step):,} changes since {previous.version} ({len(history)} versions, {len(log):,} entries)")
+    return len(step)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Run as a module from the backend directory:
+    # python -m src.db.build_changes <new dataset> <previous dataset> [keep]
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python -m src.db.build_changes <new dataset> <previous dataset> [keep]")
+    build_changes(Path(sys.argv[1]), Path(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else KEEP_VERSIONS)
+    print("\nSUCCESS: Change log built")
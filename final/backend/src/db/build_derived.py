@@ -0,0 +1,52 @@
+"""Build derived tables from the base tables loaded by 06_store_data.ipynb."""
+import sqlite3
+import time
+from pathlib import Path
+
+from .price_bins import build_price_bins
+from .quantile_sketch import build_quantile_sketches
+from .rollups import build_area_quarterly, build_area_analytics
+from .monthly import build_suburb_monthly
+from .repeat_sales import build_price_index
+
+# (table name, builder) in build order; each builder takes an open connection
+# and returns the number of rows written
+DERIVED_STEPS = [
+    ("suburb_price_bins", build_price_bins),
+    ("suburb_price_sketches", build_quantile_sketches),
+    ("area_quarterly", build_area_quarterly),
+    ("area_analytics", build_area_analytics),
+    ("suburb_monthly", build_suburb_monthly),
+    ("price_index", build_price_index),
+]
+
+
+def build_derived_tables(db_path: str = "src/db/database.sqlite"):
+    """
+    Rebuild every derived table in an already populated database.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    db_path_obj = Path(db_path)
+    if not db_path_obj.exists():
+        raise FileNotFoundError(f"Database not found: {db_path_obj}")
+
+    conn = sqlite3.connect(str(db_path_obj))
+    try:
+        for table, builder in DERIVED_STEPS:
+            print(f"Building {table}...")
+            start = time.perf_counter()
+            rows = builder(conn)
+            print(f"    Wrote {rows:,} rows in {time.perf_counter() - start:.1f}s")
+    finally:
+        conn.close()
+
+    print("\nSUCCESS: Derived tables built")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Run as a module from the backend directory: python -m src.db.build_derived [db_path]
+    build_derived_tables(sys.argv[1] if len(sys.argv) > 1 else "src/db/database.sqlite")
@@ -0,0 +1,489 @@
+"""Build multi-resolution simplified suburb boundaries from the suburbs GeoJSON.
+
+sydney_suburbs.geojson (08_geojson.ipynb) is a multi-megabyte file at full
+survey resolution. This step writes one TopoJSON file per level of detail,
+each simplified for a map zoom, plus a plain GeoJSON decoding of the same
+level for clients without a TopoJSON decoder, and locations.json with each
+suburb's centroid and bounding box for spatial queries. Every file is precompressed
+(gzip, and brotli when the brotli package is installed) so the API serves
+bytes without compressing per request.
+
+Simplification preserves topology between suburbs: rings are cut into arcs
+at junctions (vertices where the set of neighbouring suburbs changes), each
+shared border is stored once and simplified once with Douglas-Peucker, so
+neighbours keep identical borders with no gaps or overlaps. Coordinates are
+quantized to an integer grid sized to the level's tolerance and delta
+encoded, as in the TopoJSON spec.
+"""
+import gzip
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ..config import GEOMETRY_DIR, PROJECT_ROOT
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always written
+    brotli = None
+
+SOURCE_GEOJSON = PROJECT_ROOT.parent / "frontend" / "public" / "sydney_suburbs.geojson"
+
+# Zoom each level of detail is built for; its tolerance is one screen pixel at that zoom
+LOD_ZOOMS = [9, 11, 13, 15]
+
+# Quantization grid steps per tolerance
+QUANTA_PER_TOLERANCE = 4
+
+# Source vertices closer than this (degrees) are treated as the same point
+SOURCE_PRECISION = 1e-7
+
+TILE_SIZE = 256
+
+# Feature properties kept in the output (the source carries ~20 per feature)
+FEATURE_PROPERTIES = ["suburb", "postcode", "lga_name"]
+
+Point = Tuple[int, int]
+
+
+def pixel_degrees(zoom: int) -> float:
+    """Degrees of longitude covered by one pixel at a web map zoom level."""
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    """Polygon parts of a Polygon or MultiPolygon geometry."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def _ring_points(ring: List[List[float]]) -> List[Point]:
+    """Snap a ring to the source grid, dropping repeats and the closing point."""
+    points = []
+    for x, y in (position[:2] for position in ring):
+        point = (round(x / SOURCE_PRECISION), round(y / SOURCE_PRECISION))
+        if not points or points[-1] != point:
+            points.append(point)
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points
+
+
+def build_topology(features: List[Dict[str, Any]]) -> Tuple[List[List[Point]], List[List[List[List[int]]]]]:
+    """
+    Cut feature rings into shared arcs.
+
+    Args:
+        features: GeoJSON features with Polygon/MultiPolygon geometry
+
+    Returns:
+        (arcs, shapes): arcs as lists of grid points, and per feature its
+        polygons as lists of rings, each ring a list of arc references
+        (~i for arc i reversed)
+    """
+    rings = [
+        [_ring_points(ring) for ring in polygon]
+        for feature in features
+        for polygon in _polygons(feature["geometry"])
+    ]
+
+    # A vertex is a junction when its neighbours differ between occurrences
+    neighbours = defaultdict(set)
+    for polygon in rings:
+        for ring in polygon:
+            for i, point in enumerate(ring):
+                pair = (ring[i - 1], ring[(i + 1) % len(ring)])
+                neighbours[point].add(min(pair, pair[::-1]))
+    junctions = {point for point, pairs in neighbours.items() if len(pairs) > 1}
+
+    arcs: List[List[Point]] = []
+    index: Dict[Tuple[Point, ...], int] = {}
+
+    def reference(arc: List[Point]) -> int:
+        key = tuple(arc)
+        if key in index:
+            return index[key]
+        if key[::-1] in index:
+            return ~index[key[::-1]]
+        index[key] = len(arcs)
+        arcs.append(arc)
+        return index[key]
+
+    shapes = []
+    position = 0
+    for feature in features:
+        shape = []
+        for _ in _polygons(feature["geometry"]):
+            polygon = []
+            for r, ring in enumerate(rings[position]):
+                if len(ring) < 3:
+                    if r == 0:
+                        break  # degenerate exterior: skip the whole part
+                    continue
+                cuts = [i for i, point in enumerate(ring) if point in junctions]
+                if not cuts:
+                    # Closed arc; start at the smallest point so an identical ring
+                    # (a hole filled by another suburb) maps to the same arc
+                    start = ring.index(min(ring))
+                    ring = ring[start:] + ring[:start]
+                    if ring[-1] < ring[1]:
+                        ring = [ring[0]] + ring[:0:-1]
+                        polygon.append([~reference(ring + [ring[0]])])
+                    else:
+                        polygon.append([reference(ring + [ring[0]])])
+                    continue
+                ring = ring[cuts[0]:] + ring[:cuts[0]]
+                cuts = [i - cuts[0] for i in cuts] + [len(ring)]
+                closed = ring + [ring[0]]
+                polygon.append([reference(closed[start:end + 1]) for start, end in zip(cuts, cuts[1:])])
+            if polygon:
+                shape.append(polygon)
+            position += 1
+        shapes.append(shape)
+
+    return arcs, shapes
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of a polyline, keeping both endpoints.
+
+    Args:
+        points: (n, 2) coordinates in units where tolerance applies on both axes
+        tolerance: Maximum distance of a dropped vertex from the simplified line
+
+    Returns:
+        Boolean mask of the vertices to keep
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        direction = b - a
+        length = math.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            distances = np.abs(direction[0] * (inner[:, 1] - a[1]) - direction[1] * (inner[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def _ring_size(ring: List[int], sizes: List[int]) -> int:
+    """Distinct vertices of a ring assembled from arcs of the given sizes."""
+    return sum(sizes[~arc if arc < 0 else arc] - 1 for arc in ring)
+
+
+def build_level(
+    arcs: List[List[Point]],
+    shapes: List[List[List[List[int]]]],
+    properties: List[Dict[str, Any]],
+    zoom: int,
+    y_scale: float,
+) -> Dict[str, Any]:
+    """
+    Simplify and quantize the topology for one zoom level.
+
+    Rings that would collapse below a triangle are dropped when they are
+    holes or secondary parts; a feature's main exterior ring keeps its arcs
+    at full detail instead, so every suburb stays on the map.
+
+    Args:
+        arcs: Shared arcs from build_topology
+        shapes: Arc references per feature from build_topology
+        properties: Output properties per feature
+        zoom: Map zoom the level is built for
+        y_scale: Latitude stretch (1 / cos of the centre latitude) that makes
+            degree distances isotropic on a web map
+
+    Returns:
+        TopoJSON Topology dictionary
+    """
+    tolerance = pixel_degrees(zoom) / SOURCE_PRECISION
+    scaled = [np.array(arc, dtype=np.float64) * (1.0, y_scale) for arc in arcs]
+    kept = [douglas_peucker(arc, tolerance) for arc in scaled]
+
+    # Main ring of each feature: the exterior ring of its largest part
+    main_parts = [
+        max(range(len(shape)), key=lambda p: sum(len(arcs[~a if a < 0 else a]) for a in shape[p][0])) if shape else None
+        for shape in shapes
+    ]
+    sizes = [int(mask.sum()) for mask in kept]
+    for shape, main in zip(shapes, main_parts):
+        if main is not None and _ring_size(shape[main][0], sizes) < 3:
+            for arc in shape[main][0]:
+                kept[~arc if arc < 0 else arc][:] = True
+    sizes = [int(mask.sum()) for mask in kept]
+
+    # Drop collapsed rings, then renumber the arcs still referenced
+    level_shapes = []
+    for shape, main in zip(shapes, main_parts):
+        level_shape = []
+        for p, polygon in enumerate(shape):
+            if _ring_size(polygon[0], sizes) < 3 and p != main:
+                continue
+            level_shape.append([ring for r, ring in enumerate(polygon) if r == 0 or _ring_size(ring, sizes) >= 3])
+        level_shapes.append(level_shape)
+
+    used = sorted({~arc if arc < 0 else arc for shape in level_shapes for polygon in shape for ring in polygon for arc in ring})
+    renumber = {old: new for new, old in enumerate(used)}
+
+    # Quantize to a grid of QUANTA_PER_TOLERANCE steps per tolerance
+    step = tolerance / QUANTA_PER_TOLERANCE
+    all_points = np.concatenate([np.array(arcs[i], dtype=np.float64) for i in used])
+    origin = all_points.min(axis=0)
+    scale = (step * SOURCE_PRECISION, step / y_scale * SOURCE_PRECISION)
+    translate = (origin[0] * SOURCE_PRECISION, origin[1] * SOURCE_PRECISION)
+
+    encoded = []
+    for i in used:
+        points = np.array(arcs[i], dtype=np.float64)[kept[i]]
+        grid = np.round((points - origin) / (step, step / y_scale)).astype(np.int64)
+        # Collapse repeats the coarser grid creates, keeping both endpoints
+        distinct = np.ones(len(grid), dtype=bool)
+        distinct[1:] = np.any(grid[1:] != grid[:-1], axis=1)
+        distinct[-1] = True
+        grid = grid[distinct]
+        deltas = np.vstack([grid[:1], np.diff(grid, axis=0)])
+        encoded.append(deltas.tolist())
+
+    geometries = []
+    for shape, props in zip(level_shapes, properties):
+        polygons = [
+            [[renumber[arc] if arc >= 0 else ~renumber[~arc] for arc in ring] for ring in polygon]
+            for polygon in shape
+        ]
+        if not polygons:
+            geometries.append({"type": None, "properties": props})
+        elif len(polygons) == 1:
+            geometries.append({"type": "Polygon", "arcs": polygons[0], "properties": props})
+        else:
+            geometries.append({"type": "MultiPolygon", "arcs": polygons, "properties": props})
+
+    return {
+        "type": "Topology",
+        "transform": {"scale": list(scale), "translate": list(translate)},
+        "objects": {"suburbs": {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": encoded,
+    }
+
+
+def topology_to_geojson(topology: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode a quantized topology into a GeoJSON FeatureCollection.
+
+    Coordinates are rounded to the decimals the quantization grid resolves.
+    """
+    (sx, sy), (tx, ty) = topology["transform"]["scale"], topology["transform"]["translate"]
+    decimals = max(0, int(math.ceil(-math.log10(min(sx, sy)))))
+
+    arcs = []
+    for arc in topology["arcs"]:
+        grid = np.cumsum(np.array(arc, dtype=np.float64), axis=0)
+        coords = np.round(grid * (sx, sy) + (tx, ty), decimals)
+        arcs.append(coords.tolist())
+
+    def ring(refs: List[int]) -> List[List[float]]:
+        coords = []
+        for ref in refs:
+            arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+            coords.extend(arc if not coords else arc[1:])
+        return coords
+
+    features = []
+    for geometry in topology["objects"]["suburbs"]["geometries"]:
+        if geometry["type"] is None:
+            shape = None
+        elif geometry["type"] == "Polygon":
+            shape = {"type": "Polygon", "coordinates": [ring(refs) for refs in geometry["arcs"]]}
+        else:
+            shape = {
+                "type": "MultiPolygon",
+                "coordinates": [[ring(refs) for refs in polygon] for polygon in geometry["arcs"]],
+            }
+        features.append({"type": "Feature", "properties": geometry["properties"], "geometry": shape})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _ring_area_centroid(ring: List[List[float]]) -> Tuple[float, float, float]:
+    """Unsigned area and centroid of a ring (shoelace formula in degrees)."""
+    points = np.array([position[:2] for position in ring], dtype=np.float64)
+    x, y = points[:, 0], points[:, 1]
+    cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, float(x.mean()), float(y.mean())
+    cx = ((x[:-1] + x[1:]) * cross).sum() / (6 * area)
+    cy = ((y[:-1] + y[1:]) * cross).sum() / (6 * area)
+    return abs(area), float(cx), float(cy)
+
+
+def suburb_locations(features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Centroid and bounding box per suburb name.
+
+    Features of the same suburb and postcode (e.g. split by LGA) are merged:
+    the bounding box covers every part and the centroid is area weighted,
+    with holes subtracted. The source also has places outside Sydney that
+    share a Sydney suburb's name; for those names the postcode group nearest
+    the median centroid of all suburbs (the metro area) is kept.
+
+    Returns:
+        One dictionary per suburb with suburb, postcode, longitude, latitude
+        and bbox [min_lon, min_lat, max_lon, max_lat], sorted by suburb
+    """
+    merged: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    for feature in features:
+        name = feature["properties"].get("suburb")
+        if not name:
+            continue
+        postcode = feature["properties"].get("postcode")
+        entry = merged.setdefault((name, postcode), {
+            "area": 0.0, "x": 0.0, "y": 0.0,
+            "bbox": [math.inf, math.inf, -math.inf, -math.inf],
+        })
+        for polygon in _polygons(feature["geometry"]):
+            for r, ring in enumerate(polygon):
+                area, cx, cy = _ring_area_centroid(ring)
+                sign = 1 if r == 0 else -1
+                entry["area"] += sign * area
+                entry["x"] += sign * area * cx
+                entry["y"] += sign * area * cy
+            xs = [position[0] for position in polygon[0]]
+            ys = [position[1] for position in polygon[0]]
+            bbox = entry["bbox"]
+            entry["bbox"] = [min(bbox[0], min(xs)), min(bbox[1], min(ys)), max(bbox[2], max(xs)), max(bbox[3], max(ys))]
+
+    candidates: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for (name, postcode), entry in merged.items():
+        bbox = entry["bbox"]
+        if entry["area"] > 0:
+            longitude, latitude = entry["x"] / entry["area"], entry["y"] / entry["area"]
+        else:
+            longitude, latitude = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+        candidates[name].append({
+            "suburb": name,
+            "postcode": postcode,
+            "longitude": longitude,
+            "latitude": latitude,
+            "bbox": bbox,
+        })
+
+    centre_lon = float(np.median([c["longitude"] for group in candidates.values() for c in group]))
+    centre_lat = float(np.median([c["latitude"] for group in candidates.values() for c in group]))
+    return [
+        min(candidates[name], key=lambda c: (c["longitude"] - centre_lon) ** 2 + (c["latitude"] - centre_lat) ** 2)
+        for name in sorted(candidates)
+    ]
+
+
+def _write(path: Path, document: Dict[str, Any]) -> Dict[str, int]:
+    """Write compact JSON and its precompressed variants; return bytes per encoding."""
+    body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    path.write_bytes(body)
+    sizes = {"identity": len(body)}
+
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    path.with_name(path.name + ".gz").write_bytes(compressed)
+    sizes["gzip"] = len(compressed)
+
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        path.with_name(path.name + ".br").write_bytes(compressed)
+        sizes["br"] = len(compressed)
+    return sizes
+
+
+def build_geometry(source: Path = SOURCE_GEOJSON, output_dir: Path = GEOMETRY_DIR) -> Dict[str, Any]:
+    """
+    Build every level of detail and the manifest describing them.
+
+    Args:
+        source: Suburbs GeoJSON written by 08_geojson.ipynb
+        output_dir: Directory the API serves geometry from
+
+    Returns:
+        The manifest written to output_dir/manifest.json
+    """
+    source = Path(source)
+    output_dir = Path(output_dir)
+    if not source.exists():
+        raise FileNotFoundError(f"GeoJSON not found: {source}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(source) as f:
+        features = [feature for feature in json.load(f)["features"] if feature.get("geometry")]
+
+    properties = [
+        {key: feature["properties"].get(key) for key in FEATURE_PROPERTIES}
+        for feature in features
+    ]
+
+    start = time.perf_counter()
+    arcs, shapes = build_topology(features)
+    source_points = sum(len(arc) - 1 for arc in arcs)
+    centre_latitude = float(np.mean([arc[0][1] for arc in arcs])) * SOURCE_PRECISION
+    y_scale = 1 / math.cos(math.radians(centre_latitude))
+    print(f"Topology: {len(features):,} features, {len(arcs):,} arcs in {time.perf_counter() - start:.1f}s")
+
+    levels = []
+    for zoom in LOD_ZOOMS:
+        start = time.perf_counter()
+        topology = build_level(arcs, shapes, properties, zoom, y_scale)
+        topojson_bytes = _write(output_dir / f"suburbs.z{zoom}.topojson", topology)
+        geojson_bytes = _write(output_dir / f"suburbs.z{zoom}.geojson", topology_to_geojson(topology))
+        points = sum(len(arc) for arc in topology["arcs"])
+        levels.append({
+            "zoom": zoom,
+            "tolerance_degrees": pixel_degrees(zoom),
+            "arcs": len(topology["arcs"]),
+            "points": points,
+            "bytes": {"topojson": topojson_bytes, "geojson": geojson_bytes},
+        })
+        print(
+            f"    z{zoom}: {points:,} points, topojson {topojson_bytes['gzip']:,} B gzip, "
+            f"geojson {geojson_bytes['gzip']:,} B gzip ({time.perf_counter() - start:.1f}s)"
+        )
+
+    locations = suburb_locations(features)
+    (output_dir / "locations.json").write_text(json.dumps({"suburbs": locations}, separators=(",", ":")))
+    print(f"    Locations: {len(locations):,} suburbs")
+
+    manifest = {
+        "source": source.name,
+        "source_bytes": source.stat().st_size,
+        "source_points": source_points,
+        "features": len(features),
+        "levels": levels,
+    }
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Run as a module from the backend directory: python -m src.db.build_geometry [source.geojson] [output_dir]
+    build_geometry(
+        Path(sys.argv[1]) if len(sys.argv) > 1 else SOURCE_GEOJSON,
+        Path(sys.argv[2]) if len(sys.argv) > 2 else GEOMETRY_DIR,
+    )
+    print("\nSUCCESS: Geometry built")
@@ -0,0 +1,137 @@
+"""Prerender the per-suburb API responses to a precompressed static snapshot.
+
+The dataset is fixed per image, so the responses of /api/analytics/{suburb}
+and /api/quarterly/{suburb} (each with no property type, house and unit) for
+every suburb, and every page of the default /api/analytics list, are known
+at build time. This step requests each one from the app in-process and
+stores the body gzip and (when the brotli package is installed) brotli
+compressed, with a manifest mapping each request to its files.
+
+src/api/snapshot.py serves matching requests from these files, as long as
+the dataset and the backend source are unchanged since the build.
+"""
+import gzip
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from urllib.parse import quote, urlencode
+
+from ..config import SNAPSHOT_DIR
+from .repository import open_repository
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always written
+    brotli = None
+
+# Per-suburb routes prerendered for each property type variant
+SUBURB_ROUTES = ["/api/analytics/{suburb}", "/api/quarterly/{suburb}"]
+PROPERTY_TYPES = [None, "house", "unit"]
+
+# Default page size of the /api/analytics list
+LIST_PAGE_SIZE = 100
+
+
+def _params(**params: Optional[object]) -> Dict[str, object]:
+    return {key: value for key, value in params.items() if value}
+
+
+def snapshot_requests() -> Iterator[Dict[str, object]]:
+    """Every (path, params) request the snapshot covers."""
+    with open_repository() as repo:
+        suburbs = sorted(set(repo.load_columns("suburb_analytics", ["suburb"])["suburb"].astype(str)))
+        totals = {
+            property_type: repo.list_analytics(property_type=property_type, limit=1)[1]
+            for property_type in PROPERTY_TYPES
+        }
+
+    for suburb in suburbs:
+        for route in SUBURB_ROUTES:
+            for property_type in PROPERTY_TYPES:
+                yield {"path": route.format(suburb=suburb), "params": _params(property_type=property_type)}
+
+    for property_type, total in totals.items():
+        for offset in range(0, max(total, 1), LIST_PAGE_SIZE):
+            yield {"path": "/api/analytics", "params": _params(property_type=property_type, offset=offset)}
+
+
+def _write(path: Path, body: bytes) -> Dict[str, int]:
+    """Write the precompressed variants of a body; return bytes per encoding."""
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    path.with_name(path.name + ".gz").write_bytes(compressed)
+    sizes = {"identity": len(body), "gzip": len(compressed)}
+
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        path.with_name(path.name + ".br").write_bytes(compressed)
+        sizes["br"] = len(compressed)
+    return sizes
+
+
+def build_snapshot(output_dir: Path = SNAPSHOT_DIR) -> Dict[str, object]:
+    """
+    Render every snapshot request and replace output_dir with the result.
+
+    Args:
+        output_dir: Directory the API serves the snapshot from
+
+    Returns:
+        The manifest written to output_dir/manifest.json (without entries)
+    """
+    from fastapi.testclient import TestClient
+
+    from ..api import snapshot
+    from ..api.snapshot import code_version, snapshot_key
+    from ..main import app
+    from .dataset import dataset_version
+
+    output_dir = Path(output_dir)
+    staging = output_dir.with_name(output_dir.name + ".building")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    # Render from the live routes, never from an existing snapshot
+    snapshot.serving = False
+    client = TestClient(app)
+
+    start = time.perf_counter()
+    entries = {}
+    totals: Dict[str, int] = {}
+    for request in snapshot_requests():
+        path = quote(request["path"])
+        query = urlencode(request["params"])
+        response = client.get(f"{path}?{query}" if query else path)
+        if response.status_code != 200:
+            print(f"    Skipped {request['path']} {query}: {response.status_code}")
+            continue
+
+        key = snapshot_key(request["path"], query)
+        stem = hashlib.sha256(key.encode()).hexdigest()[:24] + ".json"
+        for encoding, size in _write(staging / stem, response.content).items():
+            totals[encoding] = totals.get(encoding, 0) + size
+        entries[key] = stem
+
+    manifest = {
+        "dataset_version": dataset_version(),
+        "code_version": code_version(),
+        "responses": len(entries),
+        "bytes": totals,
+    }
+    (staging / "manifest.json").write_text(json.dumps({**manifest, "entries": entries}))
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    staging.rename(output_dir)
+    sizes = ", ".join(f"{size:,} B {encoding}" for encoding, size in totals.items())
+    print(f"Snapshot: {len(entries):,} responses ({sizes}) in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Run as a module from the backend directory: python -m src.db.build_snapshot [output_dir]
+    build_snapshot(Path(sys.argv[1]) if len(sys.argv) > 1 else SNAPSHOT_DIR)
+    print("\nSUCCESS: Snapshot built")
@@ -1,48 +1,117 @@
 """Database connection and session management using SQLAlchemy."""
 from pathlib import Path
-from sqlalchemy import create_engine
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 
-from ..config import DATABASE_URL
+from ..config import ASYNC_DB_POOL_SIZE, DATABASE_URL, SQLITE_CACHE_MB, SQLITE_MMAP_MB, STORAGE_BACKEND
 
 # Base class for declarative models
 Base = declarative_base()
 
-# Database path - use config.py as single source of truth
-DB_PATH = DATABASE_URL
 
-# Convert relative path to absolute if needed
-if DB_PATH.startswith("sqlite:///"):
-    db_file = DB_PATH.replace("sqlite:///", "")
+def sqlite_url(url: str) -> str:
+    """SQLite URL with a relative path made absolute from the project root."""
+    db_file = url.replace("sqlite:///", "", 1)
     if not Path(db_file).is_absolute():
-        # Get absolute path relative to project root
         project_root = Path(__file__).parent.parent.parent
-        db_file = project_root / db_file
-        DB_PATH = f"sqlite:///{db_file}"
+        return f"sqlite:///{project_root / db_file}"
+    return url
+
+
+def _set_memory_pragmas(dbapi_connection, _record) -> None:
+    """Size each connection's page cache and memory map (SQLITE_CACHE_MB, SQLITE_MMAP_MB)."""
+    cursor = dbapi_connection.cursor()
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size = {-int(SQLITE_CACHE_MB * 1024)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_MB * 1024 * 1024)}")
+    cursor.close()
+
+
+def create_session_factory(url: str):
+    """
+    Create an engine and session factory for a SQLite URL.
+
+    Returns:
+        (engine, sessionmaker bound to it)
+    """
+    # For SQLite, we need check_same_thread=False for FastAPI
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        echo=False  # Set to True for SQL query logging
+    )
+    event.listen(engine, "connect", _set_memory_pragmas)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def create_async_session_factory(url: str):
+    """
+    Create an async engine (aiosqlite driver) and session factory for a SQLite URL.
 
-# Create engine
-# For SQLite, we need check_same_thread=False for FastAPI
-engine = create_engine(
-    DB_PATH,
-    connect_args={"check_same_thread": False} if "sqlite" in DB_PATH else {},
-    echo=False  # Set to True for SQL query logging
-)
+    Returns:
+        (async engine, async_sessionmaker bound to it)
+    """
+    engine = create_async_engine(
+        url.replace("sqlite:///", "sqlite+aiosqlite:///", 1),
+        pool_size=ASYNC_DB_POOL_SIZE,
+        max_overflow=ASYNC_DB_POOL_SIZE,
+        # Read-only: nothing to roll back when a connection returns to the pool,
+        # and each rollback would be another round trip to the driver's thread
+        pool_reset_on_return=None,
+        echo=False
+    )
+    event.listen(engine.sync_engine, "connect", _set_memory_pragmas)
+    return engine, async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+# Database path - use config.py as single source of truth
+DB_PATH = sqlite_url(DATABASE_URL) if DATABASE_URL.startswith("sqlite:///") else DATABASE_URL
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Engine of the configured database, used by init_db. Requests go through the
+# served dataset (see dataset.py), which can be swapped for a new file at runtime.
+# Parquet URLs are served by the columnar repository and have no SQLAlchemy engine
+if STORAGE_BACKEND == "sqlite":
+    engine, SessionLocal = create_session_factory(DB_PATH)
+else:
+    engine = None
+    SessionLocal = None
 
 
 def get_db() -> Session:
     """
     Dependency function for FastAPI to get database session.
-    Yields a database session and ensures it's closed after use.
+    Yields a session on the served dataset and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    from .dataset import current_dataset
+
+    dataset = current_dataset()
+    if dataset.backend != "sqlite":
+        raise HTTPException(
+            status_code=501,
+            detail="This endpoint requires the SQLite storage backend"
+        )
+    with dataset.session() as db:
+        yield db
+
+
+async def get_async_db() -> AsyncSession:
+    """
+    Dependency function for FastAPI to get an async database session.
+    The async counterpart of get_db, for async def routes.
+    """
+    from .dataset import current_dataset
+
+    dataset = current_dataset()
+    if dataset.backend != "sqlite":
+        raise HTTPException(
+            status_code=501,
+            detail="This endpoint requires the SQLite storage backend"
+        )
+    async with dataset.async_session() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
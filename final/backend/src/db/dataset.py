@@ -0,0 +1,383 @@
+"""The served dataset, its version and in-process state derived from it.
+
+A Dataset is one opened copy of the data: the SQLite file (or Parquet
+directory) it resolved to, the engine or columnar repository reading it, and
+its version. Requests use the current dataset, which hot_swap.py can replace
+with a newly deployed file at runtime; a replaced dataset stays open until
+the requests already using it finish.
+
+A dataset is read-only, so anything computed from it (matrices, column
+arrays, fitted models) can be built once and reused by every request. Such
+builders are wrapped with @derived: results are cached per (name, arguments,
+dataset version), so a different dataset never serves stale state.
+"""
+import asyncio
+import hashlib
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .. import memory
+from ..config import DATABASE_URL, GEOMETRY_DIR, SQLITE_CACHE_MB, SQLITE_MMAP_MB
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Bytes read per hash update
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def dataset_path(url: str = DATABASE_URL) -> Path:
+    """The SQLite file or Parquet directory a DATABASE_URL names (relative to the project root)."""
+    if url.startswith("parquet://"):
+        path = Path(url.replace("parquet:///", "", 1))
+    else:
+        path = Path(url.replace("sqlite:///", "", 1))
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def dataset_files(path: Path) -> List[Path]:
+    """
+    Files backing a dataset: the SQLite file or the Parquet directory
+    contents, plus the built suburb geometry if present.
+    """
+    files = sorted(p for p in path.glob("*.parquet")) if path.is_dir() else [path]
+    if GEOMETRY_DIR.is_dir():
+        files += sorted(p for p in GEOMETRY_DIR.iterdir() if p.is_file())
+    return files
+
+
+def file_signature(path: Path) -> Tuple:
+    """Cheap change detector for a dataset path: its resolved target and stat."""
+    resolved = path.resolve()
+    try:
+        stat = resolved.stat()
+    except FileNotFoundError:
+        return (str(resolved), None)
+    return (str(resolved), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def content_version(files: List[Path]) -> str:
+    """
+    Short identifier of a dataset: a hash of its files' names and contents,
+    so identical data gets the same version across deploys and machines (and
+    so the same ETags and versioned URLs).
+    """
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(str(path.name).encode())
+        if not path.exists():
+            digest.update(b"missing")
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class Dataset:
+    """One opened copy of the data, pinned to the file it resolved to when opened."""
+
+    def __init__(self, url: str = DATABASE_URL):
+        self.url = url
+        self.backend = "parquet" if url.startswith("parquet://") else "sqlite"
+        self.path = dataset_path(url)
+        # A symlinked path is pinned to its target, so repointing the link
+        # later does not change what this dataset reads
+        self.signature = file_signature(self.path)
+        self.resolved = Path(self.signature[0])
+        self.version = content_version(dataset_files(self.resolved))
+
+        self.active = 0
+        self._active_lock = threading.Lock()
+        self._engine = None
+        self._session_factory = None
+        self._parquet = None
+        # Created on first use by an async route, on the serving event loop
+        self._async_engine = None
+        self._async_session_factory = None
+        self._async_loop = None
+
+        if self.backend == "sqlite":
+            from .database import create_session_factory
+
+            self._engine, self._session_factory = create_session_factory(f"sqlite:///{self.resolved}")
+        else:
+            from .parquet_repository import ParquetRepository
+
+            self._parquet = ParquetRepository(self.resolved)
+
+    @contextmanager
+    def _tracked(self) -> Iterator[None]:
+        with self._active_lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+    @contextmanager
+    def session(self):
+        """A SQLAlchemy session on this dataset (SQLite backend only)."""
+        with self._tracked():
+            db = self._session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+    def _async_factory(self):
+        """The async session factory, (re)created for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._active_lock:
+            if self._async_loop is not loop:
+                from .database import create_async_session_factory
+
+                # Pooled aiosqlite connections belong to the loop that opened them
+                if self._async_engine is not None:
+                    self._async_engine.sync_engine.dispose(close=False)
+                self._async_engine, self._async_session_factory = create_async_session_factory(
+                    f"sqlite:///{self.resolved}"
+                )
+                self._async_loop = loop
+            return self._async_session_factory
+
+    @asynccontextmanager
+    async def async_session(self):
+        """An async SQLAlchemy session on this dataset (SQLite backend only)."""
+        with self._tracked():
+            async with self._async_factory()() as db:
+                yield db
+
+    @contextmanager
+    def async_repository(self):
+        """An AsyncRepository reading this dataset, which stays open until exit."""
+        from .async_repository import AsyncRepository
+
+        with self._tracked():
+            yield AsyncRepository(self)
+
+    @contextmanager
+    def repository(self):
+        """A Repository reading this dataset, released on exit."""
+        if self.backend == "parquet":
+            with self._tracked():
+                yield self._parquet
+            return
+
+        from .sqlite_repository import SQLiteRepository
+
+        with self.session() as db:
+            yield SQLiteRepository(db)
+
+    def touch(self, max_bytes: float) -> int:
+        """
+        Read the dataset's files once so their pages (tables and indexes) are
+        in the OS page cache before the first request needs them.
+
+        Args:
+            max_bytes: Stop after reading this many bytes
+
+        Returns:
+            Number of bytes read
+        """
+        read = 0
+        for path in dataset_files(self.resolved):
+            if not path.exists():
+                continue
+            with open(path, "rb") as f:
+                while read < max_bytes:
+                    chunk = f.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    read += len(chunk)
+        return read
+
+    def memory_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Memory this dataset's storage holds, as (bytes, entries) per structure.
+
+        SQLite's page cache is an upper bound: SQLITE_CACHE_MB for each open
+        connection (the entries), filled as queries read pages. Its memory
+        map is at most SQLITE_MMAP_MB of the file, shared by the connections.
+        """
+        if self.backend == "parquet":
+            usage = self._parquet.memory_usage() if self._parquet is not None else {}
+            return {f"arrow_{kind}": size for kind, size in usage.items()}
+
+        connections = 0
+        for engine in (self._engine, self._async_engine and self._async_engine.sync_engine):
+            pool = getattr(engine, "pool", None)
+            if hasattr(pool, "checkedin"):
+                connections += pool.checkedin() + pool.checkedout()
+        size = self.resolved.stat().st_size if self.resolved.exists() else 0
+        mapped = min(size, int(SQLITE_MMAP_MB * 1024 * 1024)) if connections else 0
+        return {
+            "sqlite_page_cache": (int(connections * SQLITE_CACHE_MB * 1024 * 1024), connections),
+            "sqlite_mmap": (mapped, connections),
+        }
+
+    def after_fork(self) -> None:
+        """
+        Drop pooled connections inherited from the parent in a forked child,
+        without closing them for the parent; the child opens its own.
+        """
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+            self._async_engine = self._async_session_factory = self._async_loop = None
+
+    def close(self) -> None:
+        """Release the engine's pooled connections (call once no requests use it)."""
+        if self._engine is not None:
+            self._engine.dispose()
+        if self._async_engine is not None:
+            if self._async_loop.is_closed():
+                self._async_engine.sync_engine.dispose(close=False)
+            else:
+                # Its connections can only be closed on their event loop
+                asyncio.run_coroutine_threadsafe(self._async_engine.dispose(), self._async_loop)
+        self._parquet = None
+
+
+_served: Optional[Dataset] = None
+_served_lock = threading.Lock()
+
+# Dataset used instead of the served one in this context (set while warming a new one)
+_staged: ContextVar[Optional[Dataset]] = ContextVar("staged_dataset", default=None)
+
+
+def current_dataset() -> Dataset:
+    """The dataset requests in this context read: the staged one if any, else the served one."""
+    global _served
+    staged = _staged.get()
+    if staged is not None:
+        return staged
+    if _served is None:
+        with _served_lock:
+            if _served is None:
+                _served = Dataset(DATABASE_URL)
+    return _served
+
+
+@contextmanager
+def staged_dataset(dataset: Dataset) -> Iterator[Dataset]:
+    """Read a dataset that is not served yet in this context, e.g. to warm it."""
+    token = _staged.set(dataset)
+    try:
+        yield dataset
+    finally:
+        _staged.reset(token)
+
+
+def serve_dataset(dataset: Dataset) -> Dataset:
+    """
+    Make a dataset the one new requests read.
+
+    Returns:
+        The previously served dataset (still open for requests using it)
+    """
+    global _served
+    current_dataset()
+    with _served_lock:
+        previous, _served = _served, dataset
+    return previous
+
+
+def _storage_usage(name: str) -> Callable[[], Tuple[int, int]]:
+    return lambda: current_dataset().memory_usage().get(name, (0, 0))
+
+
+memory.track("sqlite_page_cache", _storage_usage("sqlite_page_cache"))
+memory.track("sqlite_mmap", _storage_usage("sqlite_mmap"), kind="mapped")
+memory.track("arrow_heap", _storage_usage("arrow_heap"))
+memory.track("arrow_mapped", _storage_usage("arrow_mapped"), kind="mapped")
+
+
+def dataset_version() -> str:
+    """Short identifier for the dataset requests in this context read (see content_version)."""
+    return current_dataset().version
+
+
+# (name, dataset version, args, kwargs) -> value
+_derived: Dict[Tuple, Any] = {}
+_derived_lock = threading.RLock()
+
+# Builders by name, so state built for one dataset can be rebuilt for another
+_builders: Dict[str, Callable] = {}
+
+
+def derived(name: str) -> Callable:
+    """
+    Cache a builder's result per argument set and dataset version.
+
+    Builders run at most once per key per version; concurrent callers of the
+    same key wait for the first build instead of repeating it. Results are
+    accounted under name against the memory budgets (see memory.py): one
+    that does not fit raises MemoryBudgetExceeded and is not cached, and
+    results evicted to make room for others are built again when next used.
+    """
+    def decorator(builder: Callable) -> Callable:
+        @wraps(builder)
+        def wrapper(*args, **kwargs):
+            key = (name, dataset_version(), args, tuple(sorted(kwargs.items())))
+
+            cached = _derived.get(key, _derived)
+            if cached is not _derived:
+                memory.touch(name, key)
+                return cached
+
+            with _derived_lock:
+                cached = _derived.get(key, _derived)
+                if cached is not _derived:
+                    return cached
+                # Refuse before building what did not fit when last built
+                memory.check(name, key[2:])
+                value = builder(*args, **kwargs)
+                memory.admit(name, key, value, _evict_derived, size_key=key[2:])
+                _derived[key] = value
+                return value
+
+        wrapper.derived_name = name
+        _builders[name] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def rebuild_derived(source_version: str) -> int:
+    """
+    Build, for the dataset in this context, everything built for another version.
+
+    Returns:
+        Number of derived values built
+    """
+    keys = [key for key in list(_derived) if key[1] == source_version]
+    built = 0
+    for name, _, args, kwargs in keys:
+        try:
+            _builders[name](*args, **dict(kwargs))
+        except memory.MemoryBudgetExceeded as e:
+            # Built on demand once the source version's state is dropped
+            print(f"WARNING: not prebuilding {name}: {e}")
+            continue
+        built += 1
+    return built
+
+
+def clear_derived(keep_version: Optional[str] = None) -> None:
+    """Drop cached derived state, except that of keep_version if given."""
+    with _derived_lock:
+        for key in list(_derived):
+            if key[1] != keep_version:
+                del _derived[key]
+                memory.release(key[0], key)
+
+
+def _evict_derived(key: Tuple) -> None:
+    # Without the build lock: a build can be what is making room
+    _derived.pop(key, None)
@@ -0,0 +1,206 @@
+"""Replace the served dataset with a newly deployed one without a restart.
+
+A new dataset is deployed by pointing DATABASE_URL's path at new data
+atomically: either repoint a symlink (ln -s new.sqlite tmp && mv -T tmp
+database.sqlite) or rename a complete file over it. Each opened dataset is
+pinned to the file the path resolved to, so with a symlink the old data stays
+readable by requests already using it.
+
+A reload, triggered by SIGHUP or by polling every DATASET_WATCH_INTERVAL
+seconds:
+
+1. opens the new data next to the served dataset,
+2. validates it: every table and column the API reads exists, and no table
+   shrank below DATASET_MIN_ROW_RATIO of its served row count,
+3. warms it: pre-reads its files and rebuilds, for the new version, every
+   @derived value built for the served one, while requests keep reading
+   the served dataset,
+4. switches new requests to it in one assignment,
+5. drops the old version's derived state and runs on_swap callbacks,
+6. closes the old dataset once its in-flight requests finish (or after
+   DATASET_DRAIN_TIMEOUT seconds).
+
+An invalid dataset is rejected and the served one stays in place.
+"""
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from ..config import DATASET_DRAIN_TIMEOUT, DATASET_MIN_ROW_RATIO, DATASET_WATCH_INTERVAL, WARMUP_TOUCH_MAX_MB
+from .dataset import (
+    Dataset, clear_derived, current_dataset, file_signature, rebuild_derived,
+    serve_dataset, staged_dataset,
+)
+from .repository import ANALYTICS_COLUMNS, MONTHLY_COLUMNS, PROPERTY_COLUMNS, QUARTERLY_COLUMNS
+
+# Tables a dataset must have, with the columns the API reads from each
+REQUIRED_TABLES = {
+    "properties": PROPERTY_COLUMNS,
+    "suburb_quarterly": QUARTERLY_COLUMNS,
+    "suburb_monthly": MONTHLY_COLUMNS,
+    "suburb_analytics": ANALYTICS_COLUMNS,
+}
+
+
+class DatasetInvalid(ValueError):
+    """A new dataset failed validation and was not served."""
+
+
+_swap_lock = threading.Lock()
+_wake = threading.Event()
+_on_swap: List[Callable[[], None]] = []
+
+# Signature of the last rejected dataset, so it is not revalidated every poll
+_rejected = None
+
+
+def on_swap(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback run after a new dataset is served (e.g. to clear caches)."""
+    _on_swap.append(callback)
+    return callback
+
+
+def table_counts(dataset: Dataset) -> Dict[str, int]:
+    """
+    Check a dataset's schema and count its rows.
+
+    Raises:
+        DatasetInvalid: If a required table or column is missing
+    """
+    counts = {}
+    with staged_dataset(dataset), dataset.repository() as repo:
+        for table, required in REQUIRED_TABLES.items():
+            columns, rows = repo.describe(table)
+            if not columns:
+                raise DatasetInvalid(f"Missing table: {table}")
+            missing = sorted(set(required) - set(columns))
+            if missing:
+                raise DatasetInvalid(f"{table} is missing columns: {', '.join(missing)}")
+            counts[table] = rows
+    return counts
+
+
+def validate(dataset: Dataset, previous: Dataset) -> Dict[str, int]:
+    """
+    Validate a new dataset against the one being served.
+
+    Returns:
+        Row count per required table
+
+    Raises:
+        DatasetInvalid: If the schema is incomplete or a table is empty or
+            shrank below DATASET_MIN_ROW_RATIO of its served size
+    """
+    counts = table_counts(dataset)
+    served = table_counts(previous)
+    for table, rows in counts.items():
+        if rows == 0 or rows < served[table] * DATASET_MIN_ROW_RATIO:
+            raise DatasetInvalid(f"{table} has {rows:,} rows (served: {served[table]:,})")
+    return counts
+
+
+def warm(dataset: Dataset, previous: Dataset) -> int:
+    """
+    Build the new dataset's in-process state before it is served.
+
+    Returns:
+        Number of derived values built
+    """
+    dataset.touch(WARMUP_TOUCH_MAX_MB * 1024 * 1024)
+    with staged_dataset(dataset):
+        return rebuild_derived(previous.version)
+
+
+def _drain(dataset: Dataset, timeout: float) -> None:
+    """Close a replaced dataset once no request uses it."""
+    deadline = time.monotonic() + timeout
+    while dataset.active and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if dataset.active:
+        print(f"WARNING: closing dataset {dataset.version} with {dataset.active} requests still open")
+    dataset.close()
+
+
+def reload_dataset(force: bool = False) -> Optional[Dataset]:
+    """
+    Serve the data now at DATABASE_URL's path if it changed.
+
+    Args:
+        force: Reopen even if the path's file looks unchanged
+
+    Returns:
+        The newly served dataset, or None if nothing changed
+
+    Raises:
+        DatasetInvalid: If the new data failed validation (the served dataset is kept)
+    """
+    global _rejected
+    with _swap_lock:
+        previous = current_dataset()
+        signature = file_signature(previous.path)
+        if not force and signature in (previous.signature, _rejected):
+            return None
+
+        started = time.perf_counter()
+        dataset = Dataset(previous.url)
+        if dataset.version == previous.version:
+            # Same content under a new file: keep serving what is open
+            dataset.close()
+            previous.signature = dataset.signature
+            return None
+
+        try:
+            counts = validate(dataset, previous)
+        except Exception:
+            _rejected = dataset.signature
+            dataset.close()
+            raise
+
+        built = warm(dataset, previous)
+        serve_dataset(dataset)
+        clear_derived(keep_version=dataset.version)
+        for callback in _on_swap:
+            callback()
+        threading.Thread(target=_drain, args=(previous, DATASET_DRAIN_TIMEOUT), daemon=True).start()
+
+        print(
+            f"Serving dataset {dataset.version} (was {previous.version}): "
+            f"{counts['properties']:,} properties, {built} derived values warmed "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return dataset
+
+
+def request_reload(*_) -> None:
+    """Wake the watcher to check for a new dataset now (the SIGHUP handler)."""
+    _wake.set()
+
+
+def _watch(interval: float) -> None:
+    while True:
+        _wake.wait(interval if interval > 0 else None)
+        _wake.clear()
+        try:
+            reload_dataset()
+        except DatasetInvalid as e:
+            print(f"WARNING: new dataset rejected: {e}")
+        except Exception as e:
+            print(f"WARNING: dataset reload failed: {e}")
+
+
+def start_watcher(interval: float = DATASET_WATCH_INTERVAL) -> threading.Thread:
+    """
+    Start the background reload thread and route SIGHUP to it.
+
+    Args:
+        interval: Seconds between checks for a new file; 0 checks only on SIGHUP
+    """
+    try:
+        signal.signal(signal.SIGHUP, request_reload)
+    except (AttributeError, ValueError):
+        # No SIGHUP on this platform, or not called from the main thread
+        pass
+    thread = threading.Thread(target=_watch, args=(interval,), name="dataset-watcher", daemon=True)
+    thread.start()
+    return thread
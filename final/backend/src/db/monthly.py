@@ -0,0 +1,64 @@
+"""Monthly per-suburb aggregates.
+
+suburb_monthly carries the suburb_quarterly metrics per calendar month, so
+month-resolution charts read a small pre-aggregated table rather than
+scanning properties.
+"""
+import sqlite3
+
+import pandas as pd
+
+from .period_stats import period_stats
+
+SERIES_KEYS = ["suburb", "property_type"]
+
+
+def monthly_stats(sales: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monthly price and settlement metrics per suburb and property type.
+
+    Args:
+        sales: Properties with settlement_date parsed
+
+    Returns:
+        DataFrame with the suburb_monthly columns
+    """
+    return period_stats(
+        sales,
+        SERIES_KEYS,
+        "month",
+        periods_per_year=12,
+        changes=[("mom_price_change_percentage", 1), ("yoy_price_change_percentage", 12)],
+    )
+
+
+def build_suburb_monthly(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild suburb_monthly from the properties table.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of monthly rows written
+    """
+    sales = pd.read_sql_query(
+        """
+        SELECT suburb, property_type, settlement_date, sale_price, days_on_market, contract_to_settlement_days
+        FROM properties
+        WHERE sale_price > 0
+        """,
+        conn,
+        parse_dates=["settlement_date"],
+    )
+    monthly = monthly_stats(sales)
+
+    # Databases whose suburb_monthly predates a column get it added
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(suburb_monthly)")}
+    if existing:
+        for column in monthly.columns.difference(list(existing)):
+            conn.execute(f"ALTER TABLE suburb_monthly ADD COLUMN {column} REAL")
+    conn.execute("DELETE FROM suburb_monthly")
+    monthly.to_sql("suburb_monthly", conn, if_exists="append", index=False, method="multi", chunksize=2000)
+    conn.commit()
+    return len(monthly)
@@ -0,0 +1,742 @@
+"""Columnar implementation of the storage repository over Parquet/Arrow files.
+
+On first load each Parquet pair in data/transformed_split/ (houses + units) is
+normalised to the SQLite schema column names and written next to it as an
+uncompressed Arrow IPC file. Subsequent loads memory-map that file, so tables
+are shared with the OS page cache instead of being copied into the heap.
+Filters are evaluated as vectorized pyarrow.compute predicates.
+"""
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .price_bins import price_bin_counts
+from .quantile_sketch import quarter_sketches
+from .monthly import monthly_stats
+from .repeat_sales import repeat_sales_index
+from .rollups import ROLLUP_LEVELS, build_rollups
+from .repository import (
+    Repository,
+    column_array,
+    DATE_COLUMNS,
+    STRING_COLUMNS,
+    PROPERTY_COLUMNS,
+    QUARTERLY_COLUMNS,
+    MONTHLY_COLUMNS,
+    ANALYTICS_COLUMNS,
+    ROLLUP_TABLES,
+)
+
+# Parquet files per table, keyed by property type
+SOURCE_FILES = {
+    "properties": {"house": "properties_houses.parquet", "unit": "properties_units.parquet"},
+    "suburb_quarterly": {"house": "quarterly_stats_houses.parquet", "unit": "quarterly_stats_units.parquet"},
+    "suburb_analytics": {"house": "suburb_analytics_houses.parquet", "unit": "suburb_analytics_units.parquet"},
+}
+
+# Parquet -> schema column names (mirrors notebooks/06_store_data.ipynb)
+COLUMN_MAPPING = {
+    "properties": {},
+    "suburb_quarterly": {
+        "sale_price_num_sales": "num_sales",
+        "sale_price_median_price_raw": "median_price",
+        "sale_price_median_price_smoothed": "median_price_smoothed",
+        "sale_price_mean_price": "mean_price",
+        "sale_price_min_price": "min_price",
+        "sale_price_max_price": "max_price",
+        "sale_price_price_stddev": "price_stddev",
+        "sale_price_price_p25": "price_p25",
+        "sale_price_price_p75": "price_p75",
+        "contract_to_settlement_days_median_ctsd": "median_ctsd",
+        "contract_to_settlement_days_mean_ctsd": "mean_ctsd",
+        "contract_to_settlement_days_fast_settlements_percentage": "fast_settlements_percentage",
+    },
+    "suburb_analytics": {
+        "total_sales_last_12m": "current_num_sales",
+        "growth_1yr_pct": "growth_1yr_percentage",
+        "growth_3yr_pct": "growth_3yr_percentage",
+        "growth_5yr_pct": "growth_5yr_percentage",
+        "growth_since_2005_pct": "growth_since_2005_percentage",
+        "growth_1yr_pct_smoothed": "growth_1yr_percentage_smoothed",
+        "growth_3yr_pct_smoothed": "growth_3yr_percentage_smoothed",
+        "growth_5yr_pct_smoothed": "growth_5yr_percentage_smoothed",
+        "growth_since_2005_pct_smoothed": "growth_since_2005_percentage_smoothed",
+        "liquidity_score": "overall_liquidity_score",
+    },
+    "suburb_monthly": {},
+}
+
+TABLE_COLUMNS = {
+    "properties": PROPERTY_COLUMNS,
+    "suburb_quarterly": QUARTERLY_COLUMNS,
+    "suburb_analytics": ANALYTICS_COLUMNS,
+    "suburb_monthly": MONTHLY_COLUMNS,
+}
+
+# Layout of the cached repeat-sales index (the price_index table in SQLite)
+INDEX_SCHEMA = pa.schema([
+    ("level", pa.string()),
+    ("area", pa.string()),
+    ("property_type", pa.string()),
+    ("year", pa.int64()),
+    ("quarter", pa.int64()),
+    ("index_value", pa.float64()),
+    ("num_pairs", pa.int64()),
+])
+
+# Layout of the cached pre-binned price counts (suburb_price_bins in SQLite)
+PRICE_BINS_SCHEMA = pa.schema([
+    ("suburb", pa.string()),
+    ("property_type", pa.string()),
+    ("year", pa.int64()),
+    ("quarter", pa.int64()),
+    ("price_bucket", pa.int64()),
+    ("num_sales", pa.int64()),
+])
+
+# Layout of the cached per-quarter price sketches (suburb_price_sketches in SQLite)
+PRICE_SKETCHES_SCHEMA = pa.schema([
+    ("suburb", pa.string()),
+    ("property_type", pa.string()),
+    ("year", pa.int64()),
+    ("quarter", pa.int64()),
+    ("num_sales", pa.int64()),
+    ("min_price", pa.float64()),
+    ("max_price", pa.float64()),
+    ("sketch", pa.binary()),
+])
+
+# Layout of the change log written by build_changes.py (tables of the same name in SQLite)
+HISTORY_SCHEMA = pa.schema([
+    ("position", pa.int64()),
+    ("version", pa.string()),
+    ("built_at", pa.string()),
+])
+CHANGES_SCHEMA = pa.schema([
+    ("position", pa.int64()),
+    ("table_name", pa.string()),
+    ("suburb", pa.string()),
+    ("property_type", pa.string()),
+    ("year", pa.int64()),
+    ("quarter", pa.int64()),
+    ("month", pa.int64()),
+    ("change", pa.string()),
+])
+
+# Integer columns whose Parquet type may drift between float and int
+INT_COLUMNS = {
+    "id", "year", "quarter", "month", "num_sales", "days_on_market", "contract_to_settlement_days",
+    "current_num_sales", "recovery_quarters", "avg_quarterly_volume",
+    "price_rank", "growth_rank", "speed_rank", "total_quarters_with_data",
+}
+
+
+def _normalise(table: pa.Table, name: str, property_type: str) -> pa.Table:
+    """Rename, type and pad a Parquet table to the schema column layout."""
+    mapping = COLUMN_MAPPING[name]
+    table = table.rename_columns([mapping.get(col, col) for col in table.column_names])
+
+    columns = {}
+    for col in TABLE_COLUMNS[name]:
+        if col == "id":
+            continue
+        if col == "property_type":
+            columns[col] = pa.array([property_type] * table.num_rows, pa.string())
+        elif col in table.column_names:
+            values = table.column(col)
+            if col in DATE_COLUMNS:
+                values = pc.cast(values, pa.date32())
+            elif col in INT_COLUMNS:
+                values = pc.cast(values, pa.int64())
+            elif col in STRING_COLUMNS:
+                values = pc.cast(values, pa.string())
+            elif col == "created_at":
+                values = pc.cast(values, pa.timestamp("us"))
+            else:
+                values = pc.cast(values, pa.float64())
+            columns[col] = values
+        else:
+            if col in DATE_COLUMNS:
+                col_type = pa.date32()
+            elif col in INT_COLUMNS:
+                col_type = pa.int64()
+            elif col in STRING_COLUMNS:
+                col_type = pa.string()
+            elif col == "created_at":
+                col_type = pa.timestamp("us")
+            else:
+                col_type = pa.float64()
+            columns[col] = pa.nulls(table.num_rows, col_type)
+
+    return pa.table(columns)
+
+
+def _write_arrow(path: Path, table: pa.Table) -> None:
+    """Write a table as an uncompressed Arrow IPC file."""
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _map_arrow(path: Path) -> pa.Table:
+    """Memory-map an Arrow IPC file."""
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _and(mask, condition):
+    """Combine two boolean masks, treating None as "all rows"."""
+    return condition if mask is None else pc.and_(mask, condition)
+
+
+def _quarter_rows(
+    table: pa.Table,
+    suburb: str,
+    property_type: Optional[str],
+    start_key: Optional[int],
+    end_key: Optional[int],
+) -> pa.Table:
+    """Rows of a per-quarter suburb table whose quarter_key falls in [start_key, end_key]."""
+    mask = pc.equal(table["suburb"], suburb)
+    if property_type:
+        mask = _and(mask, pc.equal(table["property_type"], property_type))
+
+    keys = pc.add(pc.multiply(table["year"], 4), pc.subtract(table["quarter"], 1))
+    if start_key is not None:
+        mask = _and(mask, pc.greater_equal(keys, start_key))
+    if end_key is not None:
+        mask = _and(mask, pc.less_equal(keys, end_key))
+    return table.filter(mask)
+
+
+class ParquetRepository(Repository):
+    """Columnar repository answering queries with vectorized predicates over Arrow tables."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.properties = self._load("properties")
+        self.quarterly = self._load("suburb_quarterly")
+        self.analytics = self._load("suburb_analytics")
+        self.tables = {
+            "properties": self.properties,
+            "suburb_quarterly": self.quarterly,
+            "suburb_analytics": self.analytics,
+        }
+        self.levels = self._load_rollups()
+        self.monthly = self._load_monthly()
+        self.tables["suburb_monthly"] = self.monthly
+        self.index = self._load_price_index()
+        self.price_bins_table = self._load_price_bins()
+        self.price_sketches_table = self._load_price_sketches()
+        self.history = self._load_change_log("dataset_history", HISTORY_SCHEMA)
+        self.changes = self._load_change_log("dataset_changes", CHANGES_SCHEMA)
+
+    @classmethod
+    def from_url(cls, url: str) -> "ParquetRepository":
+        """Create a repository from a parquet:///path DATABASE_URL (relative paths resolve from the project root)."""
+        path = Path(url.replace("parquet:///", "", 1))
+        if not path.is_absolute():
+            project_root = Path(__file__).parent.parent.parent
+            path = project_root / path
+        return cls(path)
+
+    def _load(self, name: str) -> pa.Table:
+        """Memory-map the Arrow cache for a table, rebuilding it from Parquet when stale."""
+        sources = [self.data_dir / filename for filename in SOURCE_FILES[name].values()]
+        for source in sources:
+            if not source.exists():
+                raise FileNotFoundError(f"Parquet file not found: {source}")
+
+        arrow_path = self.data_dir / f"{name}.arrow"
+        newest_source = max(source.stat().st_mtime for source in sources)
+        if not arrow_path.exists() or arrow_path.stat().st_mtime < newest_source:
+            parts = [
+                _normalise(pq.read_table(self.data_dir / filename), name, property_type)
+                for property_type, filename in SOURCE_FILES[name].items()
+            ]
+            table = pa.concat_tables(parts)
+            if "id" in TABLE_COLUMNS[name]:
+                # Mirror the AUTOINCREMENT ids SQLite assigns on insert
+                table = table.add_column(0, "id", pa.array(range(1, table.num_rows + 1), pa.int64()))
+            _write_arrow(arrow_path, table)
+
+        return _map_arrow(arrow_path)
+
+    def _load_rollups(self) -> Dict[Tuple[str, str], pa.Table]:
+        """
+        Build (or memory-map) the postcode/district/metro rollups of the suburb tables.
+
+        There are no rollup Parquet files, so they are computed from properties
+        with the same code as the SQLite derived tables and cached as Arrow
+        files next to properties.arrow. The area name is stored as suburb.
+
+        Returns:
+            Tables keyed by (suburb table name, level), suburb level included
+        """
+        properties_path = self.data_dir / "properties.arrow"
+        paths = {name: self.data_dir / f"{rollup}.arrow" for name, rollup in ROLLUP_TABLES.items()}
+
+        if any(
+            not path.exists() or path.stat().st_mtime < properties_path.stat().st_mtime
+            for path in paths.values()
+        ):
+            sales = self.properties.select([
+                "suburb", "postcode", "district", "property_type",
+                "settlement_date", "sale_price", "days_on_market", "contract_to_settlement_days",
+            ]).to_pandas(date_as_object=False)
+            quarterly, analytics = build_rollups(sales[sales["sale_price"] > 0])
+
+            for name, frame in (("suburb_quarterly", quarterly), ("suburb_analytics", analytics)):
+                parts = []
+                for (level, property_type), part in frame.groupby(["level", "property_type"]):
+                    part = part.drop(columns=["level"]).rename(columns={"area": "suburb"})
+                    table = _normalise(pa.Table.from_pandas(part, preserve_index=False), name, property_type)
+                    parts.append(table.append_column("level", pa.array([level] * table.num_rows, pa.string())))
+                table = pa.concat_tables(parts)
+                if "id" in TABLE_COLUMNS[name]:
+                    table = table.add_column(0, "id", pa.array(range(1, table.num_rows + 1), pa.int64()))
+                _write_arrow(paths[name], table)
+
+        levels = {}
+        for name, path in paths.items():
+            rollup = _map_arrow(path)
+            levels[(name, "suburb")] = self.tables[name]
+            for level in ROLLUP_LEVELS:
+                levels[(name, level)] = rollup.filter(pc.equal(rollup["level"], level)).drop(["level"])
+        return levels
+
+    def _load_monthly(self) -> pa.Table:
+        """
+        Build (or memory-map) suburb_monthly, computed from properties like the rollups.
+
+        Returns:
+            Monthly stats table in the schema column layout
+        """
+        properties_path = self.data_dir / "properties.arrow"
+        path = self.data_dir / "suburb_monthly.arrow"
+
+        if not path.exists() or path.stat().st_mtime < properties_path.stat().st_mtime:
+            sales = self.properties.select([
+                "suburb", "property_type", "settlement_date", "sale_price", "days_on_market",
+                "contract_to_settlement_days",
+            ]).to_pandas(date_as_object=False)
+            monthly = monthly_stats(sales[sales["sale_price"] > 0])
+
+            parts = [
+                _normalise(pa.Table.from_pandas(part, preserve_index=False), "suburb_monthly", property_type)
+                for property_type, part in monthly.groupby("property_type")
+            ]
+            table = pa.concat_tables(parts)
+            table = table.add_column(0, "id", pa.array(range(1, table.num_rows + 1), pa.int64()))
+            _write_arrow(path, table)
+
+        return _map_arrow(path)
+
+    def _load_price_index(self) -> pa.Table:
+        """
+        Build (or memory-map) the repeat-sales price index, computed from
+        properties like the rollups.
+
+        property_id is not part of the properties schema columns, so it is
+        read from the Parquet files (in the same row order as properties);
+        files written before it was kept give an empty index.
+
+        Returns:
+            Table with the price_index columns
+        """
+        properties_path = self.data_dir / "properties.arrow"
+        path = self.data_dir / "price_index.arrow"
+
+        if not path.exists() or path.stat().st_mtime < properties_path.stat().st_mtime:
+            sources = [self.data_dir / filename for filename in SOURCE_FILES["properties"].values()]
+            if all("property_id" in pq.read_schema(source).names for source in sources):
+                sales = self.properties.select([
+                    "suburb", "postcode", "district", "property_type", "settlement_date", "sale_price",
+                ]).to_pandas(date_as_object=False)
+                sales["property_id"] = np.concatenate([
+                    pq.read_table(source, columns=["property_id"]).column("property_id").to_numpy(zero_copy_only=False)
+                    for source in sources
+                ]).astype(np.float64)
+                table = pa.Table.from_pandas(repeat_sales_index(sales), schema=INDEX_SCHEMA, preserve_index=False)
+            else:
+                table = INDEX_SCHEMA.empty_table()
+            _write_arrow(path, table)
+
+        return _map_arrow(path)
+
+    def _load_price_bins(self) -> pa.Table:
+        """
+        Build (or memory-map) the pre-binned price counts, computed from
+        properties like the rollups, so a histogram sums a suburb's bins
+        instead of scanning its sales.
+
+        Returns:
+            Table with the suburb_price_bins columns
+        """
+        properties_path = self.data_dir / "properties.arrow"
+        path = self.data_dir / "suburb_price_bins.arrow"
+
+        if not path.exists() or path.stat().st_mtime < properties_path.stat().st_mtime:
+            sales = self.properties.select([
+                "suburb", "property_type", "settlement_date", "sale_price",
+            ]).to_pandas(date_as_object=False)
+            bins = price_bin_counts(sales[sales["sale_price"] > 0])
+            _write_arrow(path, pa.Table.from_pandas(bins, schema=PRICE_BINS_SCHEMA, preserve_index=False))
+
+        return _map_arrow(path)
+
+    def _load_price_sketches(self) -> pa.Table:
+        """
+        Build (or memory-map) one price sketch per suburb quarter, computed
+        from properties like the rollups, so a percentile query merges a
+        suburb's sketches instead of sketching its sales.
+
+        Returns:
+            Table with the suburb_price_sketches columns
+        """
+        properties_path = self.data_dir / "properties.arrow"
+        path = self.data_dir / "suburb_price_sketches.arrow"
+
+        if not path.exists() or path.stat().st_mtime < properties_path.stat().st_mtime:
+            sales = self.properties.select([
+                "suburb", "property_type", "settlement_date", "sale_price",
+            ]).to_pandas(date_as_object=False)
+            sketches = quarter_sketches(sales[sales["sale_price"] > 0])
+            _write_arrow(path, pa.Table.from_pandas(sketches, schema=PRICE_SKETCHES_SCHEMA, preserve_index=False))
+
+        return _map_arrow(path)
+
+    def _load_change_log(self, name: str, schema: pa.Schema) -> pa.Table:
+        """Read a change log table written by build_changes.py (empty if there is none)."""
+        path = self.data_dir / f"{name}.parquet"
+        if not path.exists():
+            return schema.empty_table()
+        return pq.read_table(path, schema=schema)
+
+    def memory_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Arrow data held, as (bytes, tables): "mapped" for the memory-mapped
+        Arrow files, "heap" for the rollup levels filtered out of them and
+        the change log read from Parquet.
+        """
+        mapped = list(self.tables.values()) + [self.index, self.price_bins_table, self.price_sketches_table]
+        heap = [table for (_, level), table in self.levels.items() if level != "suburb"]
+        heap += [self.history, self.changes]
+        return {
+            "mapped": (sum(table.nbytes for table in mapped), len(mapped)),
+            "heap": (sum(table.nbytes for table in heap), len(heap)),
+        }
+
+    def list_properties(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        table = self.properties
+        mask = None
+
+        if suburb:
+            mask = _and(mask, pc.equal(table["suburb"], suburb))
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if min_price is not None:
+            mask = _and(mask, pc.greater_equal(table["sale_price"], min_price))
+        if max_price is not None:
+            mask = _and(mask, pc.less_equal(table["sale_price"], max_price))
+        if start_date:
+            mask = _and(mask, pc.greater_equal(table["settlement_date"], pa.scalar(start_date, pa.date32())))
+        if end_date:
+            mask = _and(mask, pc.less_equal(table["settlement_date"], pa.scalar(end_date, pa.date32())))
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        page = table.sort_by([("settlement_date", "descending"), ("id", "descending")]).slice(offset, limit)
+        return page.to_pylist(), table.num_rows
+
+    def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        rows = self.properties.filter(pc.equal(self.properties["id"], property_id)).to_pylist()
+        return rows[0] if rows else None
+
+    def property_stats(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        table = self.properties
+        mask = None
+
+        if suburb:
+            mask = _and(mask, pc.equal(table["suburb"], suburb))
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+
+        prices = table["sale_price"] if mask is None else table["sale_price"].filter(mask)
+        if len(prices) == 0:
+            return {"total_count": 0, "avg_price": None, "min_price": None, "max_price": None, "median_price": None}
+
+        min_max = pc.min_max(prices).as_py()
+        return {
+            "total_count": len(prices),
+            "avg_price": pc.mean(prices).as_py(),
+            "min_price": min_max["min"],
+            "max_price": min_max["max"],
+            "median_price": pc.quantile(prices, q=0.5, interpolation="midpoint")[0].as_py(),
+        }
+
+    def list_quarterly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        quarter: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        table = self.levels[("suburb_quarterly", level)]
+        mask = None
+
+        if suburb:
+            mask = _and(mask, pc.equal(table["suburb"], suburb))
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if year is not None:
+            mask = _and(mask, pc.equal(table["year"], year))
+        if quarter is not None:
+            mask = _and(mask, pc.equal(table["quarter"], quarter))
+        if start_year is not None:
+            mask = _and(mask, pc.greater_equal(table["year"], start_year))
+        if end_year is not None:
+            mask = _and(mask, pc.less_equal(table["year"], end_year))
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        page = table.sort_by([
+            ("year", "descending"), ("quarter", "descending"), ("suburb", "ascending"),
+        ]).slice(offset, limit)
+        return page.to_pylist(), table.num_rows
+
+    def suburb_quarterly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        table = self.levels[("suburb_quarterly", level)]
+        mask = pc.equal(table["suburb"], suburb)
+
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if start_year is not None:
+            mask = _and(mask, pc.greater_equal(table["year"], start_year))
+        if end_year is not None:
+            mask = _and(mask, pc.less_equal(table["year"], end_year))
+
+        return table.filter(mask).sort_by([
+            ("property_type", "ascending"), ("year", "descending"), ("quarter", "descending"),
+        ]).to_pylist()
+
+    def list_monthly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        table = self.monthly
+        mask = None
+
+        if suburb:
+            mask = _and(mask, pc.equal(table["suburb"], suburb))
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if year is not None:
+            mask = _and(mask, pc.equal(table["year"], year))
+        if month is not None:
+            mask = _and(mask, pc.equal(table["month"], month))
+        if start_year is not None:
+            mask = _and(mask, pc.greater_equal(table["year"], start_year))
+        if end_year is not None:
+            mask = _and(mask, pc.less_equal(table["year"], end_year))
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        page = table.sort_by([
+            ("year", "descending"), ("month", "descending"), ("suburb", "ascending"),
+        ]).slice(offset, limit)
+        return page.to_pylist(), table.num_rows
+
+    def suburb_monthly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        table = self.monthly
+        mask = pc.equal(table["suburb"], suburb)
+
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if start_year is not None:
+            mask = _and(mask, pc.greater_equal(table["year"], start_year))
+        if end_year is not None:
+            mask = _and(mask, pc.less_equal(table["year"], end_year))
+
+        return table.filter(mask).sort_by([
+            ("property_type", "ascending"), ("year", "descending"), ("month", "descending"),
+        ]).to_pylist()
+
+    def list_analytics(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        sort_by: str = "suburb",
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        table = self.levels[("suburb_analytics", level)]
+        mask = None
+
+        if suburb:
+            mask = _and(mask, pc.equal(table["suburb"], suburb))
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+        if min_price is not None:
+            mask = _and(mask, pc.greater_equal(table["current_median_price"], min_price))
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        # SQLite sorts NULLs first in ascending order
+        indices = pc.sort_indices(table, sort_keys=[(sort_by, "ascending")], null_placement="at_start")
+        page = table.take(indices).slice(offset, limit)
+        return page.to_pylist(), table.num_rows
+
+    def suburb_analytics(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        table = self.levels[("suburb_analytics", level)]
+        mask = pc.equal(table["suburb"], suburb)
+
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+
+        return table.filter(mask).sort_by("property_type").to_pylist()
+
+    def analytics_for_suburbs(
+        self,
+        suburbs: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        table = self.analytics
+        mask = pc.is_in(table["suburb"], value_set=pa.array(list(suburbs), pa.string()))
+
+        if property_type:
+            mask = _and(mask, pc.equal(table["property_type"], property_type))
+
+        return table.filter(mask).to_pylist()
+
+    def search_suburbs(self, q: str, limit: int = 20) -> Tuple[List[str], int]:
+        suburbs = pc.unique(self.analytics["suburb"])
+        matches = suburbs.filter(pc.match_substring(suburbs, q, ignore_case=True))
+        matches = matches.take(pc.array_sort_indices(matches))
+        return matches.slice(0, limit).to_pylist(), len(matches)
+
+    def price_bins(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        bins = _quarter_rows(self.price_bins_table, suburb, property_type, start_key, end_key)
+        totals = bins.group_by("price_bucket").aggregate([("num_sales", "sum")])
+        totals = totals.rename_columns({"num_sales_sum": "num_sales"}).sort_by("price_bucket")
+        return totals.select(["price_bucket", "num_sales"]).to_pylist()
+
+    def price_sketches(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        sketches = _quarter_rows(self.price_sketches_table, suburb, property_type, start_key, end_key)
+        return sketches.select(["num_sales", "min_price", "max_price", "sketch"]).to_pylist()
+
+    def price_index(
+        self,
+        level: str,
+        area: str,
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        mask = pc.and_(pc.equal(self.index["level"], level), pc.equal(self.index["area"], area))
+        if property_type:
+            mask = pc.and_(mask, pc.equal(self.index["property_type"], property_type))
+
+        table = self.index.filter(mask).sort_by([("property_type", "ascending"), ("year", "ascending"), ("quarter", "ascending")])
+        return table.select(["property_type", "year", "quarter", "index_value", "num_pairs"]).to_pylist()
+
+    def change_history(self) -> List[Dict[str, Any]]:
+        return self.history.sort_by("position").to_pylist()
+
+    def change_log(self, position: int, table: Optional[str] = None) -> List[Dict[str, Any]]:
+        mask = pc.greater_equal(self.changes["position"], position)
+        if table:
+            mask = pc.and_(mask, pc.equal(self.changes["table_name"], table))
+        return self.changes.filter(mask).sort_by("position").to_pylist()
+
+    def load_columns(
+        self,
+        table: str,
+        columns: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        if table not in self.tables:
+            raise ValueError(f"Unknown table: {table}")
+
+        data = self.tables[table]
+        if property_type:
+            data = data.filter(pc.equal(data["property_type"], property_type))
+
+        arrays = {}
+        for name in columns:
+            column = data[name]
+            if name in DATE_COLUMNS or name in STRING_COLUMNS:
+                arrays[name] = column_array(name, column.to_numpy(zero_copy_only=False))
+            else:
+                # Nulls become NaN without a Python round trip
+                arrays[name] = pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False)
+        return arrays
+
+    def describe(self, table: str) -> Tuple[List[str], int]:
+        if table not in self.tables:
+            raise ValueError(f"Unknown table: {table}")
+        return self.tables[table].column_names, self.tables[table].num_rows
@@ -0,0 +1,97 @@
+"""Per-period sale price and settlement metrics shared by the derived tables.
+
+The same column set as suburb_quarterly (05_quarterly_analysis_split.ipynb):
+counts, price distribution, contract-to-settlement days, 30-day fast
+settlement share, 30-day fast sale share (from days_on_market, NULL when
+the sales have no listing data, as in the current source),
+contract_to_settlement_score (always NULL: 06_store_data.ipynb stores it
+without a definition), the 0.6/0.4 volume/speed liquidity score, alpha=0.3
+exponentially smoothed medians and period-over-period price changes. Used
+for the postcode/district/metro rollups (rollups.py) and the monthly table
+(monthly.py).
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+EXPONENTIAL_ALPHA = 0.3
+FAST_SETTLEMENT_DAYS = 30
+FAST_SALE_DAYS = 30
+
+
+def period_stats(
+    sales: pd.DataFrame,
+    series_keys: List[str],
+    period: str,
+    periods_per_year: int,
+    changes: Sequence[Tuple[str, int]],
+) -> pd.DataFrame:
+    """
+    Aggregate sales into one row per series and period.
+
+    Args:
+        sales: Properties with settlement_date parsed and the series_keys
+            columns; days_on_market is optional
+        series_keys: Columns identifying a time series, e.g. ["suburb", "property_type"]
+        period: "quarter" or "month"
+        periods_per_year: 4 for quarters, 12 for months
+        changes: (column name, lag in periods) price change columns to add
+
+    Returns:
+        DataFrame sorted by series then period, with year, the period column,
+        <period>_start and the metric columns
+    """
+    settlement = sales["settlement_date"].dt
+    listed = sales["days_on_market"] if "days_on_market" in sales else pd.Series(np.nan, index=sales.index)
+    sales = sales.assign(
+        year=settlement.year,
+        **{period: settlement.quarter if period == "quarter" else settlement.month},
+        fast=(sales["contract_to_settlement_days"] <= FAST_SETTLEMENT_DAYS).astype(float),
+        # NaN for sales without a listing, so they do not count either way
+        fast_sale=(listed <= FAST_SALE_DAYS).astype(float).where(listed.notna()),
+    )
+    keys = series_keys + ["year", period]
+    grouped = sales.groupby(keys)
+    prices = grouped["sale_price"]
+
+    stats = prices.agg(
+        num_sales="count",
+        median_price="median",
+        mean_price="mean",
+        min_price="min",
+        max_price="max",
+        price_stddev="std",
+    )
+    stats["price_p25"] = prices.quantile(0.25)
+    stats["price_p75"] = prices.quantile(0.75)
+    stats["median_ctsd"] = grouped["contract_to_settlement_days"].median()
+    stats["mean_ctsd"] = grouped["contract_to_settlement_days"].mean()
+    stats["fast_sales_percentage"] = grouped["fast_sale"].mean() * 100
+    stats["fast_settlements_percentage"] = grouped["fast"].mean() * 100
+    stats["contract_to_settlement_score"] = np.nan
+    stats = stats.reset_index().sort_values(keys, ignore_index=True)
+
+    months_per_period = 12 // periods_per_year
+    stats[f"{period}_start"] = pd.to_datetime(
+        {"year": stats["year"], "month": (stats[period] - 1) * months_per_period + 1, "day": 1}
+    ).dt.date
+
+    # Volume is normalised within each property type, as in the notebook
+    volume_max = stats.groupby("property_type")["num_sales"].transform("max")
+    speed_score = (100 - stats["fast_settlements_percentage"].fillna(0)) / 100
+    stats["liquidity_score"] = stats["num_sales"] / volume_max * 0.6 + speed_score * 0.4
+
+    stats["median_price_smoothed"] = stats.groupby(series_keys)["median_price"].transform(
+        lambda series: series.ewm(alpha=EXPONENTIAL_ALPHA, adjust=False).mean()
+    )
+
+    # Changes against the same series `lag` periods earlier (NULL when that period has no sales)
+    key = stats["year"] * periods_per_year + stats[period] - 1
+    indexed = stats.set_index(series_keys + [key.rename("key")])["median_price"]
+    for column, lag in changes:
+        lagged = pd.MultiIndex.from_arrays([stats[name] for name in series_keys] + [key - lag])
+        previous = indexed.reindex(lagged).to_numpy()
+        stats[column] = (stats["median_price"].to_numpy() - previous) / previous * 100
+
+    return stats
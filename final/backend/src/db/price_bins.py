@@ -0,0 +1,141 @@
+"""Log-price buckets for pre-binned price distributions.
+
+Sales are counted per (suburb, property_type, year, quarter, price_bucket) in
+the suburb_price_bins table, where
+
+    price_bucket = floor(log10(sale_price) * PRICE_BUCKETS_PER_DECADE)
+
+With 50 buckets per decade each bucket spans ~4.7% of price, so a suburb's
+full history is a few hundred small rows and any date-range histogram is a
+SUM over them rather than a scan of the raw sales.
+"""
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_BUCKETS_PER_DECADE = 50
+
+
+def price_bucket(prices: np.ndarray) -> np.ndarray:
+    """Map sale prices to integer log-price buckets."""
+    return np.floor(np.log10(prices) * PRICE_BUCKETS_PER_DECADE).astype(np.int64)
+
+
+def bucket_lower(buckets: np.ndarray) -> np.ndarray:
+    """Lower price bound of each bucket."""
+    return np.power(10.0, np.asarray(buckets, dtype=np.float64) / PRICE_BUCKETS_PER_DECADE)
+
+
+def bucket_midpoint(buckets: np.ndarray) -> np.ndarray:
+    """Geometric midpoint price of each bucket."""
+    return np.power(10.0, (np.asarray(buckets, dtype=np.float64) + 0.5) / PRICE_BUCKETS_PER_DECADE)
+
+
+def price_bin_counts(sales: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count sales per (suburb, property_type, year, quarter, price_bucket).
+
+    Args:
+        sales: Sales with suburb, property_type, settlement_date (datetime)
+            and a positive sale_price
+
+    Returns:
+        The suburb_price_bins rows
+    """
+    sales = sales.assign(
+        year=sales["settlement_date"].dt.year,
+        quarter=sales["settlement_date"].dt.quarter,
+        price_bucket=price_bucket(sales["sale_price"].to_numpy()),
+    )
+    return sales.groupby(
+        ["suburb", "property_type", "year", "quarter", "price_bucket"]
+    ).size().reset_index(name="num_sales")
+
+
+def build_price_bins(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild suburb_price_bins from the properties table.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of bin rows written
+    """
+    properties = pd.read_sql_query(
+        "SELECT suburb, property_type, settlement_date, sale_price FROM properties WHERE sale_price > 0",
+        conn,
+        parse_dates=["settlement_date"],
+    )
+    bins = price_bin_counts(properties)
+
+    conn.execute("DELETE FROM suburb_price_bins")
+    bins.to_sql("suburb_price_bins", conn, if_exists="append", index=False, method="multi", chunksize=10000)
+    conn.commit()
+    return len(bins)
+
+
+def rebin(
+    buckets: np.ndarray,
+    counts: np.ndarray,
+    bins: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    scale: str = "log",
+) -> Dict[str, object]:
+    """
+    Regroup bucket counts into `bins` histogram bins.
+
+    Each bucket's count is assigned to the output bin containing its geometric
+    midpoint, so output edges are accurate to one bucket width (~4.7%).
+    Buckets outside [min_price, max_price) are reported as underflow/overflow.
+
+    Args:
+        buckets: Log-price bucket numbers
+        counts: Sales per bucket
+        bins: Number of output bins
+        min_price: Lower edge of the first bin (defaults to the lowest occupied bucket)
+        max_price: Upper edge of the last bin (defaults to the highest occupied bucket)
+        scale: "log" for geometrically spaced edges, "linear" for evenly spaced
+
+    Returns:
+        Dictionary with edges, counts, underflow and overflow
+
+    Raises:
+        ValueError: If the lower edge is not below the upper edge, including
+            a given bound beyond the data's extent on the defaulted side
+    """
+    buckets = np.asarray(buckets, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+
+    lower = float(bucket_lower(buckets.min())) if min_price is None else float(min_price)
+    upper = float(bucket_lower(buckets.max() + 1)) if max_price is None else float(max_price)
+    if lower >= upper:
+        raise ValueError(f"min_price ({lower:,.0f}) must be less than max_price ({upper:,.0f})")
+
+    if scale == "log":
+        edges = np.geomspace(lower, upper, bins + 1)
+    else:
+        edges = np.linspace(lower, upper, bins + 1)
+
+    midpoints = bucket_midpoint(buckets)
+    positions = np.searchsorted(edges, midpoints, side="right") - 1
+
+    in_range = (positions >= 0) & (positions < bins)
+    histogram = np.bincount(positions[in_range], weights=counts[in_range], minlength=bins)
+
+    return {
+        "edges": edges.tolist(),
+        "counts": histogram.astype(np.int64).tolist(),
+        "underflow": int(counts[positions < 0].sum()),
+        "overflow": int(counts[positions >= bins].sum()),
+    }
+
+
+def bucket_rows_to_arrays(rows: List[Dict[str, object]]):
+    """Split repository bucket rows into (buckets, counts) arrays."""
+    buckets = np.fromiter((row["price_bucket"] for row in rows), dtype=np.int64, count=len(rows))
+    counts = np.fromiter((row["num_sales"] for row in rows), dtype=np.int64, count=len(rows))
+    return buckets, counts
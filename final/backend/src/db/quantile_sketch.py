@@ -0,0 +1,156 @@
+"""Mergeable quantile sketches for arbitrary date-range price percentiles.
+
+Medians are not additive, so suburb_quarterly's fixed per-quarter medians
+cannot answer "median over 2015-2019" without rescanning properties. Instead
+the build stores one sketch per (suburb, property_type, quarter) in
+suburb_price_sketches, and a range query merges the sketches of the quarters
+it covers.
+
+The sketch is a DDSketch: sale prices are counted in logarithmic buckets
+
+    key = ceil(log(price) / log(GAMMA)),  GAMMA = (1 + ALPHA) / (1 - ALPHA)
+
+and any quantile is estimated as 2 * GAMMA**key / (GAMMA + 1), which is
+within ALPHA (1%) relative error of the true value. Merging two sketches is
+exact: add their bucket counts. Stored buckets are little-endian int16 keys
+followed by uint32 counts, so a quarter with 40 sales is ~240 bytes.
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = np.log(GAMMA)
+
+
+def sketch_keys(prices: np.ndarray) -> np.ndarray:
+    """Map positive prices to sketch bucket keys."""
+    return np.ceil(np.log(prices) / LOG_GAMMA).astype(np.int64)
+
+
+def encode(keys: np.ndarray, counts: np.ndarray) -> bytes:
+    """Pack sorted bucket keys and counts into a sketch blob."""
+    return keys.astype("<i2").tobytes() + counts.astype("<u4").tobytes()
+
+
+def decode(blob: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Unpack a sketch blob into (keys, counts)."""
+    n = len(blob) // 6
+    keys = np.frombuffer(blob, dtype="<i2", count=n).astype(np.int64)
+    counts = np.frombuffer(blob, dtype="<u4", count=n, offset=n * 2).astype(np.int64)
+    return keys, counts
+
+
+def merge(blobs: Iterable[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge sketch blobs into a single sorted (keys, counts) pair."""
+    parts = [decode(blob) for blob in blobs]
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    keys = np.concatenate([p[0] for p in parts])
+    counts = np.concatenate([p[1] for p in parts])
+    merged_keys, inverse = np.unique(keys, return_inverse=True)
+    merged_counts = np.bincount(inverse, weights=counts).astype(np.int64)
+    return merged_keys, merged_counts
+
+
+def quantiles(
+    keys: np.ndarray,
+    counts: np.ndarray,
+    qs: Sequence[float],
+    min_price: float,
+    max_price: float,
+) -> List[float]:
+    """
+    Estimate quantiles from merged buckets.
+
+    Args:
+        keys: Sorted bucket keys
+        counts: Sales per bucket
+        qs: Quantiles in [0, 1]
+        min_price: Exact minimum over the merged range (clamps the estimate)
+        max_price: Exact maximum over the merged range (clamps the estimate)
+
+    Returns:
+        One price estimate per quantile
+    """
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    ranks = np.asarray(qs, dtype=np.float64) * (total - 1)
+    positions = np.searchsorted(cumulative, ranks, side="right")
+    estimates = 2 * np.power(GAMMA, keys[positions].astype(np.float64)) / (GAMMA + 1)
+    return np.clip(estimates, min_price, max_price).tolist()
+
+
+def quarter_sketches(sales: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sketch sales per (suburb, property_type, year, quarter).
+
+    Args:
+        sales: Sales with suburb, property_type, settlement_date (datetime)
+            and a positive sale_price
+
+    Returns:
+        The suburb_price_sketches rows
+    """
+    properties = sales.assign(
+        year=sales["settlement_date"].dt.year,
+        quarter=sales["settlement_date"].dt.quarter,
+        key=sketch_keys(sales["sale_price"].to_numpy()),
+    )
+
+    group_cols = ["suburb", "property_type", "year", "quarter"]
+    summary = properties.groupby(group_cols)["sale_price"].agg(
+        num_sales="count", min_price="min", max_price="max"
+    ).reset_index()
+
+    # Bucket counts sorted by group then key, so each group's buckets are contiguous
+    buckets = properties.groupby(group_cols + ["key"]).size().reset_index(name="count")
+    boundaries = np.flatnonzero(
+        (buckets[group_cols].shift() != buckets[group_cols]).any(axis=1).to_numpy()
+    )
+    keys = buckets["key"].to_numpy()
+    counts = buckets["count"].to_numpy()
+    ends = np.append(boundaries[1:], len(buckets))
+    summary["sketch"] = [
+        encode(keys[start:end], counts[start:end]) for start, end in zip(boundaries, ends)
+    ]
+    return summary
+
+
+def build_quantile_sketches(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild suburb_price_sketches from the properties table.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of sketch rows written
+    """
+    properties = pd.read_sql_query(
+        "SELECT suburb, property_type, settlement_date, sale_price FROM properties WHERE sale_price > 0",
+        conn,
+        parse_dates=["settlement_date"],
+    )
+    summary = quarter_sketches(properties)
+
+    conn.execute("DELETE FROM suburb_price_sketches")
+    summary.to_sql("suburb_price_sketches", conn, if_exists="append", index=False, method="multi", chunksize=5000)
+    conn.commit()
+    return len(summary)
+
+
+def sketch_rows_summary(rows: List[Dict[str, object]]) -> Dict[str, object]:
+    """Merge repository sketch rows into num_sales, min/max and merged buckets."""
+    keys, counts = merge(row["sketch"] for row in rows)
+    return {
+        "num_sales": int(sum(row["num_sales"] for row in rows)),
+        "min_price": float(min(row["min_price"] for row in rows)),
+        "max_price": float(max(row["max_price"] for row in rows)),
+        "keys": keys,
+        "counts": counts,
+    }
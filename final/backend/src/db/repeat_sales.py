@@ -0,0 +1,246 @@
+"""Repeat-sales (Case-Shiller style) price index per area.
+
+A quarter's median price moves whenever the mix of what sold changes (more
+units, cheaper streets), not only when prices do. A repeat-sales index
+compares each property only with itself: every two consecutive sales of the
+same property_id give one equation
+
+    log(price_2 / price_1) = b[quarter_2] - b[quarter_1] + error
+
+and the log index b of an area is the least-squares solution over all of its
+pairs. As in Case and Shiller's method the fit has three stages: an ordinary
+fit, a regression of the squared residuals on the number of quarters between
+the sales, and a refit weighting each pair by the inverse of its predicted
+error standard deviation (a longer hold drifts further from the area trend).
+
+All areas of a level and property type are solved as one sparse system with
+a column per (area, quarter) with pairs, each area's first such quarter
+being its base (b = 0, index 100). The design matrix is block diagonal with
+at most two nonzeros per pair and is solved with LSQR, which only multiplies
+by the matrix and its transpose: memory is linear in the number of pairs and
+so is each iteration, whose count is capped at LSQR_ITERATION_LIMIT.
+"""
+import sqlite3
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import lsqr
+
+from .repository import LEVELS, quarter_key
+from .rollups import METRO_AREA
+
+# Sales closer together than this are treated as one transaction (or a
+# flip) and not paired
+MIN_HOLD_DAYS = 180
+
+# Pairs whose price changed by more than this factor either way are most
+# likely a rebuild, subdivision or data error, and are dropped
+MAX_PRICE_RATIO = 5.0
+
+# Areas with fewer pairs get no index
+MIN_PAIRS = 30
+
+LSQR_ITERATION_LIMIT = 1000
+LSQR_TOLERANCE = 1e-8
+
+# Smallest error variance a pair is weighted by (log return std of 1%)
+MIN_PAIR_VARIANCE = 1e-4
+
+INDEX_COLUMNS = ["level", "area", "property_type", "year", "quarter", "index_value", "num_pairs"]
+
+
+def repeat_sale_pairs(sales: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pair every sale with the previous sale of the same property.
+
+    Args:
+        sales: Properties with property_id, property_type, suburb, postcode,
+            district, settlement_date (parsed) and sale_price
+
+    Returns:
+        One row per pair: property_type and area columns (categorical) of
+        the second sale, first_quarter and second_quarter (see quarter_key),
+        hold_quarters and log_return
+    """
+    ids = sales["property_id"].to_numpy(dtype=np.float64)
+    settlement = sales["settlement_date"]
+    days = settlement.to_numpy().astype("datetime64[D]").astype(np.int64)
+    prices = sales["sale_price"].to_numpy(dtype=np.float64)
+    types = pd.factorize(sales["property_type"])[0]
+
+    # Sales of a property in date order, unknown ids and prices left out
+    valid = np.flatnonzero(~np.isnan(ids) & (prices > 0))
+    order = valid[np.lexsort((days[valid], ids[valid]))]
+    ids, types, days = ids[order], types[order], days[order]
+    quarters = quarter_key(settlement.dt.year.to_numpy()[order], settlement.dt.quarter.to_numpy()[order])
+    log_prices = np.log(prices[order])
+
+    log_returns = log_prices[1:] - log_prices[:-1]
+    paired = (
+        (ids[1:] == ids[:-1]) &
+        (types[1:] == types[:-1]) &
+        (days[1:] - days[:-1] >= MIN_HOLD_DAYS) &
+        (np.abs(log_returns) <= np.log(MAX_PRICE_RATIO))
+    )
+
+    second = order[1:][paired]
+    pairs = pd.DataFrame({
+        column: pd.Categorical(sales[column].to_numpy()[second])
+        for column in ["property_type", "suburb", "postcode", "district"]
+    })
+    pairs["first_quarter"] = quarters[:-1][paired]
+    pairs["second_quarter"] = quarters[1:][paired]
+    pairs["hold_quarters"] = pairs["second_quarter"] - pairs["first_quarter"]
+    pairs["log_return"] = log_returns[paired]
+    return pairs
+
+
+def _design(first: np.ndarray, second: np.ndarray, weights: np.ndarray, num_columns: int) -> csr_matrix:
+    """
+    Pairs x columns matrix with -w at the first sale's column and +w at the
+    second's, built directly in CSR form (-1 is a base quarter and left out).
+    """
+    present = np.column_stack([first >= 0, second >= 0])
+    indptr = np.zeros(len(first) + 1, dtype=np.int64)
+    np.cumsum(present.sum(axis=1), out=indptr[1:])
+    indices = np.column_stack([first, second])[present]
+    data = np.column_stack([-weights, weights])[present]
+    return csr_matrix((data, indices, indptr), shape=(len(first), num_columns))
+
+
+def _solve(first: np.ndarray, second: np.ndarray, y: np.ndarray, weights: np.ndarray, num_columns: int) -> np.ndarray:
+    design = _design(first, second, weights, num_columns)
+    return lsqr(
+        design, y * weights,
+        atol=LSQR_TOLERANCE, btol=LSQR_TOLERANCE, iter_lim=LSQR_ITERATION_LIMIT,
+    )[0]
+
+
+def level_index(pairs: pd.DataFrame, level: str) -> Optional[pd.DataFrame]:
+    """
+    Repeat-sales index of every area at one level, for pairs of one property type.
+
+    Args:
+        pairs: repeat_sale_pairs output for a single property type
+        level: One of LEVELS
+
+    Returns:
+        DataFrame with the price_index columns except level and
+        property_type, or None if no area has MIN_PAIRS pairs
+    """
+    if level == "metro":
+        codes, names = np.zeros(len(pairs), dtype=np.int64), pd.Index([METRO_AREA])
+    else:
+        codes, names = pd.factorize(pairs[level])
+
+    # Areas with too few pairs are left out
+    counts = np.bincount(codes[codes >= 0], minlength=len(names))
+    kept = (codes >= 0) & (counts[codes] >= MIN_PAIRS)
+    if not kept.any():
+        return None
+
+    codes = codes[kept]
+    first_quarter = pairs["first_quarter"].to_numpy()[kept]
+    second_quarter = pairs["second_quarter"].to_numpy()[kept]
+    y = pairs["log_return"].to_numpy()[kept]
+    hold = pairs["hold_quarters"].to_numpy(dtype=np.float64)[kept]
+
+    # One key per (area, quarter) slot; keys with pairs run area by area,
+    # quarter by quarter, and each area's first one is its base
+    origin = first_quarter.min()
+    span = second_quarter.max() - origin + 1
+    first_key = codes * span + (first_quarter - origin)
+    second_key = codes * span + (second_quarter - origin)
+    slots = len(names) * span
+    slot_pairs = np.bincount(first_key, minlength=slots) + np.bincount(second_key, minlength=slots)
+
+    keys = np.flatnonzero(slot_pairs)
+    key_areas = keys // span
+    is_base = np.r_[True, key_areas[1:] != key_areas[:-1]]
+    columns = np.cumsum(~is_base) - 1
+    columns[is_base] = -1
+    num_columns = int((~is_base).sum())
+
+    column_of = np.full(slots, -1, dtype=np.int32)
+    column_of[keys] = columns
+    first, second = column_of[first_key], column_of[second_key]
+    del first_key, second_key, first_quarter, second_quarter, codes
+    num_pairs = len(y)
+
+    # Stage 1: ordinary least squares
+    log_index = _solve(first, second, y, np.ones(num_pairs), num_columns)
+
+    # Stage 2: error variance as a linear function of the holding period
+    fitted = np.where(second >= 0, log_index[second], 0.0) - np.where(first >= 0, log_index[first], 0.0)
+    squared = (y - fitted) ** 2
+    coefficients = np.linalg.lstsq(np.column_stack([np.ones(num_pairs), hold]), squared, rcond=None)[0]
+    variance = np.maximum(coefficients[0] + coefficients[1] * hold, MIN_PAIR_VARIANCE)
+
+    # Stage 3: weighted least squares
+    log_index = _solve(first, second, y, 1 / np.sqrt(variance), num_columns)
+
+    quarters = origin + keys % span
+    return pd.DataFrame({
+        "area": names[key_areas],
+        "year": quarters // 4,
+        "quarter": quarters % 4 + 1,
+        "index_value": 100 * np.exp(np.where(is_base, 0.0, log_index[np.maximum(columns, 0)])),
+        "num_pairs": slot_pairs[keys],
+    })
+
+
+def repeat_sales_index(sales: pd.DataFrame) -> pd.DataFrame:
+    """
+    Repeat-sales index of every area at every level, per property type.
+
+    Args:
+        sales: Properties as for repeat_sale_pairs
+
+    Returns:
+        DataFrame with the price_index columns
+    """
+    pairs = repeat_sale_pairs(sales)
+    frames = []
+    for property_type, typed in pairs.groupby("property_type", observed=True):
+        for level in LEVELS:
+            index = level_index(typed, level)
+            if index is not None:
+                frames.append(index.assign(level=level, property_type=property_type))
+
+    if not frames:
+        return pd.DataFrame(columns=INDEX_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[INDEX_COLUMNS]
+
+
+def build_price_index(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild price_index from the properties table.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of index rows written (0 if properties has no property_id)
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(properties)")]
+    if "property_id" not in columns:
+        print("    properties has no property_id column (reload it with 06_store_data.ipynb); skipped")
+        return 0
+
+    sales = pd.read_sql_query(
+        """
+        SELECT property_id, suburb, postcode, district, property_type, settlement_date, sale_price
+        FROM properties
+        WHERE sale_price > 0 AND property_id IS NOT NULL
+        """,
+        conn,
+        parse_dates=["settlement_date"],
+    )
+    index = repeat_sales_index(sales)
+
+    conn.execute("DELETE FROM price_index")
+    index.to_sql("price_index", conn, if_exists="append", index=False, method="multi", chunksize=2000)
+    conn.commit()
+    return len(index)
@@ -0,0 +1,374 @@
+"""Storage repository layer between the API routes and the backing store.
+
+Routes talk to a Repository instead of issuing SQL directly. Two backends
+implement it:
+
+- SQLiteRepository: the original row store, one SQLAlchemy session per request.
+- ParquetRepository: a columnar engine over memory-mapped Arrow files built
+  from the Parquet output in data/transformed_split/.
+
+The backend is chosen by the DATABASE_URL scheme (see config.py).
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Columns returned for each table, shared by every backend so responses are identical
+PROPERTY_COLUMNS = [
+    "id", "suburb", "postcode", "district", "property_type",
+    "listing_date", "contract_date", "settlement_date",
+    "sale_price", "days_on_market", "contract_to_settlement_days",
+    "created_at",
+]
+
+QUARTERLY_COLUMNS = [
+    "id", "suburb", "property_type", "year", "quarter", "quarter_start",
+    "num_sales", "median_price", "median_price_smoothed", "mean_price", "min_price", "max_price",
+    "price_stddev", "price_p25", "price_p75", "median_ctsd", "mean_ctsd",
+    "fast_sales_percentage", "fast_settlements_percentage", "liquidity_score", "contract_to_settlement_score",
+    "qoq_price_change_percentage", "yoy_price_change_percentage",
+    "created_at",
+]
+
+MONTHLY_COLUMNS = [
+    "id", "suburb", "property_type", "year", "month", "month_start",
+    "num_sales", "median_price", "median_price_smoothed", "mean_price", "min_price", "max_price",
+    "price_stddev", "price_p25", "price_p75", "median_ctsd", "mean_ctsd",
+    "fast_sales_percentage", "fast_settlements_percentage", "liquidity_score", "contract_to_settlement_score",
+    "mom_price_change_percentage", "yoy_price_change_percentage",
+    "created_at",
+]
+
+ANALYTICS_COLUMNS = [
+    "suburb", "property_type", "last_updated", "current_quarter",
+    "current_median_price", "current_median_price_smoothed", "current_avg_ctsd", "current_num_sales",
+    "growth_1yr_percentage", "growth_3yr_percentage", "growth_5yr_percentage",
+    "growth_10yr_percentage", "growth_since_2005_percentage",
+    "cagr_5yr", "cagr_10yr",
+    "growth_1yr_percentage_smoothed", "growth_3yr_percentage_smoothed", "growth_5yr_percentage_smoothed",
+    "growth_10yr_percentage_smoothed", "growth_since_2005_percentage_smoothed",
+    "cagr_5yr_smoothed", "cagr_10yr_smoothed",
+    "volatility_score", "max_drawdown_pct",
+    "recovery_quarters", "avg_quarterly_volume", "overall_liquidity_score",
+    "market_health_score", "q1_avg_premium_percentage", "q2_avg_premium_percentage",
+    "q3_avg_premium_percentage", "q4_avg_premium_percentage", "best_quarter_to_sell",
+    "forecast_q1_price", "forecast_q1_lower", "forecast_q1_upper",
+    "forecast_q2_price", "forecast_q2_lower", "forecast_q2_upper",
+    "price_rank", "growth_rank", "speed_rank",
+    "total_quarters_with_data", "data_completeness_percentage",
+    "price_quarterly", "ctsd_quarterly",
+]
+
+# Column kinds used when loading whole columns into NumPy arrays
+DATE_COLUMNS = {"listing_date", "contract_date", "settlement_date", "quarter_start", "month_start"}
+STRING_COLUMNS = {
+    "suburb", "postcode", "district", "property_type", "last_updated", "current_quarter",
+    "best_quarter_to_sell", "price_quarterly", "ctsd_quarterly",
+}
+
+ANALYTICS_SORT_FIELDS = ["suburb", "price_rank", "growth_rank", "speed_rank", "current_median_price"]
+
+# Aggregation levels, finest first. Coarser levels are served from rollup
+# tables with the same columns, keyed by (level, area); rows report the area
+# name in the suburb field (see db/rollups.py).
+LEVELS = ["suburb", "postcode", "district", "metro"]
+ROLLUP_TABLES = {
+    "suburb_quarterly": "area_quarterly",
+    "suburb_analytics": "area_analytics",
+}
+
+
+# Tables covered by the dataset change log, with the columns identifying a row
+# (see db/build_changes.py)
+CHANGE_TABLES = {
+    "suburb_quarterly": ["suburb", "property_type", "year", "quarter"],
+    "suburb_monthly": ["suburb", "property_type", "year", "month"],
+    "suburb_analytics": ["suburb", "property_type"],
+}
+
+
+def quarter_key(year: int, quarter: int) -> int:
+    """Sequential quarter number (year * 4 + quarter - 1) used for quarter-aligned ranges."""
+    return year * 4 + quarter - 1
+
+
+class Repository(ABC):
+    """
+    Read interface shared by all storage backends.
+
+    Every method returns plain dictionaries keyed by the schema column names
+    above, so routes can build response models without knowing the backend.
+    A backend missing any of the abstract methods fails when it is created.
+    """
+
+    @abstractmethod
+    def list_properties(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of property sales (newest settlement first) and the total match count."""
+
+    @abstractmethod
+    def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        """Return a single property sale by ID, or None."""
+
+    @abstractmethod
+    def property_stats(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return total_count, avg_price, min_price, max_price and median_price for matching sales."""
+
+    @abstractmethod
+    def list_quarterly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        quarter: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of quarterly stats at a LEVELS level (newest quarter first) and the total match count."""
+
+    @abstractmethod
+    def suburb_quarterly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        """Return every quarterly row for a suburb (or area at a coarser level), ordered by property type then newest quarter first."""
+
+    @abstractmethod
+    def list_monthly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of monthly stats (newest month first) and the total match count."""
+
+    @abstractmethod
+    def suburb_monthly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return every monthly row for a suburb, ordered by property type then newest month first."""
+
+    @abstractmethod
+    def list_analytics(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        sort_by: str = "suburb",
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of analytics at a LEVELS level sorted ascending by sort_by and the total match count."""
+
+    @abstractmethod
+    def suburb_analytics(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        """Return the analytics rows for a suburb (or area at a coarser level), ordered by property type."""
+
+    @abstractmethod
+    def analytics_for_suburbs(
+        self,
+        suburbs: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the suburb-level analytics rows of several suburbs at once, in no particular order."""
+
+    @abstractmethod
+    def search_suburbs(self, q: str, limit: int = 20) -> Tuple[List[str], int]:
+        """Return suburbs containing q (case-insensitive) and the total match count."""
+
+    @abstractmethod
+    def price_bins(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return sale counts per log-price bucket for a suburb.
+
+        Rows are {"price_bucket", "num_sales"} summed over the quarters whose
+        quarter_key falls in [start_key, end_key] (see db/price_bins.py).
+        """
+
+    @abstractmethod
+    def price_sketches(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return mergeable price sketches for a suburb.
+
+        Rows are {"num_sales", "min_price", "max_price", "sketch"} for the
+        quarters whose quarter_key falls in [start_key, end_key]; merging the
+        sketches gives the range's percentiles (see db/quantile_sketch.py).
+        """
+
+    @abstractmethod
+    def price_index(
+        self,
+        level: str,
+        area: str,
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return an area's repeat-sales price index (see db/repeat_sales.py).
+
+        Rows are {"property_type", "year", "quarter", "index_value",
+        "num_pairs"} ordered by property type, then quarter.
+        """
+
+    @abstractmethod
+    def change_history(self) -> List[Dict[str, Any]]:
+        """
+        Return the earlier dataset versions the change log covers, oldest first.
+
+        Rows are {"position", "version", "built_at"}; the log entries at a
+        position are the changes from that version to the next one (this
+        dataset for the last). Empty if the dataset has no change log.
+        """
+
+    @abstractmethod
+    def change_log(self, position: int, table: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the change log entries from a change_history position on, oldest first.
+
+        Rows are {"position", "table_name", "suburb", "property_type", "year",
+        "quarter", "month", "change"} with change one of added, changed or
+        removed, and key columns a table does not have None.
+        """
+
+    @abstractmethod
+    def load_columns(
+        self,
+        table: str,
+        columns: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Load whole columns of a table into NumPy arrays for in-process engines.
+
+        Dates become datetime64[D], text columns object arrays and everything
+        else float64 with NULL as NaN, regardless of backend.
+
+        Args:
+            table: One of properties, suburb_quarterly, suburb_monthly, suburb_analytics
+            columns: Column names to load
+            property_type: Optionally restrict to house or unit rows
+        """
+
+    @abstractmethod
+    def describe(self, table: str) -> Tuple[List[str], int]:
+        """
+        Column names and row count of a table, for validating a dataset.
+
+        Args:
+            table: One of properties, suburb_quarterly, suburb_monthly, suburb_analytics
+
+        Returns:
+            (column names, number of rows); no columns if the table is missing
+        """
+
+    def close(self) -> None:
+        """Release any per-request resources."""
+
+
+def column_array(name: str, values: Sequence[Any]) -> np.ndarray:
+    """Convert raw column values to the NumPy dtype load_columns promises."""
+    if name in DATE_COLUMNS:
+        return np.array(values, dtype="datetime64[D]")
+    if name in STRING_COLUMNS:
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=np.float64)
+
+
+@contextmanager
+def open_repository() -> Iterator[Repository]:
+    """Open a repository on the served dataset (see dataset.py) outside of a request."""
+    from .dataset import current_dataset
+
+    with current_dataset().repository() as repo:
+        yield repo
+
+
+# Repository shared by every request dispatched inside a shared_repository block
+_shared: ContextVar[Optional[Repository]] = ContextVar("shared_repository", default=None)
+
+
+@contextmanager
+def shared_repository() -> Iterator[Repository]:
+    """
+    Open one repository and hand it to every get_repository call in this context.
+
+    Used by /api/batch so its sub-requests run on a single session. The
+    context variable is copied into the threadpool that runs sync routes;
+    async routes share one AsyncRepository on the same dataset.
+    """
+    from .async_repository import shared_async
+    from .dataset import current_dataset
+
+    dataset = current_dataset()
+    with dataset.repository() as repo, dataset.async_repository() as async_repo:
+        token = _shared.set(repo)
+        async_token = shared_async.set(async_repo)
+        try:
+            yield repo
+        finally:
+            shared_async.reset(async_token)
+            _shared.reset(token)
+
+
+def get_repository() -> Repository:
+    """
+    Dependency function for FastAPI to get the configured repository.
+    Yields a repository and ensures its resources are released after use.
+    """
+    shared = _shared.get()
+    if shared is not None:
+        # Owned and closed by shared_repository
+        yield shared
+        return
+    with open_repository() as repo:
+        yield repo
@@ -0,0 +1,230 @@
+"""Postcode, district and metro rollups of the suburb-level aggregates.
+
+suburb_quarterly and suburb_analytics are built per suburb by
+05_quarterly_analysis_split.ipynb. The same metrics are computed here for the
+coarser levels of the hierarchy suburb -> postcode -> district -> metro and
+stored in area_quarterly and area_analytics, keyed by (level, area), so a
+district or metro-wide view is a single indexed lookup like a suburb's.
+
+Metrics follow the notebook's definitions (see period_stats.py for the
+quarterly columns, and the growth windows below) so values are comparable
+across levels.
+"""
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from .period_stats import period_stats
+
+ROLLUP_LEVELS = ["postcode", "district", "metro"]
+
+# Area name of the single metro-level rollup
+METRO_AREA = "SYDNEY"
+
+# Analytics growth columns -> years back of the +/-90 day comparison window,
+# as defined for suburb_analytics in 05_quarterly_analysis_split.ipynb
+GROWTH_WINDOWS = {
+    "growth_1yr_percentage": 3,
+    "growth_3yr_percentage": 5,
+    "growth_5yr_percentage": 10,
+}
+
+# Smoothed growth columns -> (first, last) quarters back from the latest quarter
+SMOOTHED_GROWTH_WINDOWS = {
+    "growth_1yr_percentage_smoothed": (14, 10),
+    "growth_3yr_percentage_smoothed": (22, 18),
+    "growth_5yr_percentage_smoothed": (42, 38),
+}
+
+SERIES_KEYS = ["area", "property_type"]
+
+
+def load_sales(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Read the columns rollups need from the properties table."""
+    return pd.read_sql_query(
+        """
+        SELECT suburb, postcode, district, property_type,
+               settlement_date, sale_price, days_on_market, contract_to_settlement_days
+        FROM properties
+        WHERE sale_price > 0
+        """,
+        conn,
+        parse_dates=["settlement_date"],
+    )
+
+
+def _area(sales: pd.DataFrame, level: str) -> pd.Series:
+    """Area name of each sale at a rollup level."""
+    if level == "metro":
+        return pd.Series(METRO_AREA, index=sales.index)
+    return sales[level].astype(str).str.strip()
+
+
+def _growth(current: pd.Series, past: pd.Series) -> pd.Series:
+    """Percentage change from past to current, 0 where past is unknown (as in the notebook)."""
+    return ((current - past) / past * 100).fillna(0)
+
+
+def quarterly_rollup(sales: pd.DataFrame, level: str) -> pd.DataFrame:
+    """
+    Quarterly price and settlement metrics per area at one rollup level.
+
+    Args:
+        sales: Properties with settlement_date parsed
+        level: One of ROLLUP_LEVELS
+
+    Returns:
+        DataFrame with level, area and the area_quarterly metric columns
+    """
+    stats = period_stats(
+        sales.assign(area=_area(sales, level)),
+        SERIES_KEYS,
+        "quarter",
+        periods_per_year=4,
+        changes=[("qoq_price_change_percentage", 1), ("yoy_price_change_percentage", 4)],
+    )
+    stats.insert(0, "level", level)
+    return stats
+
+
+def analytics_rollup(sales: pd.DataFrame, quarterly: pd.DataFrame, level: str) -> pd.DataFrame:
+    """
+    Summary analytics per area at one rollup level.
+
+    Args:
+        sales: Properties with settlement_date parsed
+        quarterly: quarterly_rollup output for the same level
+        level: One of ROLLUP_LEVELS
+
+    Returns:
+        DataFrame with level, area and the area_analytics metric columns
+    """
+    sales = sales.assign(area=_area(sales, level))
+    frames = []
+
+    for property_type, typed in sales.groupby("property_type"):
+        current_date = typed["settlement_date"].max()
+        recent = typed[typed["settlement_date"] >= current_date - pd.Timedelta(days=365)]
+        analytics = recent.groupby("area").agg(
+            current_median_price=("sale_price", "median"),
+            current_avg_ctsd=("contract_to_settlement_days", "mean"),
+            current_num_sales=("sale_price", "count"),
+        )
+
+        for column, years in GROWTH_WINDOWS.items():
+            centre = current_date - pd.Timedelta(days=365 * years)
+            window = typed[
+                (typed["settlement_date"] >= centre - pd.Timedelta(days=90)) &
+                (typed["settlement_date"] < centre + pd.Timedelta(days=90))
+            ]
+            past = window.groupby("area")["sale_price"].median().reindex(analytics.index)
+            analytics[column] = _growth(analytics["current_median_price"], past)
+
+        earliest = typed.sort_values("settlement_date").groupby("area").head(10)
+        past = earliest.groupby("area")["sale_price"].median().reindex(analytics.index)
+        analytics["growth_since_2005_percentage"] = _growth(analytics["current_median_price"], past)
+
+        series = quarterly[quarterly["property_type"] == property_type].sort_values(["area", "year", "quarter"])
+        by_area = series.groupby("area")
+        quarters_back = by_area.cumcount(ascending=False)
+        smoothed = series["median_price_smoothed"]
+
+        analytics["current_median_price_smoothed"] = by_area["median_price_smoothed"].last()
+        for column, (first, last) in SMOOTHED_GROWTH_WINDOWS.items():
+            # cumcount from the end: the latest quarter is 0 back
+            in_window = (quarters_back >= last - 1) & (quarters_back <= first - 1)
+            past = smoothed[in_window].groupby(series["area"][in_window]).median().reindex(analytics.index)
+            analytics[column] = _growth(analytics["current_median_price_smoothed"], past)
+
+        past = by_area.head(4).groupby("area")["median_price_smoothed"].median().reindex(analytics.index)
+        analytics["growth_since_2005_percentage_smoothed"] = _growth(analytics["current_median_price_smoothed"], past)
+
+        analytics["volatility_score"] = by_area["median_price_smoothed"].apply(
+            lambda prices: prices.pct_change().std() if len(prices) > 1 else 0
+        ).fillna(0)
+        avg_volume = by_area["num_sales"].mean().reindex(analytics.index)
+        analytics["avg_quarterly_volume"] = avg_volume.round().astype("Int64")
+        analytics["overall_liquidity_score"] = by_area["liquidity_score"].mean()
+        analytics["total_quarters_with_data"] = by_area.size()
+
+        trend = (by_area["median_price_smoothed"].last() / by_area["median_price_smoothed"].first() - 1)
+        trend[by_area.size() <= 1] = 0
+        analytics["market_health_score"] = (
+            avg_volume / avg_volume.max() * 0.4 +
+            analytics["overall_liquidity_score"] * 0.4 +
+            (trend.reindex(analytics.index).fillna(0) + 1) / 2 * 0.2
+        ).fillna(0)
+
+        # Ranked among areas of the same level and property type
+        analytics["price_rank"] = analytics["current_median_price"].rank(ascending=False, method="min").astype("Int64")
+        analytics["growth_rank"] = analytics["growth_1yr_percentage"].rank(ascending=False, method="min").astype("Int64")
+        analytics["speed_rank"] = analytics["current_avg_ctsd"].rank(ascending=True, method="min").astype("Int64")
+
+        analytics["property_type"] = property_type
+        frames.append(analytics.reset_index())
+
+    analytics = pd.concat(frames, ignore_index=True)
+    analytics["last_updated"] = datetime.now().isoformat()
+    analytics.insert(0, "level", level)
+    return analytics
+
+
+def build_rollups(sales: pd.DataFrame):
+    """Compute (area_quarterly, area_analytics) frames for every rollup level."""
+    quarterly_frames = []
+    analytics_frames = []
+    for level in ROLLUP_LEVELS:
+        quarterly = quarterly_rollup(sales, level)
+        quarterly_frames.append(quarterly)
+        analytics_frames.append(analytics_rollup(sales, quarterly, level))
+    return (
+        pd.concat(quarterly_frames, ignore_index=True),
+        pd.concat(analytics_frames, ignore_index=True),
+    )
+
+
+def build_area_quarterly(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild area_quarterly from the properties table.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of rollup rows written
+    """
+    sales = load_sales(conn)
+    quarterly = pd.concat([quarterly_rollup(sales, level) for level in ROLLUP_LEVELS], ignore_index=True)
+
+    conn.execute("DELETE FROM area_quarterly")
+    quarterly.to_sql("area_quarterly", conn, if_exists="append", index=False, method="multi", chunksize=2000)
+    conn.commit()
+    return len(quarterly)
+
+
+def build_area_analytics(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild area_analytics from the properties and area_quarterly tables.
+
+    Args:
+        conn: Open connection to the populated database
+
+    Returns:
+        Number of rollup rows written
+    """
+    sales = load_sales(conn)
+    quarterly = pd.read_sql_query(
+        "SELECT level, area, property_type, year, quarter, num_sales, median_price_smoothed, liquidity_score "
+        "FROM area_quarterly",
+        conn,
+    )
+    analytics = pd.concat(
+        [analytics_rollup(sales, quarterly[quarterly["level"] == level], level) for level in ROLLUP_LEVELS],
+        ignore_index=True,
+    )
+
+    conn.execute("DELETE FROM area_analytics")
+    analytics.to_sql("area_analytics", conn, if_exists="append", index=False, method="multi", chunksize=2000)
+    conn.commit()
+    return len(analytics)
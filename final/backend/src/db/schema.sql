@@ -5,6 +5,7 @@
 -- Properties (raw data - just filtered down)
 CREATE TABLE properties (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
+    property_id INTEGER, -- Valuer General property id: the same property across its sales (repeat-sales index)
     suburb TEXT NOT NULL,
     postcode TEXT,
     district TEXT,
@@ -25,6 +26,7 @@ CREATE INDEX idx_property_type ON properties(property_type);
 CREATE INDEX idx_suburb_type on properties(suburb, property_type);
 CREATE INDEX idx_dates ON properties(contract_date, settlement_date);
 CREATE INDEX idx_suburb_dates ON properties(suburb, settlement_date);
+CREATE INDEX idx_property_sales ON properties(property_id, settlement_date);
 
 -- Quarterly aggregates of analytics per suburb
 CREATE TABLE suburb_quarterly (
@@ -150,4 +152,224 @@ CREATE TABLE suburb_analytics (
 );
 
 CREATE INDEX idx_analytics_suburb ON suburb_analytics(suburb);
-CREATE INDEX idx_analytics_suburb_type ON suburb_analytics(property_type);
\ No newline at end of file
+CREATE INDEX idx_analytics_suburb_type ON suburb_analytics(property_type);
+
+-- Pre-binned price distribution (derived from properties by build_derived.py)
+-- Sale counts per suburb, property type and quarter on a log-price scale:
+-- price_bucket = floor(log10(sale_price) * 50), so each bucket spans ~4.7% of price
+CREATE TABLE suburb_price_bins (
+    suburb TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    price_bucket INTEGER NOT NULL,
+    num_sales INTEGER NOT NULL,
+
+    PRIMARY KEY (suburb, property_type, year, quarter, price_bucket)
+) WITHOUT ROWID;
+
+-- Mergeable price sketches (derived from properties by build_derived.py)
+-- One DDSketch per suburb, property type and quarter (see quantile_sketch.py):
+-- sketch holds little-endian int16 log-price bucket keys followed by uint32 counts,
+-- and any quarter range's percentiles are estimated by adding bucket counts
+CREATE TABLE suburb_price_sketches (
+    suburb TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    num_sales INTEGER NOT NULL,
+    min_price REAL NOT NULL,
+    max_price REAL NOT NULL,
+    sketch BLOB NOT NULL,
+
+    PRIMARY KEY (suburb, property_type, year, quarter)
+) WITHOUT ROWID;
+
+-- Postcode, district and metro rollups (derived from properties by build_derived.py)
+-- Same columns as suburb_quarterly / suburb_analytics, keyed by (level, area) instead of
+-- suburb: level is 'postcode', 'district' or 'metro' and area the postcode, district code
+-- or 'SYDNEY' (see rollups.py)
+CREATE TABLE area_quarterly (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level TEXT NOT NULL CHECK(level IN ('postcode', 'district', 'metro')),
+    area TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    quarter_start DATE NOT NULL,
+
+    num_sales INTEGER NOT NULL,
+
+    median_price REAL,
+    median_price_smoothed REAL,
+    mean_price REAL,
+    min_price REAL,
+    max_price REAL,
+    price_stddev REAL,
+    price_p25 REAL,
+    price_p75 REAL,
+
+    median_dom REAL,
+    mean_dom REAL,
+    fast_sales_percentage REAL,
+    median_ctsd REAL,
+    mean_ctsd REAL,
+    fast_settlements_percentage REAL,
+
+    liquidity_score REAL,
+    contract_to_settlement_score REAL,
+
+    qoq_price_change_percentage REAL,
+    yoy_price_change_percentage REAL,
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE(level, area, property_type, year, quarter)
+);
+
+CREATE INDEX idx_area_quarterly_level_year ON area_quarterly(level, year, quarter);
+
+CREATE TABLE area_analytics (
+    level TEXT NOT NULL CHECK(level IN ('postcode', 'district', 'metro')),
+    area TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    current_quarter TEXT,
+    current_median_price REAL,
+    current_median_price_smoothed REAL,
+    current_avg_ctsd REAL,
+    current_num_sales INTEGER,
+
+    growth_1yr_percentage REAL,
+    growth_3yr_percentage REAL,
+    growth_5yr_percentage REAL,
+    growth_10yr_percentage REAL,
+    growth_since_2005_percentage REAL,
+    cagr_5yr REAL,
+    cagr_10yr REAL,
+
+    growth_1yr_percentage_smoothed REAL,
+    growth_3yr_percentage_smoothed REAL,
+    growth_5yr_percentage_smoothed REAL,
+    growth_10yr_percentage_smoothed REAL,
+    growth_since_2005_percentage_smoothed REAL,
+    cagr_5yr_smoothed REAL,
+    cagr_10yr_smoothed REAL,
+
+    volatility_score REAL,
+    max_drawdown_pct REAL,
+    recovery_quarters INTEGER,
+
+    avg_quarterly_volume INTEGER,
+    overall_liquidity_score REAL,
+    market_health_score REAL,
+
+    q1_avg_premium_percentage REAL,
+    q2_avg_premium_percentage REAL,
+    q3_avg_premium_percentage REAL,
+    q4_avg_premium_percentage REAL,
+    best_quarter_to_sell TEXT,
+
+    forecast_q1_price REAL,
+    forecast_q1_lower REAL,
+    forecast_q1_upper REAL,
+    forecast_q2_price REAL,
+    forecast_q2_lower REAL,
+    forecast_q2_upper REAL,
+
+    price_rank INTEGER,  -- within level and property type
+    growth_rank INTEGER,
+    speed_rank INTEGER,
+
+    total_quarters_with_data INTEGER,
+    data_completeness_percentage REAL,
+
+    price_quarterly TEXT,
+    ctsd_quarterly TEXT,
+
+    PRIMARY KEY (level, area, property_type)
+) WITHOUT ROWID;
+
+-- Monthly suburb aggregates (derived from properties by build_derived.py)
+-- Same metrics as suburb_quarterly per calendar month (see monthly.py)
+CREATE TABLE suburb_monthly (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suburb TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,  -- 1 to 12
+    month_start DATE NOT NULL,  -- e.g. '2024-03-01' for March 2024
+
+    num_sales INTEGER NOT NULL,
+
+    median_price REAL,
+    median_price_smoothed REAL,
+    mean_price REAL,
+    min_price REAL,
+    max_price REAL,
+    price_stddev REAL,
+    price_p25 REAL,
+    price_p75 REAL,
+
+    median_ctsd REAL,
+    mean_ctsd REAL,
+    fast_sales_percentage REAL,  -- % sold within 30 days of listing (NULL without listing data)
+    fast_settlements_percentage REAL,
+
+    liquidity_score REAL,
+    contract_to_settlement_score REAL,
+
+    mom_price_change_percentage REAL,  -- Month-over-month
+    yoy_price_change_percentage REAL,
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE(suburb, property_type, year, month)
+);
+
+CREATE INDEX idx_monthly_year_month ON suburb_monthly(year, month);
+CREATE INDEX idx_monthly_month_date ON suburb_monthly(month_start);
+
+-- Repeat-sales price index (derived from properties by build_derived.py)
+-- Case-Shiller style index per area and property type from pairs of sales of the same
+-- property_id (see repeat_sales.py): index_value is 100 in the area's first quarter with a
+-- pair, and num_pairs counts the pairs starting or ending in the quarter. level is 'suburb',
+-- 'postcode', 'district' or 'metro' and area the name at that level, as in area_quarterly
+CREATE TABLE price_index (
+    level TEXT NOT NULL CHECK(level IN ('suburb', 'postcode', 'district', 'metro')),
+    area TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    index_value REAL NOT NULL,
+    num_pairs INTEGER NOT NULL,
+
+    PRIMARY KEY (level, area, property_type, year, quarter)
+) WITHOUT ROWID;
+
+-- Dataset change log (written by build_changes.py from the previously deployed database)
+-- dataset_history lists the earlier dataset versions the log reaches back to, oldest first;
+-- dataset_changes holds, per position, the rows added, changed or removed between that
+-- version and the next one (this database for the last). year and quarter are set for
+-- suburb_quarterly rows, year and month for suburb_monthly, neither for suburb_analytics
+CREATE TABLE dataset_history (
+    position INTEGER PRIMARY KEY,
+    version TEXT NOT NULL UNIQUE,  -- content version reported by /api/dataset
+    built_at TEXT NOT NULL
+);
+
+CREATE TABLE dataset_changes (
+    position INTEGER NOT NULL,
+    table_name TEXT NOT NULL,
+    suburb TEXT NOT NULL,
+    property_type TEXT NOT NULL CHECK(property_type IN ('house', 'unit')),
+    year INTEGER,
+    quarter INTEGER,
+    month INTEGER,
+    change TEXT NOT NULL CHECK(change IN ('added', 'changed', 'removed'))
+);
+
+CREATE INDEX idx_dataset_changes_position ON dataset_changes(position, table_name);
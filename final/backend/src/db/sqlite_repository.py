@@ -0,0 +1,689 @@
+"""SQLite implementation of the storage repository."""
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from .repository import (
+    Repository,
+    column_array,
+    PROPERTY_COLUMNS,
+    QUARTERLY_COLUMNS,
+    MONTHLY_COLUMNS,
+    ANALYTICS_COLUMNS,
+    ROLLUP_TABLES,
+)
+
+PROPERTY_SELECT = ", ".join(PROPERTY_COLUMNS)
+QUARTERLY_SELECT = ", ".join(QUARTERLY_COLUMNS)
+MONTHLY_SELECT = ", ".join(MONTHLY_COLUMNS)
+ANALYTICS_SELECT = ", ".join(ANALYTICS_COLUMNS)
+
+# Rollup tables name their area column "area"; it is returned as suburb
+SELECTS = {
+    "suburb_quarterly": QUARTERLY_SELECT,
+    "suburb_analytics": ANALYTICS_SELECT,
+    "area_quarterly": ", ".join("area AS suburb" if col == "suburb" else col for col in QUARTERLY_COLUMNS),
+    "area_analytics": ", ".join("area AS suburb" if col == "suburb" else col for col in ANALYTICS_COLUMNS),
+}
+
+
+def _where(conditions: List[str]) -> str:
+    """Join conditions into a WHERE clause body ("1=1" when empty)."""
+    return " AND ".join(conditions) if conditions else "1=1"
+
+
+def _level_source(
+    table: str,
+    level: str,
+    conditions: List[str],
+    params: Dict[str, Any],
+) -> Tuple[str, str]:
+    """
+    Resolve the table and area column for an aggregation level.
+
+    Rollup levels read from the matching area_* table, so a level condition
+    is added to conditions/params.
+    """
+    if level == "suburb":
+        return table, "suburb"
+
+    conditions.append("level = :level")
+    params["level"] = level
+    return ROLLUP_TABLES[table], "area"
+
+
+def _rows(result) -> List[Dict[str, Any]]:
+    """Convert a SQLAlchemy result into a list of dictionaries."""
+    return [dict(row._mapping) for row in result.fetchall()]
+
+
+class PagedQuery(NamedTuple):
+    """
+    The two statements behind a paged listing: the total match count and
+    one page of rows. They are independent, so the async repository issues
+    them concurrently.
+    """
+    count: TextClause
+    page: TextClause
+    params: Dict[str, Any]
+    page_params: Dict[str, Any]
+
+
+def _paged_query(table: str, select: str, where_clause: str, order_by: str, params: Dict[str, Any], limit: int, offset: int) -> PagedQuery:
+    return PagedQuery(
+        count=text(f"SELECT COUNT(*) FROM {table} WHERE {where_clause}"),
+        page=text(f"""
+            SELECT {select}
+            FROM {table}
+            WHERE {where_clause}
+            ORDER BY {order_by}
+            LIMIT :limit OFFSET :offset
+        """),
+        params=params,
+        page_params={**params, "limit": limit, "offset": offset},
+    )
+
+
+def properties_query(
+    suburb: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> PagedQuery:
+    """Statements of Repository.list_properties."""
+    conditions = []
+    params = {}
+
+    if suburb:
+        conditions.append("suburb = :suburb")
+        params["suburb"] = suburb
+
+    if property_type:
+        conditions.append("property_type = :property_type")
+        params["property_type"] = property_type
+
+    if min_price is not None:
+        conditions.append("sale_price >= :min_price")
+        params["min_price"] = min_price
+
+    if max_price is not None:
+        conditions.append("sale_price <= :max_price")
+        params["max_price"] = max_price
+
+    if start_date:
+        conditions.append("settlement_date >= :start_date")
+        params["start_date"] = start_date
+
+    if end_date:
+        conditions.append("settlement_date <= :end_date")
+        params["end_date"] = end_date
+
+    return _paged_query(
+        "properties", PROPERTY_SELECT, _where(conditions), "settlement_date DESC, id DESC", params, limit, offset
+    )
+
+
+def quarterly_query(
+    suburb: Optional[str] = None,
+    property_type: Optional[str] = None,
+    year: Optional[int] = None,
+    quarter: Optional[int] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    limit: int = 100,
+    offset: int = 0,
+    level: str = "suburb",
+) -> PagedQuery:
+    """Statements of Repository.list_quarterly."""
+    conditions = []
+    params = {}
+    table, area = _level_source("suburb_quarterly", level, conditions, params)
+
+    if suburb:
+        conditions.append(f"{area} = :suburb")
+        params["suburb"] = suburb
+
+    if property_type:
+        conditions.append("property_type = :property_type")
+        params["property_type"] = property_type
+
+    if year is not None:
+        conditions.append("year = :year")
+        params["year"] = year
+
+    if quarter is not None:
+        conditions.append("quarter = :quarter")
+        params["quarter"] = quarter
+
+    if start_year is not None:
+        conditions.append("year >= :start_year")
+        params["start_year"] = start_year
+
+    if end_year is not None:
+        conditions.append("year <= :end_year")
+        params["end_year"] = end_year
+
+    return _paged_query(
+        table, SELECTS[table], _where(conditions), f"year DESC, quarter DESC, {area} ASC", params, limit, offset
+    )
+
+
+def monthly_query(
+    suburb: Optional[str] = None,
+    property_type: Optional[str] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> PagedQuery:
+    """Statements of Repository.list_monthly."""
+    conditions = []
+    params = {}
+
+    if suburb:
+        conditions.append("suburb = :suburb")
+        params["suburb"] = suburb
+
+    if property_type:
+        conditions.append("property_type = :property_type")
+        params["property_type"] = property_type
+
+    if year is not None:
+        conditions.append("year = :year")
+        params["year"] = year
+
+    if month is not None:
+        conditions.append("month = :month")
+        params["month"] = month
+
+    if start_year is not None:
+        conditions.append("year >= :start_year")
+        params["start_year"] = start_year
+
+    if end_year is not None:
+        conditions.append("year <= :end_year")
+        params["end_year"] = end_year
+
+    return _paged_query(
+        "suburb_monthly", MONTHLY_SELECT, _where(conditions), "year DESC, month DESC, suburb ASC", params, limit, offset
+    )
+
+
+def analytics_query(
+    suburb: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    sort_by: str = "suburb",
+    limit: int = 100,
+    offset: int = 0,
+    level: str = "suburb",
+) -> PagedQuery:
+    """Statements of Repository.list_analytics."""
+    conditions = []
+    params = {}
+    table, area = _level_source("suburb_analytics", level, conditions, params)
+
+    if suburb:
+        conditions.append(f"{area} = :suburb")
+        params["suburb"] = suburb
+
+    if property_type:
+        conditions.append("property_type = :property_type")
+        params["property_type"] = property_type
+
+    if min_price is not None:
+        conditions.append("current_median_price >= :min_price")
+        params["min_price"] = min_price
+
+    # sort_by is validated against ANALYTICS_SORT_FIELDS by the caller
+    order_by = f"{area if sort_by == 'suburb' else sort_by} ASC"
+    return _paged_query(table, SELECTS[table], _where(conditions), order_by, params, limit, offset)
+
+
+def search_query(q: str, limit: int = 20) -> PagedQuery:
+    """Statements of Repository.search_suburbs."""
+    params = {"pattern": f"%{q}%"}
+    return PagedQuery(
+        count=text("SELECT COUNT(DISTINCT suburb) FROM suburb_analytics WHERE suburb LIKE :pattern"),
+        page=text("""
+            SELECT DISTINCT suburb
+            FROM suburb_analytics
+            WHERE suburb LIKE :pattern
+            ORDER BY suburb
+            LIMIT :limit
+        """),
+        params=params,
+        page_params={**params, "limit": limit},
+    )
+
+
+class SQLiteRepository(Repository):
+    """Row-store repository issuing SQL through a SQLAlchemy session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _paged(self, query: PagedQuery) -> Tuple[List[Dict[str, Any]], int]:
+        total = self.db.execute(query.count, query.params).scalar()
+        return _rows(self.db.execute(query.page, query.page_params)), total
+
+    def list_properties(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return self._paged(properties_query(
+            suburb=suburb,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            offset=offset,
+        ))
+
+    def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        query = text(f"""
+            SELECT {PROPERTY_SELECT}
+            FROM properties
+            WHERE id = :id
+        """)
+        rows = _rows(self.db.execute(query, {"id": property_id}))
+        return rows[0] if rows else None
+
+    def property_stats(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conditions = []
+        params = {}
+
+        if suburb:
+            conditions.append("suburb = :suburb")
+            params["suburb"] = suburb
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        where_clause = _where(conditions)
+
+        query = text(f"""
+            SELECT
+                COUNT(*) as total_count,
+                AVG(sale_price) as avg_price,
+                MIN(sale_price) as min_price,
+                MAX(sale_price) as max_price
+            FROM properties
+            WHERE {where_clause}
+        """)
+        row = self.db.execute(query, params).fetchone()
+
+        # Calculate median separately (SQLite doesn't have built-in median)
+        count = row[0] if row else 0
+        median_price = None
+        if count > 0:
+            # Odd count: the middle value; even count: average of the two middle values
+            median_offset = count // 2 if count % 2 == 1 else count // 2 - 1
+            median_limit = 1 if count % 2 == 1 else 2
+            median_query = text(f"""
+                SELECT sale_price
+                FROM properties
+                WHERE {where_clause}
+                ORDER BY sale_price
+                LIMIT :limit OFFSET :offset
+            """)
+            median_rows = self.db.execute(
+                median_query, {**params, "limit": median_limit, "offset": median_offset}
+            ).fetchall()
+            if len(median_rows) == median_limit:
+                median_price = sum(r[0] for r in median_rows) / median_limit
+
+        return {
+            "total_count": row[0] or 0,
+            "avg_price": row[1],
+            "min_price": row[2],
+            "max_price": row[3],
+            "median_price": median_price,
+        }
+
+    def list_quarterly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        quarter: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return self._paged(quarterly_query(
+            suburb=suburb,
+            property_type=property_type,
+            year=year,
+            quarter=quarter,
+            start_year=start_year,
+            end_year=end_year,
+            limit=limit,
+            offset=offset,
+            level=level,
+        ))
+
+    def suburb_quarterly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        conditions = []
+        params = {"suburb": suburb}
+        table, area = _level_source("suburb_quarterly", level, conditions, params)
+        conditions.append(f"{area} = :suburb")
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        if start_year is not None:
+            conditions.append("year >= :start_year")
+            params["start_year"] = start_year
+
+        if end_year is not None:
+            conditions.append("year <= :end_year")
+            params["end_year"] = end_year
+
+        query = text(f"""
+            SELECT {SELECTS[table]}
+            FROM {table}
+            WHERE {_where(conditions)}
+            ORDER BY property_type, year DESC, quarter DESC
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def list_monthly(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return self._paged(monthly_query(
+            suburb=suburb,
+            property_type=property_type,
+            year=year,
+            month=month,
+            start_year=start_year,
+            end_year=end_year,
+            limit=limit,
+            offset=offset,
+        ))
+
+    def suburb_monthly(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        conditions = ["suburb = :suburb"]
+        params = {"suburb": suburb}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        if start_year is not None:
+            conditions.append("year >= :start_year")
+            params["start_year"] = start_year
+
+        if end_year is not None:
+            conditions.append("year <= :end_year")
+            params["end_year"] = end_year
+
+        query = text(f"""
+            SELECT {MONTHLY_SELECT}
+            FROM suburb_monthly
+            WHERE {_where(conditions)}
+            ORDER BY property_type, year DESC, month DESC
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def list_analytics(
+        self,
+        suburb: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        sort_by: str = "suburb",
+        limit: int = 100,
+        offset: int = 0,
+        level: str = "suburb",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return self._paged(analytics_query(
+            suburb=suburb,
+            property_type=property_type,
+            min_price=min_price,
+            sort_by=sort_by,
+            limit=limit,
+            offset=offset,
+            level=level,
+        ))
+
+    def suburb_analytics(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        level: str = "suburb",
+    ) -> List[Dict[str, Any]]:
+        conditions = []
+        params = {"suburb": suburb}
+        table, area = _level_source("suburb_analytics", level, conditions, params)
+        conditions.append(f"{area} = :suburb")
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        query = text(f"""
+            SELECT {SELECTS[table]}
+            FROM {table}
+            WHERE {_where(conditions)}
+            ORDER BY property_type
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def analytics_for_suburbs(
+        self,
+        suburbs: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if not suburbs:
+            return []
+
+        conditions = ["suburb IN :suburbs"]
+        params = {"suburbs": list(suburbs)}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        query = text(f"""
+            SELECT {ANALYTICS_SELECT}
+            FROM suburb_analytics
+            WHERE {_where(conditions)}
+        """).bindparams(bindparam("suburbs", expanding=True))
+        return _rows(self.db.execute(query, params))
+
+    def search_suburbs(self, q: str, limit: int = 20) -> Tuple[List[str], int]:
+        rows, total = self._paged(search_query(q, limit=limit))
+        return [row["suburb"] for row in rows], total
+
+    def price_bins(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        conditions = ["suburb = :suburb"]
+        params = {"suburb": suburb}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        if start_key is not None:
+            conditions.append("year * 4 + quarter - 1 >= :start_key")
+            params["start_key"] = start_key
+
+        if end_key is not None:
+            conditions.append("year * 4 + quarter - 1 <= :end_key")
+            params["end_key"] = end_key
+
+        query = text(f"""
+            SELECT price_bucket, SUM(num_sales) AS num_sales
+            FROM suburb_price_bins
+            WHERE {_where(conditions)}
+            GROUP BY price_bucket
+            ORDER BY price_bucket
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def price_sketches(
+        self,
+        suburb: str,
+        property_type: Optional[str] = None,
+        start_key: Optional[int] = None,
+        end_key: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        conditions = ["suburb = :suburb"]
+        params = {"suburb": suburb}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        if start_key is not None:
+            conditions.append("year * 4 + quarter - 1 >= :start_key")
+            params["start_key"] = start_key
+
+        if end_key is not None:
+            conditions.append("year * 4 + quarter - 1 <= :end_key")
+            params["end_key"] = end_key
+
+        query = text(f"""
+            SELECT num_sales, min_price, max_price, sketch
+            FROM suburb_price_sketches
+            WHERE {_where(conditions)}
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def price_index(
+        self,
+        level: str,
+        area: str,
+        property_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        conditions = ["level = :level", "area = :area"]
+        params = {"level": level, "area": area}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        query = text(f"""
+            SELECT property_type, year, quarter, index_value, num_pairs
+            FROM price_index
+            WHERE {_where(conditions)}
+            ORDER BY property_type, year, quarter
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def _has_table(self, name: str) -> bool:
+        query = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+        return self.db.execute(query, {"name": name}).first() is not None
+
+    def change_history(self) -> List[Dict[str, Any]]:
+        # Databases built before the change log have no history table
+        if not self._has_table("dataset_history"):
+            return []
+        return _rows(self.db.execute(text("SELECT position, version, built_at FROM dataset_history ORDER BY position")))
+
+    def change_log(self, position: int, table: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self._has_table("dataset_changes"):
+            return []
+
+        conditions = ["position >= :position"]
+        params = {"position": position}
+
+        if table:
+            conditions.append("table_name = :table")
+            params["table"] = table
+
+        query = text(f"""
+            SELECT position, table_name, suburb, property_type, year, quarter, month, change
+            FROM dataset_changes
+            WHERE {_where(conditions)}
+            ORDER BY position
+        """)
+        return _rows(self.db.execute(query, params))
+
+    def load_columns(
+        self,
+        table: str,
+        columns: Sequence[str],
+        property_type: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        if table not in ("properties", "suburb_quarterly", "suburb_monthly", "suburb_analytics"):
+            raise ValueError(f"Unknown table: {table}")
+
+        conditions = []
+        params = {}
+
+        if property_type:
+            conditions.append("property_type = :property_type")
+            params["property_type"] = property_type
+
+        # Column names come from code, never from request input
+        query = text(f"SELECT {', '.join(columns)} FROM {table} WHERE {_where(conditions)}")
+        rows = self.db.execute(query, params).fetchall()
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {name: column_array(name, col) for name, col in zip(columns, values)}
+
+    def describe(self, table: str) -> Tuple[List[str], int]:
+        if table not in ("properties", "suburb_quarterly", "suburb_monthly", "suburb_analytics"):
+            raise ValueError(f"Unknown table: {table}")
+
+        columns = [row[1] for row in self.db.execute(text(f"PRAGMA table_info({table})")).fetchall()]
+        if not columns:
+            return [], 0
+        return columns, self.db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+    def close(self) -> None:
+        self.db.close()
@@ -1,40 +1,52 @@
 """FastAPI application for Sydney Housing Data API."""
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from .api.routes import properties, analytics, quarterly
-from .config import PROJECT_ROOT
-
-# Create FastAPI app
-app = FastAPI(
-    title="Sydney Housing Data API",
-    description="API for querying Sydney property sales data.",
-    version="1.0.0"
-)
-
-# Mount static files directory
-static_dir = PROJECT_ROOT / "static"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify allowed origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(properties.router)
-app.include_router(analytics.router)
-app.include_router(quarterly.router)
-
-
-@app.get("/")
+from .api.routes import properties, analytics, quarterly, monthly, suburbs, aggregate, forecast, geometry, screen, leaderboard, batch, price_index, changes, debug
+from .api.http_cache import ConditionalGetMiddleware, api_version
+from .api.snapshot import SnapshotMiddleware, snapshot_index
+from .config import DEBUG_ENDPOINTS, PROJECT_ROOT, WARMUP
+from .db.dataset import dataset_version
+from .db.hot_swap import start_watcher
+from .memory import MemoryBudgetExceeded
+from .services.warmup import WARMUP_MODES, skip_warm_up, warm_up, warmup_state
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the dataset, start the reload watcher and warm up (see services/warmup.py)."""
+    # Hash the dataset once so ETags and versioned URLs are ready for the first request
+    print(f"Serving dataset version {dataset_version()}")
+    print(f"Snapshot responses: {len(snapshot_index()):,}")
+
+    # Reload the dataset on SIGHUP (and every DATASET_WATCH_INTERVAL seconds if set);
+    # pre-forked workers leave this to their launcher (see src/serve.py)
+    if app.state.watch_dataset:
+        start_watcher()
+
+    if WARMUP not in WARMUP_MODES:
+        print(f"WARNING: unknown WARMUP={WARMUP!r}, warming up in the background")
+    if WARMUP == "blocking":
+        # Connections are accepted only after this returns
+        warm_up()
+    elif WARMUP == "off":
+        skip_warm_up()
+    else:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+
+
+# API index, dataset version and health
+router = APIRouter()
+
+
+@router.get("/")
 def root():
     """Root endpoint with API information."""
     return {
@@ -45,16 +57,109 @@ def root():
             "properties": "/api/properties",
             "analytics": "/api/analytics",
             "quarterly": "/api/quarterly",
+            "monthly": "/api/monthly",
+            "suburbs": "/api/suburbs",
+            "aggregate": "/api/aggregate",
+            "forecast": "/api/forecast",
+            "geometry": "/api/geometry",
+            "screen": "/api/screen",
+            "leaderboard": "/api/leaderboard",
+            "batch": "/api/batch",
+            "index": "/api/index",
+            "dataset": "/api/dataset",
+            "changes": "/api/changes",
             "docs": "/docs",
             "health": "/health"
         }
     }
 
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+@router.get("/api/dataset")
+def get_dataset():
+    """
+    Version of the dataset being served, and the API version for building
+    /api/v/{api_version}/ URLs (it also changes when the code does).
+    """
+    version = api_version()
+    return {"version": dataset_version(), "api_version": version, "prefix": f"/api/v/{version}"}
+
+
+@router.get("/health")
+def health_check(response: Response):
+    """Health check endpoint; 503 until the startup warm-up has finished."""
+    if not warmup_state["ready"]:
+        response.status_code = 503
+        return {"status": "warming", "steps": warmup_state["steps"]}
+    return {"status": "healthy", "warmup": warmup_state}
+
+
+async def memory_budget_exceeded(request: Request, exc: MemoryBudgetExceeded) -> JSONResponse:
+    """A structure a request needs was refused by the memory budgets (see memory.py)."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+def create_app(watch_dataset: bool = True) -> FastAPI:
+    """
+    Build the API application.
+
+    Args:
+        watch_dataset: Reload the dataset in this process on SIGHUP (and
+            every DATASET_WATCH_INTERVAL seconds); off in pre-forked workers,
+            whose launcher reloads it for all of them
+
+    Returns:
+        The FastAPI application
+    """
+    app = FastAPI(
+        title="Sydney Housing Data API",
+        description="API for querying Sydney property sales data.",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    app.state.watch_dataset = watch_dataset
+    app.add_exception_handler(MemoryBudgetExceeded, memory_budget_exceeded)
+
+    # Mount static files directory
+    static_dir = PROJECT_ROOT / "static"
+    if static_dir.exists():
+        app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+
+    # Prerendered responses from SNAPSHOT_DIR when a current snapshot is built; innermost
+    app.add_middleware(SnapshotMiddleware)
+
+    # ETags, 304s and /api/v/{dataset}/ paths; added before CORS so 304s get CORS headers too
+    app.add_middleware(ConditionalGetMiddleware)
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify allowed origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    app.include_router(properties.router)
+    app.include_router(analytics.router)
+    app.include_router(quarterly.router)
+    app.include_router(monthly.router)
+    app.include_router(suburbs.router)
+    app.include_router(aggregate.router)
+    app.include_router(forecast.router)
+    app.include_router(geometry.router)
+    app.include_router(screen.router)
+    app.include_router(leaderboard.router)
+    app.include_router(batch.router)
+    app.include_router(price_index.router)
+    app.include_router(changes.router)
+    if DEBUG_ENDPOINTS:
+        app.include_router(debug.router)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
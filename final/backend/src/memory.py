@@ -0,0 +1,476 @@
+"""Memory accounting and budgets for the in-process data structures.
+
+A 512 MB machine holds the column arrays, models, matrices, caches and
+indexes built from the dataset, each sized by the data rather than by
+configuration. Every such structure reports its size here:
+
+- cached values (@derived state in db/dataset.py and the caches made with
+  @cached below) are measured once when stored and entered in a ledger in
+  least recently used order; they can be evicted and rebuilt on demand,
+- other structures (the snapshot index, the suburb index, SQLite's page
+  cache and memory map, the Parquet tables) register a function reporting
+  their current size with track().
+
+Budgets apply to the heap structures: MEMORY_BUDGETS caps named structures
+and MEMORY_BUDGET_MB their total. A value that would go over is either made
+room for by evicting the least recently used cached values
+(MEMORY_BUDGET_POLICY=evict) or refused (refuse); a value larger than its
+budget on its own is always refused. A refused @derived value raises
+MemoryBudgetExceeded (503 to the client); a refused cache entry is returned
+without being kept. Memory-mapped structures are reported but not
+budgeted: their pages are the OS page cache's, which it reclaims under
+pressure.
+
+Sizes are those of the objects a structure holds (NumPy buffers, pandas
+and Arrow columns, Python containers), not of everything the process
+allocated; tracemalloc snapshots (see start_tracing) show the rest.
+"""
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import MEMORY_BUDGET_MB, MEMORY_BUDGET_POLICY, MEMORY_BUDGETS
+
+MEMORY_POLICIES = ["evict", "refuse"]
+
+MB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """A structure was refused because it does not fit its memory budget."""
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Per-structure budgets in bytes from 'name=MB,name=MB'."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, mb = item.partition("=")
+        budgets[name.strip()] = int(float(mb) * MB)
+    return budgets
+
+
+if MEMORY_BUDGET_POLICY not in MEMORY_POLICIES:
+    raise ValueError(f"MEMORY_BUDGET_POLICY must be one of: {', '.join(MEMORY_POLICIES)}")
+
+BUDGETS = parse_budgets(MEMORY_BUDGETS)
+TOTAL_BUDGET = int(MEMORY_BUDGET_MB * MB) if MEMORY_BUDGET_MB > 0 else None
+
+
+def deep_sizeof(value: Any) -> int:
+    """
+    Bytes held by an object and everything it references.
+
+    NumPy arrays count their underlying buffer once however many views share
+    it; pandas and Arrow objects count their columns' buffers. Modules,
+    classes and functions are not followed.
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            base = obj
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            if base is not obj:
+                stack.append(base)
+                continue
+            total += sys.getsizeof(obj) if obj.base is None else obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+            continue
+        if isinstance(obj, (type, type(sys), type(deep_sizeof))):
+            continue
+
+        module = type(obj).__module__
+        if module.startswith("pandas"):
+            if hasattr(obj, "memory_usage"):
+                usage = obj.memory_usage(index=True, deep=True)
+                total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+            else:
+                total += sys.getsizeof(obj)
+            continue
+        if module.startswith("pyarrow"):
+            total += getattr(obj, "nbytes", 0) or sys.getsizeof(obj)
+            continue
+
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
+# Cached values: (structure, key) -> bytes, least recently used first
+_ledger: "OrderedDict[Tuple[str, Hashable], int]" = OrderedDict()
+_evictors: Dict[str, Callable[[Hashable], None]] = {}
+_structure_bytes: Dict[str, int] = {}
+_ledger_lock = threading.Lock()
+
+# Sizes last measured per (structure, key without the dataset version), so a
+# value known not to fit is refused before it is built again
+_last_sizes: Dict[Tuple[str, Hashable], int] = {}
+
+# Evictions and refusals per structure since startup
+_evictions: Dict[str, int] = {}
+_refusals: Dict[str, int] = {}
+
+# name -> (kind, usage function returning (bytes, entries))
+_tracked: Dict[str, Tuple[str, Callable[[], Tuple[int, int]]]] = {}
+
+
+def track(name: str, usage: Callable[[], Tuple[int, int]], kind: str = "heap") -> None:
+    """
+    Register a structure that is not a cached value.
+
+    Args:
+        name: Structure name, as used in MEMORY_BUDGETS and reports
+        usage: Returns the structure's current (bytes, entries)
+        kind: "heap" (counted against the budgets) or "mapped" (file-backed,
+            reported only)
+    """
+    _tracked[name] = (kind, usage)
+
+
+def _tracked_usage() -> Dict[str, Tuple[str, int, int]]:
+    usage = {}
+    for name, (kind, measure) in list(_tracked.items()):
+        try:
+            nbytes, entries = measure()
+        except Exception:
+            # A structure that cannot be measured (e.g. no dataset yet) holds nothing
+            nbytes, entries = 0, 0
+        usage[name] = (kind, int(nbytes), int(entries))
+    return usage
+
+
+def _refuse(structure: str, nbytes: int, reason: str) -> None:
+    _refusals[structure] = _refusals.get(structure, 0) + 1
+    raise MemoryBudgetExceeded(f"{structure} needs {nbytes / MB:.1f} MB, {reason}")
+
+
+def _fixed_bytes() -> int:
+    """Heap bytes of the tracked structures, which cannot be evicted."""
+    return sum(nbytes for kind, nbytes, _ in _tracked_usage().values() if kind == "heap")
+
+
+def check(structure: str, key: Hashable, nbytes: Optional[int] = None) -> None:
+    """
+    Refuse a value before it is built if it cannot fit.
+
+    Args:
+        structure: Structure name
+        key: The value's key without the dataset version
+        nbytes: Expected size; defaults to the size last measured for the key
+
+    Raises:
+        MemoryBudgetExceeded: If the value is larger than the structure's
+            budget, or than the total budget less what cannot be evicted
+            (under refuse, less everything already held)
+    """
+    if nbytes is None:
+        nbytes = _last_sizes.get((structure, key))
+        if nbytes is None:
+            return
+    limit = BUDGETS.get(structure)
+    if limit is not None:
+        held = _structure_bytes.get(structure, 0) if MEMORY_BUDGET_POLICY == "refuse" else 0
+        if held + nbytes > limit:
+            _refuse(structure, nbytes, f"over its {limit / MB:.0f} MB budget")
+    if TOTAL_BUDGET is not None:
+        held = _fixed_bytes()
+        if MEMORY_BUDGET_POLICY == "refuse":
+            held += sum(_structure_bytes.values())
+        if held + nbytes > TOTAL_BUDGET:
+            _refuse(structure, nbytes, f"over the {TOTAL_BUDGET / MB:.0f} MB total budget")
+
+
+def admit(
+    structure: str,
+    key: Hashable,
+    value: Any,
+    evict: Callable[[Hashable], None],
+    size_key: Optional[Hashable] = None,
+) -> int:
+    """
+    Account for a value about to be cached, evicting others to make room.
+
+    Args:
+        structure: Structure name
+        key: The value's key in its cache
+        value: The value (measured with deep_sizeof)
+        evict: Drops a key of this structure from its cache
+        size_key: Key the size is remembered under across dataset versions
+
+    Returns:
+        The value's size in bytes
+
+    Raises:
+        MemoryBudgetExceeded: If the value does not fit; it must not be cached
+    """
+    nbytes = deep_sizeof(value)
+    if size_key is not None:
+        _last_sizes[(structure, size_key)] = nbytes
+    fixed = _fixed_bytes() if TOTAL_BUDGET is not None else 0
+
+    victims: List[Tuple[str, Hashable]] = []
+    with _ledger_lock:
+        _evictors[structure] = evict
+        limit = BUDGETS.get(structure)
+        if limit is not None and nbytes > limit:
+            _refuse(structure, nbytes, f"over its {limit / MB:.0f} MB budget on its own")
+
+        # A value replacing one under the same key frees that one
+        own = _structure_bytes.get(structure, 0) - _ledger.get((structure, key), 0)
+        total = sum(_structure_bytes.values()) - _ledger.get((structure, key), 0)
+
+        def over() -> Tuple[bool, bool]:
+            return (
+                limit is not None and own + nbytes > limit,
+                TOTAL_BUDGET is not None and fixed + total + nbytes > TOTAL_BUDGET,
+            )
+
+        structure_over, total_over = over()
+        if (structure_over or total_over) and MEMORY_BUDGET_POLICY == "refuse":
+            scope = f"its {limit / MB:.0f} MB budget" if structure_over else f"the {TOTAL_BUDGET / MB:.0f} MB total budget"
+            _refuse(structure, nbytes, f"{scope} is full")
+
+        # Least recently used first: this structure's values while it is over
+        # its own budget, any structure's while over the total
+        for entry, size in _ledger.items():
+            if not (structure_over or total_over):
+                break
+            if entry == (structure, key) or (not total_over and entry[0] != structure):
+                continue
+            victims.append(entry)
+            total -= size
+            if entry[0] == structure:
+                own -= size
+            structure_over, total_over = over()
+
+        if structure_over or total_over:
+            _refuse(structure, nbytes, "over budget even with every cached value evicted")
+
+        for entry in victims:
+            _structure_bytes[entry[0]] -= _ledger.pop(entry)
+            _evictions[entry[0]] = _evictions.get(entry[0], 0) + 1
+        previous = _ledger.pop((structure, key), 0)
+        _ledger[(structure, key)] = nbytes
+        _structure_bytes[structure] = _structure_bytes.get(structure, 0) - previous + nbytes
+
+    # Outside the ledger lock: evictors take their cache's lock
+    for name, victim in victims:
+        _evictors[name](victim)
+    return nbytes
+
+
+def touch(structure: str, key: Hashable) -> None:
+    """Mark a cached value as used (moves it last in eviction order)."""
+    with _ledger_lock:
+        try:
+            _ledger.move_to_end((structure, key))
+        except KeyError:
+            pass
+
+
+def release(structure: str, key: Hashable) -> None:
+    """Remove a value its cache dropped from the accounts."""
+    with _ledger_lock:
+        nbytes = _ledger.pop((structure, key), None)
+        if nbytes is not None:
+            _structure_bytes[structure] -= nbytes
+
+
+def cached(structure: str, maxsize: int) -> Callable:
+    """
+    Like functools.lru_cache(maxsize), with the entries accounted and budgeted.
+
+    An entry refused by the budgets is returned without being cached.
+    """
+    def decorator(function: Callable) -> Callable:
+        values: "OrderedDict[Hashable, Any]" = OrderedDict()
+        lock = threading.Lock()
+        hits = misses = 0
+
+        def evict(key: Hashable) -> None:
+            with lock:
+                values.pop(key, None)
+
+        @wraps(function)
+        def wrapper(*args):
+            nonlocal hits, misses
+            with lock:
+                if args in values:
+                    values.move_to_end(args)
+                    hits += 1
+                    found = True
+                    value = values[args]
+                else:
+                    misses += 1
+                    found = False
+            if found:
+                touch(structure, args)
+                return value
+
+            value = function(*args)
+            try:
+                admit(structure, args, value, evict)
+            except MemoryBudgetExceeded:
+                return value
+            with lock:
+                values[args] = value
+                dropped = values.popitem(last=False)[0] if len(values) > maxsize else None
+            if dropped is not None:
+                release(structure, dropped)
+            return value
+
+        def cache_clear() -> None:
+            with lock:
+                keys = list(values)
+                values.clear()
+            for key in keys:
+                release(structure, key)
+
+        def cache_info() -> Dict[str, int]:
+            return {"hits": hits, "misses": misses, "maxsize": maxsize, "currsize": len(values)}
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
+
+
+def memory_usage() -> Dict[str, Any]:
+    """
+    Sizes of every accounted structure against the budgets.
+
+    Returns:
+        Dictionary with policy, total_budget_mb, heap_mb (accounted heap
+        total), mapped_mb, and structures: per structure its kind ("cached",
+        "heap" or "mapped"), mb, entries, budget_mb, evictions and refusals,
+        largest first
+    """
+    with _ledger_lock:
+        entries: Dict[str, int] = {}
+        for name, _ in _ledger:
+            entries[name] = entries.get(name, 0) + 1
+        cached_bytes = {name: nbytes for name, nbytes in _structure_bytes.items() if name in entries}
+
+    rows = {
+        name: {"kind": "cached", "mb": nbytes / MB, "entries": entries[name]}
+        for name, nbytes in cached_bytes.items()
+    }
+    for name, (kind, nbytes, count) in _tracked_usage().items():
+        rows[name] = {"kind": kind, "mb": nbytes / MB, "entries": count}
+    for name in set(_refusals) | set(_evictions) | set(BUDGETS):
+        rows.setdefault(name, {"kind": "cached", "mb": 0.0, "entries": 0})
+
+    structures = []
+    for name, row in rows.items():
+        budget = BUDGETS.get(name)
+        structures.append({
+            "name": name,
+            **row,
+            "budget_mb": budget / MB if budget is not None else None,
+            "evictions": _evictions.get(name, 0),
+            "refusals": _refusals.get(name, 0),
+        })
+    structures.sort(key=lambda row: row["mb"], reverse=True)
+
+    return {
+        "policy": MEMORY_BUDGET_POLICY,
+        "total_budget_mb": TOTAL_BUDGET / MB if TOTAL_BUDGET is not None else None,
+        "heap_mb": sum(row["mb"] for row in structures if row["kind"] != "mapped"),
+        "mapped_mb": sum(row["mb"] for row in structures if row["kind"] == "mapped"),
+        "structures": structures,
+    }
+
+
+# Snapshot the next compare is made against
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+def start_tracing(frames: int = 1) -> None:
+    """
+    Start tracing allocations (tracemalloc), keeping frames of traceback each.
+
+    Tracing slows allocation-heavy code down and holds its own bookkeeping;
+    stop it once the snapshots needed are taken.
+    """
+    global _baseline
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    tracemalloc.start(frames)
+    _baseline = None
+
+
+def stop_tracing() -> None:
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+
+
+def traced_allocations(group_by: str = "lineno", limit: int = 25, compare: bool = False) -> Dict[str, Any]:
+    """
+    Largest allocations made since tracing started.
+
+    Args:
+        group_by: "lineno", "filename" or "traceback"
+        limit: Number of groups returned
+        compare: Report the change since the previous call's snapshot instead
+
+    Returns:
+        Dictionary with traced_mb, peak_mb and the top groups (where, mb,
+        count; with compare also mb_diff and count_diff)
+
+    Raises:
+        ValueError: If tracing is not started or group_by is unknown
+    """
+    global _baseline
+    if not tracemalloc.is_tracing():
+        raise ValueError("Allocations are not being traced; start tracing first")
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise ValueError("group_by must be one of: lineno, filename, traceback")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    if compare and _baseline is not None:
+        stats = snapshot.compare_to(_baseline, group_by)
+    else:
+        stats = snapshot.statistics(group_by)
+    _baseline = snapshot
+
+    traced, peak = tracemalloc.get_traced_memory()
+    top = []
+    for stat in stats[:limit]:
+        row = {
+            "where": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            "mb": stat.size / MB,
+            "count": stat.count,
+        }
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            row["mb_diff"] = stat.size_diff / MB
+            row["count_diff"] = stat.count_diff
+        top.append(row)
+    return {"traced_mb": traced / MB, "peak_mb": peak / MB, "top": top}
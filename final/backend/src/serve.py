@@ -0,0 +1,289 @@
+"""Pre-fork launcher: serve the API from several workers sharing one copy of the data.
+
+`uvicorn src.main:app` serves from one process, and uvicorn's own --workers
+starts each worker as a fresh interpreter, so every in-memory structure
+(column arrays, fitted models, matrices, the suburb index) would be built
+and held once per worker. Instead this launcher:
+
+1. opens the dataset and builds that read-only state once, in the parent
+   (the warm-up steps of services/warmup.py plus every quarterly matrix),
+2. freezes the garbage collector's view of it, so collections in the
+   workers do not write to (and so copy) the pages it lives on,
+3. binds the listening socket and forks WORKERS workers, which each run the
+   app on that socket with the parent's memory mapped copy-on-write.
+
+Memory beyond the shared state grows per worker only with what each request
+allocates, so adding cores does not multiply the data held. The parent
+supervises: it replaces a worker that dies, and on SIGHUP (or every
+DATASET_WATCH_INTERVAL seconds) reloads the dataset itself (see
+db/hot_swap.py), warms it, forks a new set of workers and gracefully stops
+the old ones, so a reload keeps the state shared. SIGUSR1 (and every
+MEMORY_REPORT_INTERVAL seconds) prints each process's memory: RSS counts
+shared pages in every process, USS is what a process holds alone and PSS
+splits shared pages between their users, so the PSS total is the real
+footprint.
+
+Usage (from the backend directory):
+
+    WORKERS=4 python -m src.serve
+    python -m src.serve --workers 4 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from .config import API_HOST, API_PORT, DATASET_WATCH_INTERVAL, MEMORY_REPORT_INTERVAL, WARMUP, WORKERS
+
+# Seconds a stopped worker gets to finish its requests before it is killed
+WORKER_STOP_TIMEOUT = 30.0
+
+# Seconds between checks of the workers
+SUPERVISE_INTERVAL = 0.2
+
+
+def prepare() -> None:
+    """Open the dataset and build the state the workers will share."""
+    from .api.snapshot import snapshot_index
+    from .db.dataset import dataset_version
+    from .services.quarterly_matrix import MATRIX_METRICS, quarterly_matrix
+    from .services.warmup import PROPERTY_TYPES, skip_warm_up, warm_up
+
+    print(f"Serving dataset version {dataset_version()}")
+    print(f"Snapshot responses: {len(snapshot_index()):,}")
+    if WARMUP == "off":
+        skip_warm_up()
+        return
+
+    # Always before forking: state a worker builds on demand is its own copy
+    warm_up()
+    for metric in MATRIX_METRICS:
+        for property_type in PROPERTY_TYPES:
+            try:
+                quarterly_matrix(metric, property_type)
+            except Exception as e:
+                print(f"WARNING: quarterly matrix {metric}/{property_type} failed: {type(e).__name__}: {e}")
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """The listening socket every worker accepts connections from."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket) -> None:
+    """Serve the app on the inherited socket (in a forked child; never returns)."""
+    import uvicorn
+
+    from .db.dataset import current_dataset
+
+    # The parent's handlers were inherited; uvicorn installs its own for
+    # SIGINT/SIGTERM and re-raises them on exit, so they must be the defaults
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    current_dataset().after_fork()
+
+    code = 0
+    try:
+        uvicorn.Server(uvicorn.Config(app, lifespan="on")).run(sockets=[sock])
+    except BaseException as e:
+        print(f"WARNING: worker {os.getpid()} failed: {type(e).__name__}: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        os._exit(code)
+
+
+def memory_report(pids: List[int]) -> List[Dict[str, float]]:
+    """
+    Memory of each process in MB: rss, pss (Linux), uss and shared (rss - uss).
+
+    Processes that exited in the meantime are left out.
+    """
+    import psutil
+
+    rows = []
+    for pid in pids:
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except psutil.Error:
+            continue
+        mb = 1024 * 1024
+        rows.append({
+            "pid": pid,
+            "rss_mb": info.rss / mb,
+            "pss_mb": getattr(info, "pss", info.uss) / mb,
+            "uss_mb": info.uss / mb,
+            "shared_mb": (info.rss - info.uss) / mb,
+        })
+    return rows
+
+
+def format_memory_report(rows: List[Dict[str, float]], parent: int) -> str:
+    lines = [f"{'process':<16}{'rss':>10}{'pss':>10}{'uss':>10}{'shared':>10}  (MB)"]
+    for row in rows:
+        name = f"parent {row['pid']}" if row["pid"] == parent else f"worker {row['pid']}"
+        lines.append(
+            f"{name:<16}{row['rss_mb']:>10.1f}{row['pss_mb']:>10.1f}"
+            f"{row['uss_mb']:>10.1f}{row['shared_mb']:>10.1f}"
+        )
+    lines.append(f"{'total pss':<16}{'':>10}{sum(row['pss_mb'] for row in rows):>10.1f}")
+    return "\n".join(lines)
+
+
+class Launcher:
+    """Forks and supervises the workers; all of its methods run in the parent."""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        # Current workers, and replaced ones still finishing their requests
+        self.pids: List[int] = []
+        self.stopping: Dict[int, float] = {}
+        self._signals: List[int] = []
+
+    def _spawn(self) -> int:
+        # Buffered output would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.sock)
+        return pid
+
+    def _spawn_all(self) -> None:
+        # Objects allocated so far are left alone by the workers' collections
+        gc.collect()
+        gc.freeze()
+        self.pids = [self._spawn() for _ in range(self.workers)]
+        print(f"Forked {self.workers} workers: {', '.join(map(str, self.pids))}")
+
+    def _stop(self, pids: List[int]) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+            self.stopping[pid] = time.monotonic() + WORKER_STOP_TIMEOUT
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self.stopping.pop(pid, None) is not None:
+                continue
+            if pid in self.pids:
+                print(f"WARNING: worker {pid} exited ({os.waitstatus_to_exitcode(status)}), replacing it")
+                self.pids[self.pids.index(pid)] = self._spawn()
+
+        for pid, deadline in list(self.stopping.items()):
+            if time.monotonic() > deadline:
+                print(f"WARNING: killing worker {pid} after {WORKER_STOP_TIMEOUT:.0f}s")
+                self.stopping[pid] = float("inf")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _reload(self) -> None:
+        """Reload the dataset here and move to workers forked from it."""
+        from .db.hot_swap import DatasetInvalid, reload_dataset
+
+        # Let the replaced dataset's state be collected once no worker uses it
+        gc.unfreeze()
+        dataset = None
+        try:
+            dataset = reload_dataset()
+        except DatasetInvalid as e:
+            print(f"WARNING: new dataset rejected: {e}")
+        except Exception as e:
+            print(f"WARNING: dataset reload failed: {e}")
+        if dataset is None:
+            gc.freeze()
+            return
+
+        # The replaced dataset's drain thread closes it at once (no requests
+        # run here); a fork must not copy a thread midway
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread():
+                thread.join()
+        old = self.pids
+        self._spawn_all()
+        self._stop(old)
+
+    def _signal(self, signum, _frame) -> None:
+        self._signals.append(signum)
+
+    def run(self) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, self._signal)
+        self._spawn_all()
+
+        parent = os.getpid()
+        next_check = time.monotonic() + DATASET_WATCH_INTERVAL if DATASET_WATCH_INTERVAL > 0 else None
+        next_report = time.monotonic() + MEMORY_REPORT_INTERVAL if MEMORY_REPORT_INTERVAL > 0 else None
+        while True:
+            now = time.monotonic()
+            signals, self._signals = self._signals, []
+            if signal.SIGINT in signals or signal.SIGTERM in signals:
+                break
+            if signal.SIGHUP in signals or (next_check is not None and now >= next_check):
+                self._reload()
+                if next_check is not None:
+                    next_check = now + DATASET_WATCH_INTERVAL
+            if signal.SIGUSR1 in signals or (next_report is not None and now >= next_report):
+                print(format_memory_report(memory_report([parent] + self.pids), parent), flush=True)
+                if next_report is not None:
+                    next_report = now + MEMORY_REPORT_INTERVAL
+            self._reap()
+            time.sleep(SUPERVISE_INTERVAL)
+
+        print("Stopping workers")
+        self._stop(self.pids)
+        self.pids = []
+        while self.stopping:
+            self._reap()
+            time.sleep(SUPERVISE_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing the dataset")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    from .main import create_app
+
+    if not hasattr(os, "fork"):
+        import uvicorn
+
+        print("WARNING: no fork() on this platform, serving from one process")
+        uvicorn.run(create_app(), host=args.host, port=args.port)
+        return
+
+    sock = bind(args.host, args.port)
+    app = create_app(watch_dataset=False)
+    prepare()
+    Launcher(app, sock, max(1, args.workers)).run()
+
+
+if __name__ == "__main__":
+    main()
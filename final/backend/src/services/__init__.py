@@ -0,0 +1 @@
+"""In-process services computed from the dataset."""
@@ -0,0 +1,291 @@
+"""Ad-hoc group-by aggregation over the properties table held as NumPy columns.
+
+Answers one-off cuts such as "median CTSD by district by year for units over
+$1M" without touching the database. At startup every sale is loaded once into
+compact column arrays:
+
+- suburb, postcode, district and property_type as integer codes into sorted
+  category arrays,
+- year, quarter and month of the settlement date as small integers,
+- sale_price and contract_to_settlement_days as floats,
+- for each metric, the row order that sorts it ascending (NaN last).
+
+A query is then a handful of vectorized passes: a boolean filter mask, a
+mixed-radix group key per selected row, bincount for counts/sums, and one
+stable sort of group ids over rows already in metric order, which lays every
+group's values out sorted so medians and percentiles are index lookups.
+"""
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import AGGREGATE_MAX_GROUPS, AGGREGATE_TIME_BUDGET_MS
+from ..db.dataset import derived
+from ..db.repository import open_repository
+
+CATEGORY_DIMENSIONS = ["suburb", "postcode", "district", "property_type"]
+DATE_DIMENSIONS = ["year", "quarter", "month"]
+DIMENSIONS = CATEGORY_DIMENSIONS + DATE_DIMENSIONS
+
+METRICS = ["sale_price", "contract_to_settlement_days"]
+
+# Named aggregates; pNN (e.g. p10, p90) requests an arbitrary percentile
+AGGREGATES = ["count", "mean", "median", "fast_settlement_share"]
+
+FAST_SETTLEMENT_DAYS = 30
+
+# Dense group-key space up to this size is counted with bincount, larger
+# spaces fall back to np.unique
+DENSE_KEY_LIMIT = 1 << 24
+
+
+class AggregateError(ValueError):
+    """Invalid aggregate query (bad dimension, aggregate or metric)."""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """An aggregate query ran past its time budget."""
+
+
+@derived("property_columns")
+def property_columns() -> Dict[str, Any]:
+    """
+    Load properties into the column layout described in the module docstring.
+
+    Returns:
+        Dictionary with "codes" and "categories" per category dimension,
+        zero-based "dates" with their "date_offsets" and "radices" per date
+        dimension, "settlement_days", "metrics", "order" and "sorted_metrics"
+        per metric, "fast" and "rows"
+    """
+    with open_repository() as repo:
+        columns = repo.load_columns(
+            "properties",
+            CATEGORY_DIMENSIONS + ["settlement_date"] + METRICS,
+        )
+
+    categories = {}
+    codes = {}
+    for name in CATEGORY_DIMENSIONS:
+        values = columns.pop(name).astype(str)
+        categories[name], inverse = np.unique(values, return_inverse=True)
+        codes[name] = inverse.astype(np.int32)
+
+    settlement = columns.pop("settlement_date")
+    months = settlement.astype("datetime64[M]").astype(np.int64)
+    years = months // 12 + 1970
+    first_year = int(years.min()) if len(years) else 0
+    # Years are stored as offsets from the first year to keep group keys dense
+    dates = {
+        "year": (years - first_year).astype(np.int16),
+        "quarter": (months % 12 // 3).astype(np.int8),
+        "month": (months % 12).astype(np.int8),
+    }
+    date_offsets = {"year": first_year, "quarter": 1, "month": 1}
+
+    metrics = {name: columns.pop(name) for name in METRICS}
+    # argsort places NaN last, so valid values form a prefix of each order.
+    # Values are also kept in that order so queries read them sequentially.
+    order = {name: np.argsort(values, kind="stable").astype(np.int32) for name, values in metrics.items()}
+    sorted_metrics = {name: metrics[name][order[name]] for name in METRICS}
+
+    return {
+        "codes": codes,
+        "categories": categories,
+        "dates": dates,
+        "date_offsets": date_offsets,
+        "radices": {name: int(values.max()) + 1 if len(values) else 1 for name, values in dates.items()},
+        "settlement_days": settlement.astype(np.int32),
+        "metrics": metrics,
+        "order": order,
+        "sorted_metrics": sorted_metrics,
+        "fast": metrics["contract_to_settlement_days"] <= FAST_SETTLEMENT_DAYS,
+        "rows": len(settlement),
+    }
+
+
+def parse_aggregates(aggregates: Sequence[str]) -> List[str]:
+    """Validate aggregate names, allowing pNN percentiles between p0 and p100."""
+    for name in aggregates:
+        if name in AGGREGATES:
+            continue
+        if name.startswith("p") and name[1:].replace(".", "", 1).isdigit() and 0 <= float(name[1:]) <= 100:
+            continue
+        raise AggregateError(f"Unknown aggregate '{name}': use {', '.join(AGGREGATES)} or pNN (e.g. p90)")
+    return list(aggregates)
+
+
+def _category_mask(store: Dict[str, Any], name: str, value: str) -> np.ndarray:
+    """Rows whose category dimension equals value (none if value is unknown)."""
+    categories = store["categories"][name]
+    position = np.searchsorted(categories, value)
+    if position == len(categories) or categories[position] != value:
+        return np.zeros(store["rows"], dtype=bool)
+    return store["codes"][name] == position
+
+
+def run_aggregate(
+    group_by: Sequence[str],
+    aggregates: Sequence[str],
+    metric: str = "sale_price",
+    filters: Optional[Dict[str, Any]] = None,
+    max_groups: int = AGGREGATE_MAX_GROUPS,
+    time_budget_ms: float = AGGREGATE_TIME_BUDGET_MS,
+) -> Dict[str, Any]:
+    """
+    Group matching sales and compute aggregates of a metric per group.
+
+    Args:
+        group_by: Dimensions from DIMENSIONS (empty for one overall group)
+        aggregates: Names from AGGREGATES or pNN percentiles
+        metric: Column the value aggregates apply to (see METRICS)
+        filters: Optional suburb, postcode, district, property_type,
+            min_price, max_price, start_date and end_date
+        max_groups: Groups returned at most (the rest are reported as truncated)
+        time_budget_ms: Abort with QueryBudgetExceeded after the query has
+            run this long (building the columns is not counted)
+
+    Returns:
+        Dictionary with rows (one dict per group, ordered by group key),
+        total_groups and truncated
+
+    Raises:
+        AggregateError: On unknown dimensions, metrics or aggregates
+        QueryBudgetExceeded: If the query runs past time_budget_ms
+    """
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise AggregateError(f"Unknown group_by dimension(s): {', '.join(unknown)}")
+    if len(set(group_by)) != len(group_by):
+        raise AggregateError("group_by dimensions must be unique")
+    if metric not in METRICS:
+        raise AggregateError(f"metric must be one of: {', '.join(METRICS)}")
+    aggregates = parse_aggregates(aggregates)
+
+    store = property_columns()
+    filters = filters or {}
+
+    # Started once the columns are built: a one-off build is not the query's cost
+    started = time.perf_counter()
+
+    def check_budget():
+        if (time.perf_counter() - started) * 1000 > time_budget_ms:
+            raise QueryBudgetExceeded(f"Aggregate query exceeded its {time_budget_ms:.0f} ms time budget")
+
+    # Filter mask over all rows
+    mask = np.ones(store["rows"], dtype=bool)
+    for name in CATEGORY_DIMENSIONS:
+        if filters.get(name):
+            mask &= _category_mask(store, name, filters[name])
+    prices = store["metrics"]["sale_price"]
+    if filters.get("min_price") is not None:
+        mask &= prices >= filters["min_price"]
+    if filters.get("max_price") is not None:
+        mask &= prices <= filters["max_price"]
+    days = store["settlement_days"]
+    if filters.get("start_date"):
+        mask &= days >= np.datetime64(filters["start_date"], "D").astype(np.int32)
+    if filters.get("end_date"):
+        mask &= days <= np.datetime64(filters["end_date"], "D").astype(np.int32)
+    check_budget()
+
+    # Selected rows in ascending metric order (NaN metric rows at the end)
+    selected = mask[store["order"][metric]]
+    rows = store["order"][metric][selected]
+    values = store["sorted_metrics"][metric][selected]
+    check_budget()
+
+    # Mixed-radix group key, computed over contiguous columns then gathered once
+    keys = np.zeros(store["rows"], dtype=np.int64)
+    radices = []
+    for name in group_by:
+        if name in CATEGORY_DIMENSIONS:
+            column = store["codes"][name]
+            radix = len(store["categories"][name])
+        else:
+            column = store["dates"][name]
+            radix = store["radices"][name]
+        keys *= radix
+        keys += column
+        radices.append(radix)
+    keys = keys[rows]
+    key_space = int(np.prod(radices, dtype=np.float64)) if radices else 1
+
+    if key_space <= DENSE_KEY_LIMIT:
+        present = np.bincount(keys, minlength=key_space) > 0
+        group_keys = np.flatnonzero(present)
+        dense_ids = np.cumsum(present) - 1
+        group_ids = dense_ids[keys]
+    else:
+        group_keys, group_ids = np.unique(keys, return_inverse=True)
+    num_groups = len(group_keys)
+    check_budget()
+
+    counts = np.bincount(group_ids, minlength=num_groups)
+    valid = ~np.isnan(values)
+    valid_counts = np.bincount(group_ids[valid], minlength=num_groups)
+
+    sorted_values = None
+    if any(name not in AGGREGATES or name == "median" for name in aggregates):
+        # Stable sort by group keeps each group's values in ascending order
+        id_dtype = np.int16 if num_groups < np.iinfo(np.int16).max else np.int32
+        sorted_values = values[np.argsort(group_ids.astype(id_dtype), kind="stable")]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        last = starts + np.maximum(valid_counts - 1, 0)
+        check_budget()
+
+    results = {}
+    for name in aggregates:
+        if name == "count":
+            results[name] = counts
+        elif name == "mean":
+            sums = np.bincount(group_ids[valid], weights=values[valid], minlength=num_groups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                results[name] = np.where(valid_counts > 0, sums / valid_counts, np.nan)
+        elif name == "fast_settlement_share":
+            fast = store["fast"][rows].astype(np.float64)
+            results[name] = np.bincount(group_ids, weights=fast, minlength=num_groups) / np.maximum(counts, 1)
+        else:
+            q = 0.5 if name == "median" else float(name[1:]) / 100
+            # Linear interpolation between the sorted valid values of each group
+            position = starts + q * (last - starts)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, last)
+            if len(sorted_values):
+                low_values = sorted_values[np.minimum(lower, len(sorted_values) - 1)]
+                high_values = sorted_values[np.minimum(upper, len(sorted_values) - 1)]
+                result = low_values + (high_values - low_values) * (position - lower)
+            else:
+                result = np.empty(0)
+            results[name] = np.where(valid_counts > 0, result, np.nan)
+        check_budget()
+
+    # Decode group keys back into dimension values for the returned groups
+    returned = min(num_groups, max_groups)
+    remaining = group_keys[:returned].copy()
+    decoded = {}
+    for name, radix in reversed(list(zip(group_by, radices))):
+        component = remaining % radix
+        remaining //= radix
+        if name in CATEGORY_DIMENSIONS:
+            decoded[name] = store["categories"][name][component].tolist()
+        else:
+            decoded[name] = (component + store["date_offsets"][name]).tolist()
+
+    output = []
+    for i in range(returned):
+        row = {name: decoded[name][i] for name in group_by}
+        for name in aggregates:
+            value = results[name][i]
+            if name == "count":
+                row[name] = int(value)
+            else:
+                row[name] = None if np.isnan(value) else float(value)
+        output.append(row)
+
+    return {
+        "rows": output,
+        "total_groups": num_groups,
+        "truncated": num_groups > returned,
+    }
@@ -0,0 +1,203 @@
+"""Batch damped-trend seasonal forecasts for every suburb series.
+
+Each (suburb, property_type) series of quarterly log median prices is modelled
+with additive damped-trend Holt-Winters in error-correction form:
+
+    forecast_t = level + phi * trend + season[q]
+    error_t    = y_t - forecast_t
+    level     += phi * trend + alpha * error_t    (then trend, season)
+    trend      = phi * trend + beta * error_t
+    season[q] += gamma * error_t
+
+All series are fitted together: the smoothing parameters are searched over a
+fixed grid, and the recursion runs once over the quarters with the state held
+as (grid point, series) arrays, so every candidate for every series advances
+in one NumPy step per quarter. Each series keeps the grid point with the
+lowest one-step-ahead squared error. Quarters without sales skip the update
+(error 0), so gaps only advance the trend.
+
+The fitted parameters and final state are cached per dataset version, and a
+forecast is a closed-form evaluation of that state: the point path plus
+prediction intervals from the standard ETS(A,Ad,A) h-step variance.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..db.dataset import derived
+from .quarterly_matrix import quarterly_matrix
+
+SEASONS = 4
+
+# Smoothing parameter grid; beta is a fraction of alpha so the trend adapts
+# no faster than the level
+ALPHA_GRID = [0.1, 0.2, 0.4, 0.6, 0.8]
+BETA_FRACTION_GRID = [0.0, 0.1, 0.3]
+PHI_GRID = [0.8, 0.9, 0.98]
+GAMMA_GRID = [0.0, 0.1, 0.3]
+
+# Errors of a series' first year only warm the state and are not scored
+BURN_IN = 4
+
+# Series with fewer quarters with sales are not forecast
+MIN_OBSERVATIONS = 8
+
+MAX_HORIZON = 20
+
+# Two-sided normal quantiles of the returned prediction intervals
+INTERVAL_Z = {80: 1.2816, 95: 1.9600}
+
+
+def _grid() -> Dict[str, np.ndarray]:
+    """Every parameter combination as (combinations, 1) columns."""
+    alpha, beta_fraction, phi, gamma = np.meshgrid(
+        ALPHA_GRID, BETA_FRACTION_GRID, PHI_GRID, GAMMA_GRID, indexing="ij"
+    )
+    return {
+        "alpha": alpha.reshape(-1, 1),
+        "beta": np.round(alpha * beta_fraction, 6).reshape(-1, 1),
+        "phi": phi.reshape(-1, 1),
+        "gamma": gamma.reshape(-1, 1),
+    }
+
+
+def fit(series: np.ndarray, first_season: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Fit every series over the parameter grid and keep the best per series.
+
+    Args:
+        series: (series, periods) array of log prices, NaN where missing
+        first_season: Season index (0-3) of the first column
+
+    Returns:
+        Per series arrays: alpha, beta, phi, gamma, sigma (one-step error
+        standard deviation), level, trend, season (series, SEASONS) indexed by
+        calendar season, and observations (periods with data)
+    """
+    params = _grid()
+    combos = len(params["alpha"])
+    num_series, periods = series.shape
+
+    level = np.zeros((combos, num_series))
+    trend = np.zeros((combos, num_series))
+    season = np.zeros((SEASONS, combos, num_series))
+    sse = np.zeros((combos, num_series))
+    seen = np.zeros(num_series, dtype=np.int64)
+    scored = np.zeros(num_series, dtype=np.int64)
+
+    for t in range(periods):
+        observed = series[:, t]
+        valid = ~np.isnan(observed)
+        # A series' first observation initialises its level (trend and season start at 0)
+        first = valid & (seen == 0)
+        level[:, first] = observed[first]
+        updating = valid & ~first
+        seen += valid
+
+        s = (first_season + t) % SEASONS
+        damped = params["phi"] * trend
+        error = np.where(updating, observed - (level + damped + season[s]), 0.0)
+
+        score = updating & (seen > BURN_IN)
+        sse += np.where(score, error * error, 0.0)
+        scored += score
+
+        level += damped + params["alpha"] * error
+        trend = damped + params["beta"] * error
+        season[s] += params["gamma"] * error
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(num_series)
+    return {
+        "alpha": params["alpha"][best, 0],
+        "beta": params["beta"][best, 0],
+        "phi": params["phi"][best, 0],
+        "gamma": params["gamma"][best, 0],
+        "sigma": np.sqrt(sse[best, columns] / np.maximum(scored - 1, 1)),
+        "level": level[best, columns],
+        "trend": trend[best, columns],
+        "season": season[:, best, columns].T,
+        "observations": seen,
+    }
+
+
+@derived("forecast_models")
+def forecast_models(property_type: str) -> Dict[str, Any]:
+    """
+    Fit every suburb's quarterly median price series for one property type.
+
+    Returns:
+        Dictionary with the suburb index, last_key (quarter key of the final
+        fitted quarter) and the fit() arrays
+    """
+    matrix = quarterly_matrix("median_price", property_type)
+    values = matrix["values"].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.where(values > 0, np.log(values), np.nan)
+
+    if not matrix["quarters"]:
+        return {"suburbs": {}, "last_key": None, "model": None}
+
+    first_year, first_quarter = matrix["quarters"][0].split("-Q")
+    first_key = int(first_year) * 4 + int(first_quarter) - 1
+
+    return {
+        "suburbs": {suburb: i for i, suburb in enumerate(matrix["suburbs"])},
+        "last_key": first_key + len(matrix["quarters"]) - 1,
+        "model": fit(series, first_season=first_key % SEASONS),
+    }
+
+
+def forecast(suburb: str, property_type: str, horizon: int) -> Optional[Dict[str, Any]]:
+    """
+    Forecast a suburb's median price for the next horizon quarters.
+
+    Args:
+        suburb: Suburb name
+        property_type: house or unit
+        horizon: Quarters ahead (1 to MAX_HORIZON)
+
+    Returns:
+        Dictionary with last_quarter, observations, the fitted parameters and
+        one entry per future quarter with price and interval bounds, or None
+        if the suburb is unknown or has fewer than MIN_OBSERVATIONS quarters
+    """
+    models = forecast_models(property_type)
+    i = models["suburbs"].get(suburb)
+    if i is None or models["model"]["observations"][i] < MIN_OBSERVATIONS:
+        return None
+
+    model = {name: values[i] for name, values in models["model"].items()}
+    steps = np.arange(1, horizon + 1)
+    keys = models["last_key"] + steps
+
+    # Cumulative damping phi + phi^2 + ... + phi^h
+    phi = model["phi"]
+    damping = np.cumsum(phi ** steps)
+    mean = model["level"] + damping * model["trend"] + model["season"][keys % SEASONS]
+
+    # h-step variance: sigma^2 * (1 + sum_{j<h} c_j^2) with
+    # c_j = alpha + beta * (phi + ... + phi^j) + gamma * [j is a whole year]
+    c = model["alpha"] + model["beta"] * damping + model["gamma"] * (steps % SEASONS == 0)
+    variance = model["sigma"] ** 2 * (1 + np.concatenate([[0.0], np.cumsum(c[:-1] ** 2)]))
+    spread = np.sqrt(variance)
+
+    forecasts = []
+    for step, key in enumerate(keys):
+        point = {"quarter": f"{key // 4}-Q{key % 4 + 1}", "price": float(np.exp(mean[step]))}
+        for level, z in INTERVAL_Z.items():
+            point[f"lower_{level}"] = float(np.exp(mean[step] - z * spread[step]))
+            point[f"upper_{level}"] = float(np.exp(mean[step] + z * spread[step]))
+        forecasts.append(point)
+
+    last_key = models["last_key"]
+    return {
+        "last_quarter": f"{last_key // 4}-Q{last_key % 4 + 1}",
+        "observations": int(model["observations"]),
+        "alpha": float(model["alpha"]),
+        "beta": float(model["beta"]),
+        "phi": float(phi),
+        "gamma": float(model["gamma"]),
+        "sigma": float(model["sigma"]),
+        "forecasts": forecasts,
+    }
@@ -0,0 +1,119 @@
+"""Precompressed simplified suburb boundaries built by src/db/build_geometry.py.
+
+Files are read once into memory (the largest level is well under a megabyte
+compressed) and re-read only when the build rewrites them.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .. import memory
+from ..config import GEOMETRY_DIR
+
+GEOMETRY_FORMATS = {"topojson": "application/json", "geojson": "application/geo+json"}
+
+# Stored encodings in preference order -> file suffix
+ENCODINGS = [("br", ".br"), ("gzip", ".gz"), ("identity", "")]
+
+
+class GeometryNotBuilt(FileNotFoundError):
+    """The geometry build step has not been run for GEOMETRY_DIR."""
+
+
+@memory.cached("geometry_files", maxsize=64)
+def _read(path: str, mtime: float) -> bytes:
+    """File contents; mtime keys the cache so rebuilt files are re-read."""
+    return Path(path).read_bytes()
+
+
+def cached_file(path: Path) -> Optional[bytes]:
+    """Cached contents of a geometry file, or None if it does not exist."""
+    try:
+        return _read(str(path), path.stat().st_mtime)
+    except FileNotFoundError:
+        return None
+
+
+def geometry_manifest(directory: Path = GEOMETRY_DIR) -> Dict[str, Any]:
+    """
+    Describe the built levels of detail.
+
+    Raises:
+        GeometryNotBuilt: If the manifest is missing
+    """
+    body = cached_file(Path(directory) / "manifest.json")
+    if body is None:
+        raise GeometryNotBuilt(f"Geometry not built in {directory}: run python -m src.db.build_geometry")
+    return json.loads(body)
+
+
+def level_for_zoom(manifest: Dict[str, Any], zoom: float) -> int:
+    """Coarsest level built for at least this zoom (the finest level beyond the last)."""
+    zooms = sorted(level["zoom"] for level in manifest["levels"])
+    return next((level for level in zooms if level >= zoom), zooms[-1])
+
+
+class EncodingNotAcceptable(ValueError):
+    """No stored encoding of a file is one the client accepts."""
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """
+    Content codings an Accept-Encoding header allows.
+
+    A coding with q=0, or with a q value that is not a number, is not
+    allowed. identity is allowed unless excluded by identity;q=0 (or by
+    *;q=0 without identity listed).
+    """
+    qualities = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        try:
+            qualities[coding] = float(quality[2:]) if quality.startswith("q=") else 1.0
+        except ValueError:
+            qualities[coding] = 0.0
+
+    accepted = {coding for coding, quality in qualities.items() if quality > 0 and coding != "*"}
+    if qualities.get("*", 0) > 0:
+        accepted.update(name for name, _ in ENCODINGS if name not in qualities)
+    if qualities.get("identity", qualities.get("*", 1.0)) > 0:
+        accepted.add("identity")
+    return accepted
+
+
+def geometry_body(
+    zoom_level: int,
+    geometry_format: str,
+    accepted: Iterable[str],
+    directory: Path = GEOMETRY_DIR,
+) -> Tuple[bytes, str]:
+    """
+    Pick the best stored encoding of a level the client accepts.
+
+    Args:
+        zoom_level: Built level (see level_for_zoom)
+        geometry_format: Key of GEOMETRY_FORMATS
+        accepted: Content codings from accepted_encodings
+
+    Returns:
+        (body, content coding)
+
+    Raises:
+        GeometryNotBuilt: If no file of the level exists
+        EncodingNotAcceptable: If none of the level's files is in an accepted encoding
+    """
+    path = Path(directory) / f"suburbs.z{zoom_level}.{geometry_format}"
+    accepted = set(accepted)
+    for encoding, suffix in ENCODINGS:
+        if encoding not in accepted:
+            continue
+        body = cached_file(path.with_name(path.name + suffix))
+        if body is not None:
+            return body, encoding
+    if any(path.with_name(path.name + suffix).exists() for _, suffix in ENCODINGS):
+        raise EncodingNotAcceptable(f"No accepted encoding of {path.name} (stored: {', '.join(name for name, _ in ENCODINGS)})")
+    raise GeometryNotBuilt(f"Geometry level not built: {path.name}")
@@ -0,0 +1,167 @@
+"""Top-k suburb leaderboards on any analytics metric within a filtered cohort.
+
+suburb_analytics' price_rank, growth_rank and speed_rank are global ranks
+fixed at build time. A leaderboard ranks any numeric suburb_analytics
+column instead, within the cohort left by the request's filters (property
+type, district, postcode, price range, minimum sales), e.g. the
+fastest-growing suburbs under $1.2M.
+
+The columns are held as NumPy arrays per dataset version, together with
+each suburb's district and postcode (the ones most of its sales fall in).
+A request is a vectorized mask, an argpartition for the top k (no full
+sort of the cohort) and, for those k, percentile ranks counted against the
+cohort.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..db.dataset import derived
+from ..db.repository import ANALYTICS_COLUMNS, STRING_COLUMNS, open_repository
+from .aggregate import property_columns
+
+# Numeric suburb_analytics columns a leaderboard can rank on
+LEADERBOARD_METRICS = [
+    name for name in ANALYTICS_COLUMNS if name not in STRING_COLUMNS and name != "property_type"
+]
+
+ORDERS = ["desc", "asc"]
+
+
+def _majority(suburb_codes: np.ndarray, codes: np.ndarray, suburbs: int, categories: np.ndarray) -> np.ndarray:
+    """Category most of each suburb's sales fall in, per suburb code."""
+    counts = np.bincount(suburb_codes.astype(np.int64) * len(categories) + codes, minlength=suburbs * len(categories))
+    return categories[counts.reshape(suburbs, len(categories)).argmax(axis=1)]
+
+
+@derived("leaderboard_columns")
+def leaderboard_columns() -> Dict[str, np.ndarray]:
+    """
+    Build the leaderboard columns for every (suburb, property_type) series.
+
+    Returns:
+        Dictionary of equal-length arrays: suburb, property_type, district,
+        postcode (None for suburbs without sales) and every
+        LEADERBOARD_METRICS column as float64
+    """
+    with open_repository() as repo:
+        analytics = repo.load_columns("suburb_analytics", ["suburb", "property_type"] + LEADERBOARD_METRICS)
+
+    columns = {
+        "suburb": analytics["suburb"].astype(str),
+        "property_type": analytics["property_type"].astype(str),
+    }
+
+    # Districts and postcodes by suburb, from the sales already held in memory
+    store = property_columns()
+    suburbs = store["categories"]["suburb"]
+    position = np.searchsorted(suburbs, columns["suburb"])
+    known = position < len(suburbs)
+    known[known] = suburbs[position[known]] == columns["suburb"][known]
+    for name in ("district", "postcode"):
+        majority = _majority(store["codes"]["suburb"], store["codes"][name], len(suburbs), store["categories"][name])
+        values = np.full(len(position), None, dtype=object)
+        values[known] = majority[position[known]]
+        columns[name] = values
+
+    for name in LEADERBOARD_METRICS:
+        columns[name] = analytics[name].astype(np.float64)
+    return columns
+
+
+def leaderboard(
+    metric: str,
+    order: str = "desc",
+    k: int = 20,
+    property_type: Optional[str] = None,
+    district: Optional[str] = None,
+    postcode: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_sales: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Rank the suburb series of a cohort on a metric and return the top k.
+
+    The cohort is every series matching the filters with a value for the
+    metric; prices are current_median_price and sales current_num_sales, and
+    a series missing a filtered value is not in the cohort.
+
+    Args:
+        metric: One of LEADERBOARD_METRICS
+        order: desc (highest first) or asc
+        k: Number of series returned
+        property_type: Restrict to house or unit (both if None)
+        district: Restrict to suburbs in a district code
+        postcode: Restrict to suburbs in a postcode
+        min_price: Minimum current median price
+        max_price: Maximum current median price
+        min_sales: Minimum sales over the last year
+
+    Returns:
+        Dictionary with cohort_size, the cohort's median of the metric and
+        the top k items, each with its rank (1 = best; ties share a rank)
+        and percentile: the share of the cohort it ranks above, counting
+        ties as half (100 = ahead of every other series)
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(LEADERBOARD_METRICS)}")
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of: {', '.join(ORDERS)}")
+
+    columns = leaderboard_columns()
+    values = columns[metric]
+
+    # NaN compares False, so series missing a filtered value drop out
+    mask = ~np.isnan(values)
+    if property_type:
+        mask &= columns["property_type"] == property_type
+    if district:
+        mask &= columns["district"] == district
+    if postcode:
+        mask &= columns["postcode"] == postcode
+    if min_price is not None:
+        mask &= columns["current_median_price"] >= min_price
+    if max_price is not None:
+        mask &= columns["current_median_price"] <= max_price
+    if min_sales is not None:
+        mask &= columns["current_num_sales"] >= min_sales
+
+    cohort = np.flatnonzero(mask)
+    # Ranked ascending either way: higher is better for desc
+    scores = -values[cohort] if order == "desc" else values[cohort]
+    n = len(cohort)
+
+    if n > k:
+        candidates = np.argpartition(scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    # Best first, then by suburb name among ties
+    top = candidates[np.lexsort((columns["suburb"][cohort[candidates]], scores[candidates]))]
+
+    top_scores = scores[top]
+    better = np.count_nonzero(scores[None, :] < top_scores[:, None], axis=1)
+    tied = np.count_nonzero(scores[None, :] == top_scores[:, None], axis=1)
+
+    items: List[Dict[str, Any]] = []
+    for i, position in enumerate(top):
+        row = cohort[position]
+        price = columns["current_median_price"][row]
+        sales = columns["current_num_sales"][row]
+        items.append({
+            "rank": int(better[i]) + 1,
+            "percentile": float(100 * (n - better[i] - tied[i] + (tied[i] - 1) / 2) / (n - 1)) if n > 1 else 100.0,
+            "suburb": columns["suburb"][row],
+            "property_type": columns["property_type"][row],
+            "district": columns["district"][row],
+            "postcode": columns["postcode"][row],
+            "value": float(values[row]),
+            "current_median_price": None if np.isnan(price) else float(price),
+            "current_num_sales": None if np.isnan(sales) else int(sales),
+        })
+
+    return {
+        "cohort_size": int(n),
+        "cohort_median": float(np.median(values[cohort])) if n else None,
+        "items": items,
+    }
@@ -0,0 +1,59 @@
+"""Dense suburbs x quarters matrix of a quarterly metric.
+
+Drives the animated choropleth: one response carries a metric for every
+suburb and quarter, so the client's time slider needs no per-suburb requests.
+"""
+import base64
+from typing import Any, Dict
+
+import numpy as np
+
+from ..db.dataset import derived
+from ..db.repository import open_repository, quarter_key
+
+# suburb_quarterly columns that can be requested as a matrix
+MATRIX_METRICS = [
+    "num_sales", "median_price", "median_price_smoothed", "mean_price",
+    "min_price", "max_price", "price_stddev", "price_p25", "price_p75",
+    "median_ctsd", "mean_ctsd", "fast_settlements_percentage", "liquidity_score",
+    "qoq_price_change_percentage", "yoy_price_change_percentage",
+]
+
+
+@derived("quarterly_matrix")
+def quarterly_matrix(metric: str, property_type: str) -> Dict[str, Any]:
+    """
+    Build the matrix for one metric and property type.
+
+    Rows follow the sorted suburb index and columns the contiguous quarter
+    range from the earliest to the latest quarter with data. Quarters with no
+    row for a suburb are NaN.
+
+    Returns:
+        Dictionary with suburbs, quarters, shape and the row-major float32
+        values both as an array and base64-encoded little-endian bytes
+    """
+    with open_repository() as repo:
+        columns = repo.load_columns(
+            "suburb_quarterly", ["suburb", "year", "quarter", metric], property_type=property_type
+        )
+
+    suburbs, suburb_idx = np.unique(columns["suburb"].astype(str), return_inverse=True)
+    keys = quarter_key(columns["year"], columns["quarter"]).astype(np.int64)
+
+    if len(keys) == 0:
+        values = np.empty((0, 0), dtype=np.float32)
+        quarters = []
+    else:
+        first, last = int(keys.min()), int(keys.max())
+        values = np.full((len(suburbs), last - first + 1), np.nan, dtype=np.float32)
+        values[suburb_idx, keys - first] = columns[metric]
+        quarters = [f"{key // 4}-Q{key % 4 + 1}" for key in range(first, last + 1)]
+
+    return {
+        "suburbs": suburbs.tolist(),
+        "quarters": quarters,
+        "shape": list(values.shape),
+        "values": values,
+        "packed": base64.b64encode(values.astype("<f4").tobytes()).decode("ascii"),
+    }
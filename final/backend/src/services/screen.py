@@ -0,0 +1,194 @@
+"""Affordability screening of every suburb against a buyer's budget.
+
+A screen combines a purchase budget and loan terms with constraints on
+growth, volatility, settlement speed and sales volume. The columns it needs
+(suburb_analytics metrics joined to each series' latest suburb_quarterly
+p25 and median price) are held as NumPy arrays per dataset version, so a
+screen is a handful of vectorized comparisons over all suburbs at once
+rather than a query per criterion.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..db.dataset import derived
+from ..db.repository import open_repository, quarter_key
+
+# Latest-quarter price a suburb is judged on: entry level (p25) or median
+PRICE_BASES = {"p25": "price_p25", "median": "median_price"}
+
+ANALYTICS_METRICS = [
+    "current_median_price", "growth_1yr_percentage", "growth_5yr_percentage",
+    "volatility_score", "current_avg_ctsd", "current_num_sales", "market_health_score",
+]
+
+# Sort key -> (column, descending)
+SCREEN_SORTS = {
+    "growth_5yr": ("growth_5yr_percentage", True),
+    "growth_1yr": ("growth_1yr_percentage", True),
+    "price": ("price", False),
+    "repayment": ("monthly_repayment", False),
+    "headroom": ("headroom", True),
+    "volatility": ("volatility_score", False),
+    "ctsd": ("current_avg_ctsd", False),
+    "health": ("market_health_score", True),
+}
+
+
+@derived("screen_columns")
+def screen_columns() -> Dict[str, np.ndarray]:
+    """
+    Build the screening columns for every (suburb, property_type) series.
+
+    Returns:
+        Dictionary of equal-length arrays: suburb, property_type, the
+        ANALYTICS_METRICS, latest_key (quarter key of the latest quarter with
+        sales) and that quarter's price_p25 and median_price (NaN if none)
+    """
+    with open_repository() as repo:
+        analytics = repo.load_columns("suburb_analytics", ["suburb", "property_type"] + ANALYTICS_METRICS)
+        quarterly = repo.load_columns(
+            "suburb_quarterly", ["suburb", "property_type", "year", "quarter"] + list(PRICE_BASES.values())
+        )
+
+    suburbs = analytics["suburb"].astype(str)
+    property_types = analytics["property_type"].astype(str)
+    rows = {key: i for i, key in enumerate(zip(suburbs, property_types))}
+    row = np.array(
+        [rows.get(key, -1) for key in zip(quarterly["suburb"].astype(str), quarterly["property_type"].astype(str))],
+        dtype=np.int64,
+    )
+    keys = quarter_key(quarterly["year"], quarterly["quarter"]).astype(np.int64)
+
+    # Latest quarter per series, then that quarter's prices
+    found = row >= 0
+    latest_key = np.full(len(suburbs), -1, dtype=np.int64)
+    np.maximum.at(latest_key, row[found], keys[found])
+    latest = found & (keys == latest_key[np.maximum(row, 0)])
+
+    columns = {"suburb": suburbs, "property_type": property_types, "latest_key": latest_key}
+    for name in ANALYTICS_METRICS:
+        columns[name] = analytics[name].astype(np.float64)
+    for name in PRICE_BASES.values():
+        values = np.full(len(suburbs), np.nan)
+        values[row[latest]] = quarterly[name][latest]
+        columns[name] = values
+    return columns
+
+
+def monthly_repayment(loan: np.ndarray, rate: float, term_years: int) -> np.ndarray:
+    """
+    Monthly principal-and-interest repayment of an amortizing loan.
+
+    Args:
+        loan: Loan amounts
+        rate: Annual interest rate in percent
+        term_years: Loan term in years
+
+    Returns:
+        Repayment per month for each loan amount
+    """
+    months = term_years * 12
+    r = rate / 100 / 12
+    if r == 0:
+        return loan / months
+    return loan * r / (1 - (1 + r) ** -months)
+
+
+def screen(
+    budget: float,
+    deposit: float = 0.0,
+    rate: float = 6.0,
+    term_years: int = 30,
+    price_basis: str = "median",
+    property_type: Optional[str] = None,
+    max_repayment: Optional[float] = None,
+    min_growth_1yr: Optional[float] = None,
+    min_growth_5yr: Optional[float] = None,
+    max_volatility: Optional[float] = None,
+    max_ctsd: Optional[float] = None,
+    min_sales: Optional[int] = None,
+    sort: str = "growth_5yr",
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Screen every suburb series against a budget and constraints.
+
+    A series matches if its latest-quarter price (per price_basis) is within
+    budget, the repayment on that price less the deposit is within
+    max_repayment, and every given constraint holds. Series missing a
+    constrained value do not match.
+
+    Args:
+        budget: Maximum purchase price
+        deposit: Deposit paid up front; the rest of the price is borrowed
+        rate: Annual interest rate in percent
+        term_years: Loan term in years
+        price_basis: One of PRICE_BASES
+        property_type: Restrict to house or unit (both if None)
+        max_repayment: Maximum monthly repayment
+        min_growth_1yr: Minimum 1-year growth percentage
+        min_growth_5yr: Minimum 5-year growth percentage
+        max_volatility: Maximum volatility score
+        max_ctsd: Maximum average contract-to-settlement days
+        min_sales: Minimum sales over the last year
+        sort: One of SCREEN_SORTS
+        limit: Maximum matches returned
+
+    Returns:
+        Dictionary with total (number of matches) and the ranked items
+    """
+    if price_basis not in PRICE_BASES:
+        raise ValueError(f"price_basis must be one of: {', '.join(PRICE_BASES)}")
+    if sort not in SCREEN_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SCREEN_SORTS)}")
+
+    columns = screen_columns()
+    price = columns[PRICE_BASES[price_basis]]
+    loan = np.maximum(price - deposit, 0.0)
+    computed = {
+        "price": price,
+        "loan_amount": loan,
+        "monthly_repayment": monthly_repayment(loan, rate, term_years),
+        "headroom": budget - price,
+    }
+
+    # NaN compares False, so unknown prices and metrics fail their checks
+    mask = price <= budget
+    if property_type:
+        mask &= columns["property_type"] == property_type
+    if max_repayment is not None:
+        mask &= computed["monthly_repayment"] <= max_repayment
+    if min_growth_1yr is not None:
+        mask &= columns["growth_1yr_percentage"] >= min_growth_1yr
+    if min_growth_5yr is not None:
+        mask &= columns["growth_5yr_percentage"] >= min_growth_5yr
+    if max_volatility is not None:
+        mask &= columns["volatility_score"] <= max_volatility
+    if max_ctsd is not None:
+        mask &= columns["current_avg_ctsd"] <= max_ctsd
+    if min_sales is not None:
+        mask &= columns["current_num_sales"] >= min_sales
+
+    matches = np.flatnonzero(mask)
+    column, descending = SCREEN_SORTS[sort]
+    values = {**columns, **computed}[column][matches]
+    ranking = np.where(np.isnan(values), np.inf, -values if descending else values)
+    top = matches[np.argsort(ranking, kind="stable")[:limit]]
+
+    items: List[Dict[str, Any]] = []
+    for i in top:
+        key = int(columns["latest_key"][i])
+        item = {
+            "suburb": columns["suburb"][i],
+            "property_type": columns["property_type"][i],
+            "latest_quarter": f"{key // 4}-Q{key % 4 + 1}",
+        }
+        for name, values in computed.items():
+            item[name] = float(values[i])
+        for name in list(PRICE_BASES.values()) + ANALYTICS_METRICS:
+            value = columns[name][i]
+            item[name] = None if np.isnan(value) else float(value)
+        items.append(item)
+
+    return {"total": int(len(matches)), "items": items}
@@ -0,0 +1,147 @@
+"""Similar-suburb ranking over a precomputed feature matrix.
+
+Each suburb (per property type) is described by one feature vector:
+
+- its smoothed median price trajectory over the last TRAJECTORY_QUARTERS
+  quarters, as log prices relative to the suburb's own mean, so suburbs
+  that moved alike match regardless of price level,
+- headline metrics from suburb_analytics (price level, growth, volatility,
+  contract-to-settlement days), standardized across suburbs.
+
+Both blocks are scaled to equal weight and every row to unit length, so a
+query is one matrix-vector product (cosine similarity against every suburb)
+followed by argpartition for the top k. The matrix is built once per
+dataset version.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..db.dataset import derived
+from ..db.repository import open_repository
+from .quarterly_matrix import quarterly_matrix
+
+TRAJECTORY_QUARTERS = 40
+
+# Suburbs with fewer quarters of data in the trajectory window are not ranked
+MIN_TRAJECTORY_QUARTERS = 8
+
+# suburb_analytics columns compared, and how each is transformed first
+METRIC_FEATURES = {
+    "current_median_price": np.log,
+    "growth_1yr_percentage_smoothed": None,
+    "growth_5yr_percentage_smoothed": None,
+    "volatility_score": None,
+    "current_avg_ctsd": None,
+}
+
+# Share of the similarity carried by the trajectory block (the rest by metrics)
+TRAJECTORY_WEIGHT = 0.5
+
+
+def _fill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaN along rows, then back-fill leading NaN."""
+    columns = np.arange(values.shape[1])
+    valid = ~np.isnan(values)
+    forward = np.maximum.accumulate(np.where(valid, columns, 0), axis=1)
+    values = np.take_along_axis(values, forward, axis=1)
+    first = np.argmax(~np.isnan(values), axis=1)
+    leading = columns[None, :] < first[:, None]
+    return np.where(leading, values[np.arange(len(values)), first][:, None], values)
+
+
+def _standardize(block: np.ndarray) -> np.ndarray:
+    """Z-score columns (missing values become the column mean, i.e. 0)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nanmean(block, axis=0)
+        std = np.nanstd(block, axis=0)
+        z = (block - mean) / np.where(std > 0, std, 1)
+    return np.nan_to_num(z)
+
+
+def _unit_rows(block: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.where(norms > 0, norms, 1)
+
+
+@derived("similarity_features")
+def similarity_features(property_type: str) -> Dict[str, Any]:
+    """
+    Build the normalized feature matrix for one property type.
+
+    Returns:
+        Dictionary with suburbs, positions (suburb -> row), the unit-length
+        float32 feature matrix and the raw metric columns per suburb
+    """
+    matrix = quarterly_matrix("median_price_smoothed", property_type)
+    window = matrix["values"][:, -TRAJECTORY_QUARTERS:].astype(np.float64)
+    observed = (~np.isnan(window)).sum(axis=1)
+    keep = observed >= MIN_TRAJECTORY_QUARTERS
+    suburbs = [suburb for suburb, kept in zip(matrix["suburbs"], keep) if kept]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trajectory = np.log(np.where(window[keep] > 0, window[keep], np.nan))
+    trajectory = _fill(trajectory)
+    trajectory -= trajectory.mean(axis=1, keepdims=True)
+
+    with open_repository() as repo:
+        columns = repo.load_columns("suburb_analytics", ["suburb"] + list(METRIC_FEATURES), property_type=property_type)
+    rows = {suburb: i for i, suburb in enumerate(columns["suburb"].astype(str))}
+    order = np.array([rows.get(suburb, -1) for suburb in suburbs], dtype=np.int64)
+
+    metrics = {}
+    transformed = []
+    for name, transform in METRIC_FEATURES.items():
+        values = np.full(len(order), np.nan)
+        found = order >= 0
+        values[found] = columns[name][order[found]]
+        metrics[name] = values
+        if transform is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = transform(np.where(values > 0, values, np.nan))
+        transformed.append(values)
+    metric_block = _standardize(np.column_stack(transformed))
+
+    features = np.hstack([
+        _unit_rows(trajectory) * np.sqrt(TRAJECTORY_WEIGHT),
+        _unit_rows(metric_block) * np.sqrt(1 - TRAJECTORY_WEIGHT),
+    ])
+
+    return {
+        "suburbs": suburbs,
+        "positions": {suburb: i for i, suburb in enumerate(suburbs)},
+        "features": _unit_rows(features).astype(np.float32),
+        "metrics": metrics,
+    }
+
+
+def similar_suburbs(suburb: str, property_type: str, k: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Rank the k suburbs most similar to a suburb.
+
+    Returns:
+        Dictionaries with suburb, similarity (cosine, 1 = identical) and the
+        compared metrics, most similar first; None if the suburb has too
+        little data to be ranked
+    """
+    data = similarity_features(property_type)
+    i = data["positions"].get(suburb)
+    if i is None:
+        return None
+
+    scores = data["features"] @ data["features"][i]
+    scores[i] = -np.inf
+    k = min(k, len(scores) - 1)
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+
+    results = []
+    for j in top:
+        result = {"suburb": data["suburbs"][j], "similarity": float(scores[j])}
+        for name, values in data["metrics"].items():
+            result[name] = None if np.isnan(values[j]) else float(values[j])
+        results.append(result)
+    return results
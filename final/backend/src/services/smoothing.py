@@ -0,0 +1,159 @@
+"""On-the-fly smoothing of quarterly median prices with caller-chosen parameters.
+
+suburb_quarterly.median_price_smoothed is fixed at alpha=0.3 by
+05_quarterly_analysis_split.ipynb. These functions recompute a smoothed
+series from the raw medians for any alpha, or as a trailing rolling median,
+so smoothing choices can be explored without rebuilding the data.
+
+The exponential smoothing recurrence S_t = a * X_t + (1 - a) * S_{t-1} is
+evaluated in closed form: S_t is a weighted sum of the inputs with weights
+(1 - a)^(t - k), built as one lower-triangular matrix product per series.
+Quarters with a missing median carry the previous value forward and leading
+gaps take the first known median, as in the notebook.
+
+Series are laid out on a contiguous quarter range first, with quarters that
+have no row as missing, so a rolling window always spans the same number of
+calendar quarters whatever gaps a suburb's history has.
+"""
+import warnings
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .. import memory
+from ..db.dataset import dataset_version
+from ..db.hot_swap import on_swap
+from ..db.repository import open_repository, quarter_key
+
+SMOOTHING_METHODS = ["ewm", "rolling_median"]
+
+# Smoothed series kept in memory, keyed by dataset version and parameters
+SMOOTHED_CACHE_SIZE = 4096
+
+
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially smooth a series (adjust=False semantics, NaN carries forward).
+
+    Args:
+        values: Series in time order, NaN where missing
+        alpha: Smoothing factor in (0, 1]
+
+    Returns:
+        Smoothed series of the same length (all NaN if values has no data)
+    """
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.full(len(values), np.nan)
+
+    # Leading gaps take the first known value, which the recurrence then keeps
+    first = int(np.argmax(valid))
+    values = values.copy()
+    values[:first] = values[first]
+    valid[:first] = True
+
+    if alpha >= 1:
+        positions = np.where(valid, np.arange(len(values)), 0)
+        return values[np.maximum.accumulate(positions)]
+
+    # Each step decays the previous value by (1 - alpha) if it has a new input
+    log_decay = np.where(valid, np.log1p(-alpha), 0.0)
+    log_decay[0] = 0.0
+    inputs = np.where(valid, alpha * np.nan_to_num(values), 0.0)
+    inputs[0] = values[0]
+
+    # weights[t, k] = product of decays over (k, t], for k <= t
+    cumulative = np.cumsum(log_decay)
+    exponent = cumulative[:, None] - cumulative[None, :]
+    weights = np.exp(np.minimum(exponent, 0.0))
+    weights[np.triu_indices(len(values), k=1)] = 0.0
+    return weights @ inputs
+
+
+def rolling_median(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling median over up to window values (NaN ignored).
+
+    Args:
+        values: Series of consecutive periods, NaN where missing
+        window: Number of periods in each window
+
+    Returns:
+        Smoothed series of the same length, NaN where a window has no data
+    """
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    with warnings.catch_warnings():
+        # All-NaN windows give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(windows, axis=1)
+
+
+@memory.cached("smoothed_series", maxsize=SMOOTHED_CACHE_SIZE)
+def _smoothed(
+    version: str,
+    suburb: str,
+    property_type: str,
+    level: str,
+    method: str,
+    parameter: float,
+) -> Dict[Tuple[int, int], Optional[float]]:
+    """Smoothed medians of one full series keyed by (year, quarter); version keys the cache."""
+    with open_repository() as repo:
+        rows = repo.suburb_quarterly(suburb, property_type=property_type, level=level)
+
+    if not rows:
+        return {}
+
+    # One slot per calendar quarter from the first to the last row, NaN where there is no row
+    keys = np.array([quarter_key(row["year"], row["quarter"]) for row in rows], dtype=np.int64)
+    positions = keys - keys.min()
+    medians = np.full(int(positions.max()) + 1, np.nan)
+    medians[positions] = [np.nan if row["median_price"] is None else row["median_price"] for row in rows]
+
+    if method == "ewm":
+        smoothed = ewm(medians, parameter)
+    else:
+        smoothed = rolling_median(medians, int(parameter))
+
+    return {
+        (row["year"], row["quarter"]): None if np.isnan(value) else float(value)
+        for row, value in zip(rows, smoothed[positions])
+    }
+
+
+# Entries of a replaced dataset's version are never requested again
+on_swap(_smoothed.cache_clear)
+
+
+def smoothed_medians(
+    suburb: str,
+    property_type: str,
+    level: str = "suburb",
+    method: str = "ewm",
+    alpha: float = 0.3,
+    window: int = 4,
+) -> Dict[Tuple[int, int], Optional[float]]:
+    """
+    Smooth a suburb's full quarterly median price series.
+
+    The whole history is smoothed regardless of any year filter applied to
+    the response, so values match those of an unfiltered request. Results
+    are memoized per (suburb, property type, level, method, parameter) for
+    the current dataset version.
+
+    Args:
+        suburb: Suburb (or area name at a coarser level)
+        property_type: house or unit
+        level: Aggregation level
+        method: One of SMOOTHING_METHODS
+        alpha: Smoothing factor for ewm
+        window: Window length in quarters for rolling_median
+
+    Returns:
+        Smoothed median price per (year, quarter)
+    """
+    if method not in SMOOTHING_METHODS:
+        raise ValueError(f"smoothing must be one of: {', '.join(SMOOTHING_METHODS)}")
+    parameter = float(alpha) if method == "ewm" else float(window)
+    return _smoothed(dataset_version(), suburb, property_type, level, method, parameter)
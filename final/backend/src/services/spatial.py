@@ -0,0 +1,115 @@
+"""Suburb centroid and bounding-box index for viewport and nearest-suburb queries.
+
+locations.json (written by src/db/build_geometry.py) holds one centroid and
+bounding box per suburb. With roughly a thousand suburbs the index is a set
+of NumPy columns scanned in full: a viewport query is one vectorized overlap
+test and a nearest query one vectorized haversine plus argpartition, both
+well under a millisecond, so no tree structure is needed.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .. import memory
+from ..config import GEOMETRY_DIR
+from .geometry import GeometryNotBuilt, cached_file
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def suburb_index(directory: Path = GEOMETRY_DIR) -> Dict[str, Any]:
+    """
+    Load the location index (re-read only when the geometry build rewrites it).
+
+    Returns:
+        Dictionary with suburbs, postcodes, positions (suburb -> row),
+        longitude/latitude arrays and bbox as an (n, 4) array
+
+    Raises:
+        GeometryNotBuilt: If locations.json is missing
+    """
+    body = cached_file(Path(directory) / "locations.json")
+    if body is None:
+        raise GeometryNotBuilt(f"Geometry not built in {directory}: run python -m src.db.build_geometry")
+    return _index(body)
+
+
+_cached: Tuple[Optional[bytes], Optional[Dict[str, Any]]] = (None, None)
+
+
+def _index(body: bytes) -> Dict[str, Any]:
+    """Column arrays for a locations.json body, cached for the last body seen."""
+    global _cached
+    if _cached[0] is body:
+        return _cached[1]
+
+    locations = json.loads(body)["suburbs"]
+    index = {
+        "suburbs": [location["suburb"] for location in locations],
+        "postcodes": [location["postcode"] for location in locations],
+        "positions": {location["suburb"]: i for i, location in enumerate(locations)},
+        "longitude": np.array([location["longitude"] for location in locations], dtype=np.float64),
+        "latitude": np.array([location["latitude"] for location in locations], dtype=np.float64),
+        "bbox": np.array([location["bbox"] for location in locations], dtype=np.float64).reshape(-1, 4),
+    }
+    _cached = (body, index)
+    return index
+
+
+memory.track(
+    "suburb_index",
+    lambda: (memory.deep_sizeof(_cached[1]), len(_cached[1]["suburbs"])) if _cached[1] is not None else (0, 0),
+)
+
+
+def within(bbox: Sequence[float]) -> List[int]:
+    """
+    Rows of suburbs whose bounding box intersects bbox.
+
+    Args:
+        bbox: [min_lon, min_lat, max_lon, max_lat]
+
+    Returns:
+        Row numbers in suburb order
+    """
+    index = suburb_index()
+    boxes = index["bbox"]
+    overlaps = (
+        (boxes[:, 0] <= bbox[2]) & (boxes[:, 2] >= bbox[0]) &
+        (boxes[:, 1] <= bbox[3]) & (boxes[:, 3] >= bbox[1])
+    )
+    return np.flatnonzero(overlaps).tolist()
+
+
+def distances_km(longitude: float, latitude: float) -> np.ndarray:
+    """Great-circle distance from a point to every suburb centroid."""
+    index = suburb_index()
+    lon1, lat1 = np.radians(longitude), np.radians(latitude)
+    lon2, lat2 = np.radians(index["longitude"]), np.radians(index["latitude"])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def nearest(suburb: str, k: int) -> Optional[List[Tuple[int, float]]]:
+    """
+    The k suburbs with centroids closest to a suburb's centroid.
+
+    Returns:
+        (row, distance in km) pairs nearest first, excluding the suburb
+        itself, or None if the suburb has no location
+    """
+    index = suburb_index()
+    origin = index["positions"].get(suburb)
+    if origin is None:
+        return None
+
+    distances = distances_km(index["longitude"][origin], index["latitude"][origin])
+    distances[origin] = np.inf
+    k = min(k, len(distances) - 1)
+    if k <= 0:
+        return []
+    closest = np.argpartition(distances, k - 1)[:k]
+    closest = closest[np.argsort(distances[closest], kind="stable")]
+    return [(int(i), float(distances[i])) for i in closest]
@@ -0,0 +1,100 @@
+"""Startup warm-up: make a fresh process as fast as a long-running one.
+
+Machines are stopped when idle and started on demand, so many visitors hit a
+process whose data pages are not in memory and whose in-process structures
+are not built yet. warm_up() runs each WARMUP_STEPS entry once at startup:
+it pre-reads the data files into the OS page cache, runs the queries behind
+the most requested routes, and builds the @derived structures the heavier
+endpoints use. /health reports ready only once it has finished.
+
+A failing step (e.g. geometry not built) is recorded and skipped; it never
+keeps the process from becoming ready.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from ..config import WARMUP_TOUCH_MAX_MB
+from ..db.dataset import current_dataset
+from ..db.repository import open_repository
+from .aggregate import property_columns
+from .forecast import forecast_models
+from .leaderboard import leaderboard_columns
+from .screen import screen_columns
+from .similarity import similarity_features
+from .spatial import suburb_index
+
+WARMUP_MODES = ["blocking", "background", "off"]
+
+PROPERTY_TYPES = ["house", "unit"]
+
+
+def _touch_files() -> int:
+    return current_dataset().touch(WARMUP_TOUCH_MAX_MB * 1024 * 1024)
+
+
+def _hot_queries() -> None:
+    """The repository calls behind the analytics list and a suburb lookup."""
+    with open_repository() as repo:
+        rows, _ = repo.list_analytics()
+        for property_type in PROPERTY_TYPES:
+            repo.list_analytics(property_type=property_type)
+        if rows:
+            suburb = rows[0]["suburb"]
+            repo.suburb_analytics(suburb)
+            repo.suburb_quarterly(suburb)
+            repo.search_suburbs(suburb[:3])
+
+
+# (name, step) in the order they run
+WARMUP_STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("touch_files", _touch_files),
+    ("hot_queries", _hot_queries),
+    ("property_columns", property_columns),
+    ("screen_columns", screen_columns),
+    ("leaderboard_columns", leaderboard_columns),
+    ("forecast_models", lambda: [forecast_models(t) for t in PROPERTY_TYPES]),
+    ("similarity_features", lambda: [similarity_features(t) for t in PROPERTY_TYPES]),
+    ("suburb_index", suburb_index),
+]
+
+# Progress of the warm-up, reported by /health
+warmup_state: Dict[str, Any] = {"ready": False, "elapsed_ms": None, "steps": {}}
+_warmup_lock = threading.Lock()
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Run every warm-up step once and mark the process ready.
+
+    Returns:
+        warmup_state: ready, total elapsed_ms and per step its elapsed_ms
+        and error (None if it succeeded)
+    """
+    with _warmup_lock:
+        if warmup_state["ready"]:
+            return warmup_state
+
+        started = time.perf_counter()
+        for name, step in WARMUP_STEPS:
+            step_started = time.perf_counter()
+            error = None
+            try:
+                step()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"WARNING: warm-up step {name} failed: {error}")
+            warmup_state["steps"][name] = {
+                "elapsed_ms": (time.perf_counter() - step_started) * 1000,
+                "error": error,
+            }
+
+        warmup_state["elapsed_ms"] = (time.perf_counter() - started) * 1000
+        warmup_state["ready"] = True
+        print(f"Warm-up finished in {warmup_state['elapsed_ms']:.0f} ms")
+        return warmup_state
+
+
+def skip_warm_up() -> None:
+    """Mark the process ready without warming (WARMUP=off)."""
+    warmup_state["ready"] = True